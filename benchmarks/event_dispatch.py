@@ -0,0 +1,32 @@
+"""
+Measures how long resolving every registered handler key takes.
+
+Run with `uv run python -m benchmarks.event_dispatch`.
+"""
+
+import timeit
+
+from src.server import event_handlers
+from src.utils.event_handlers import WILDCARD
+
+
+def main():
+    keys = [
+        (
+            entry["action"],
+            entry["field_type"],
+            "Custom field" if entry["field_name"] == WILDCARD else entry["field_name"],
+        )
+        for entry in event_handlers.describe()
+    ]
+    keys.append(("edited", "single_select", "Unknown field"))
+
+    print(f"{len(event_handlers)} handlers registered")
+    for key in keys:
+        number, _ = timeit.Timer(lambda key=key: event_handlers.resolve(key)).autorange()
+        best = min(timeit.repeat(lambda key=key: event_handlers.resolve(key), number=number, repeat=5)) / number
+        print(f"{str(key):<55}{best * 1e9:>8.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
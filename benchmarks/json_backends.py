@@ -0,0 +1,93 @@
+"""
+Compares the available JSON backends on payloads shaped like the ones the service handles.
+
+Run with `uv run python -m benchmarks.json_backends`, install orjson or msgspec first to include them.
+"""
+
+import json
+import timeit
+
+from src.utils.json_backend import available_backends
+
+GRAPHQL_ITEM_NAME_RESPONSE = {"data": {"node": {"content": {"title": "Add dark mode to the dashboard"}}}}
+GRAPHQL_ASSIGNEES_RESPONSE = {
+    "data": {"node": {"content": {"assignees": {"nodes": [{"id": f"MDQ6VXNlcjg4MjY4MD{i:02}"} for i in range(10)]}}}}
+}
+
+
+def create_user(login: str) -> dict:
+    return {
+        "login": login,
+        "id": 88268063,
+        "node_id": "MDQ6VXNlcjg4MjY4MDYz",
+        "avatar_url": "https://avatars.githubusercontent.com/u/88268063?v=4",
+        "url": f"https://api.github.com/users/{login}",
+        "html_url": f"https://github.com/{login}",
+        "type": "User",
+        "site_admin": False,
+    }
+
+
+def create_webhook_payload(body_length: int) -> dict:
+    changes = {"body": {"from": "", "to": "Lorem ipsum dolor sit amet. " * (body_length // 28)}}
+    if not body_length:
+        changes = {
+            "field_value": {
+                "field_node_id": "PVTSSF_lADOCvlHWc4A1a2Bzgl0Xr4",
+                "field_type": "single_select",
+                "field_name": "Status",
+                "project_number": 1,
+                "from": {"id": "f75ad846", "name": "Todo", "color": "GRAY", "description": ""},
+                "to": {"id": "47fc9ee4", "name": "In Progress", "color": "YELLOW", "description": ""},
+            }
+        }
+    return {
+        "action": "edited",
+        "projects_v2_item": {
+            "id": 112233445,
+            "node_id": "PVTI_lADOCvlHWc4A1a2BzgXz9Yk",
+            "project_node_id": "PVT_kwDOCvlHWc4A1a2B",
+            "content_node_id": "I_kwDOLXyZ7c6Lq2Ab",
+            "content_type": "Issue",
+            "creator": create_user("norbiros"),
+            "created_at": "2025-10-01T12:00:00Z",
+            "updated_at": "2025-10-19T08:30:00Z",
+            "archived_at": None,
+        },
+        "changes": changes,
+        "organization": {"login": "Hack4Krak", "id": 161803398, "node_id": "O_kgDOCvlHWc", "description": ""},
+        "sender": create_user("kubaryt"),
+        "installation": {"id": 55667788, "node_id": "MDIzOkludGVncmF0aW9uSW5zdGFsbGF0aW9uNTU2Njc3ODg="},
+    }
+
+
+PAYLOADS = {
+    "graphql item name": GRAPHQL_ITEM_NAME_RESPONSE,
+    "graphql assignees": GRAPHQL_ASSIGNEES_RESPONSE,
+    "webhook field edit": create_webhook_payload(0),
+    "webhook body edit 4 KB": create_webhook_payload(4 * 1024),
+    "webhook body edit 64 KB": create_webhook_payload(64 * 1024),
+}
+
+
+def measure(function, argument, repeat: int = 5) -> float:
+    number, _ = timeit.Timer(lambda: function(argument)).autorange()
+    return min(timeit.repeat(lambda: function(argument), number=number, repeat=repeat)) / number
+
+
+def main():
+    backends = available_backends()
+    print(
+        f"{'payload':<26}{'size':>10}  " + "".join(f"{name + ' loads':>16}{name + ' dumps':>16}" for name in backends)
+    )
+    for payload_name, payload in PAYLOADS.items():
+        encoded = json.dumps(payload).encode("utf-8")
+        row = f"{payload_name:<26}{len(encoded):>9}B  "
+        for backend in backends.values():
+            row += f"{measure(backend.loads, encoded) * 1e6:>14.2f}us"
+            row += f"{measure(backend.dumps, payload) * 1e6:>14.2f}us"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Reports the cold import time of the server, as measured by `python -X importtime`.
+
+Run with `uv run python -m benchmarks.startup [module] [--top N]`, the module defaults to `src.server`.
+"""
+
+import argparse
+import subprocess
+import sys
+
+
+def measure_imports(module: str) -> list[tuple[str, int, int]]:
+    """
+    Imports the module in a fresh interpreter and returns `(name, self_us, cumulative_us)` of every imported module.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True, text=True, check=True
+    )
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        if not self_us.strip().isdigit():
+            # Header line
+            continue
+        imports.append((name.strip(), int(self_us), int(cumulative_us)))
+    return imports
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("module", nargs="?", default="src.server")
+    parser.add_argument("--top", type=int, default=15)
+    arguments = parser.parse_args()
+
+    imports = measure_imports(arguments.module)
+    names = {name for name, _, _ in imports}
+    total_us = next(cumulative_us for name, _, cumulative_us in imports if name == arguments.module)
+
+    print(f"{arguments.module}: {total_us / 1000:.1f} ms, {len(imports)} modules")
+    for heavy_module in ("hikari", "aiohttp", "pydantic", "fastapi", "uvicorn", "yaml"):
+        print(f"  {heavy_module:<10}{'imported' if heavy_module in names else 'not imported'}")
+    print("Slowest top-level packages:")
+    top_level = [entry for entry in imports if "." not in entry[0]]
+    for name, _, cumulative_us in sorted(top_level, key=lambda entry: entry[2], reverse=True)[: arguments.top]:
+        print(f"  {name:<40}{cumulative_us / 1000:>8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
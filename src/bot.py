@@ -1,58 +1,129 @@
 import asyncio
 import os
-import shelve
 
 from hikari import GuildPublicThread, RESTApp, TokenType
-from hikari.impl import RESTClientImpl
+from hikari.impl import HTTPSettings, HTTPTimeoutSettings, RESTClientImpl
 
+from src.utils.circuit_breaker import DEFAULT_DISCORD_REQUEST_TIMEOUT, GuardedClient, discord_breaker, github_breaker
 from src.utils.data_types import ProjectItemEvent
-from src.utils.discord_rest_client import fetch_forum_channel, get_post_id_or_post
-from src.utils.error import ForumChannelNotFound
-from src.utils.github_api import fetch_item_name
-from src.utils.misc import SharedForumChannel, bot_logger, create_item_link, handle_task_exception, retrieve_discord_id
-
-
-async def run(state: asyncio.Queue[ProjectItemEvent], stop_after_one_event: bool = False):
-    discord_rest = RESTApp()
+from src.utils.digest import MessageDigest
+from src.utils.discord_rest_client import fetch_forum_channel, get_post_id_or_post, send_message
+from src.utils.drain import UpdateTracker
+from src.utils.error import CircuitOpenError, ForumChannelNotFound
+from src.utils.misc import SharedForumChannel, bot_logger, create_item_link, handle_task_exception
+from src.utils.project_mirror import TITLE, project_mirror
+from src.utils.routing import Project, ProjectRoute
+from src.utils.storage import get_post_store, retrieve_discord_id
+from src.utils.structured_logging import bind_log_context
+from src.utils.thread_cache import start_gateway, thread_cache
+from src.utils.tracing import TracedClient, tracer
+
+
+async def run(
+    state: asyncio.Queue[ProjectItemEvent],
+    routes: list[ProjectRoute],
+    ready: asyncio.Event | None = None,
+    tracker: UpdateTracker | None = None,
+    stop_after_one_event: bool = False,
+    use_gateway: bool = False,
+    digest_window: float = 0,
+):
+    discord_rest = RESTApp(
+        http_settings=HTTPSettings(timeouts=HTTPTimeoutSettings(total=DEFAULT_DISCORD_REQUEST_TIMEOUT))
+    )
     await discord_rest.start()
+    token = os.getenv("DISCORD_BOT_TOKEN")
 
-    async with discord_rest.acquire(os.getenv("DISCORD_BOT_TOKEN"), token_type=TokenType.BOT) as client:
+    async with discord_rest.acquire(token, token_type=TokenType.BOT) as client:
         bot_logger.info("Discord client acquired.")
-        forum_channel_id = int(os.getenv("FORUM_CHANNEL_ID"))
-        discord_guild_id = int(os.getenv("DISCORD_GUILD_ID"))
-        forum_channel = await fetch_forum_channel(client, forum_channel_id)
-        if forum_channel is None:
-            raise ForumChannelNotFound(f"Forum channel with ID {forum_channel_id} not found.")
-        shared_forum_channel = SharedForumChannel(forum_channel)
-
-        while True:
-            event = await state.get()
-            update_task = asyncio.create_task(
-                process_update(client, forum_channel_id, discord_guild_id, shared_forum_channel, event)
+        # Only Discord calls count towards the Discord breaker, GitHub lookups of an update go through its own
+        client = GuardedClient(client, park=True)
+        if tracer.enabled:
+            # Every Discord request of a sampled update gets its own span
+            client = TracedClient(client, "discord")
+        digest = MessageDigest(client, digest_window) if digest_window > 0 else None
+        projects: dict[str, Project] = {}
+        for route in routes:
+            forum_channel = await fetch_forum_channel(client, route.forum_channel_id)
+            if forum_channel is None:
+                raise ForumChannelNotFound(f"Forum channel with ID {route.forum_channel_id} not found.")
+            projects[route.project_node_id] = Project(
+                route, SharedForumChannel(forum_channel), get_post_store(route.post_id_db_path), digest
             )
-            update_task.add_done_callback(lambda task: handle_task_exception(task, "Error processing update:"))
-            if stop_after_one_event:
-                break
+        # Events queued without a project are served by the first route
+        default_project = next(iter(projects.values()))
+        thread_cache.forum_channel_ids = {route.forum_channel_id for route in routes}
+        # Thread lookups fall back to REST when the gateway is disabled or does not know the thread
+        gateway = await start_gateway(token, [route.forum_channel_id for route in routes]) if use_gateway else None
+        bot_logger.info("Bot ready, serving %s projects.", len(projects))
+        if ready is not None:
+            ready.set()
 
-
-async def process_update(
-    client: RESTClientImpl,
-    forum_channel_id: int,
-    discord_guild_id: int,
-    shared_forum_channel: SharedForumChannel,
-    event: ProjectItemEvent,
-):
-    bot_logger.info(f"Processing event for item: {event.node_id}")
-
-    post_id_or_post = await get_post_id_or_post(event.node_id, discord_guild_id, forum_channel_id, client)
-    author_discord_id = retrieve_discord_id(event.sender)
+        try:
+            while True:
+                # Events stay queued while an upstream is down instead of piling up as stuck tasks
+                await discord_breaker.wait_until_available()
+                await github_breaker.wait_until_available()
+                event = await state.get()
+                tracer.record_queue_wait(getattr(event, "trace_parent", None))
+                project = projects.get(getattr(event, "project_node_id", None), default_project)
+                update_task = asyncio.create_task(process_project_update(client, project, event))
+                update_task.add_done_callback(lambda task: handle_task_exception(task, "Error processing update:"))
+                if tracker is not None:
+                    tracker.track(update_task, event)
+                if stop_after_one_event:
+                    break
+        finally:
+            if digest is not None:
+                # Collected messages would otherwise be lost on shutdown
+                unsent = await digest.flush_all()
+                if tracker is not None:
+                    tracker.unsent.extend(unsent)
+            if gateway is not None:
+                await gateway.close()
+                thread_cache.live = False
+
+
+async def process_project_update(client: RESTClientImpl, project: Project, event: ProjectItemEvent):
+    with tracer.resume("update", getattr(event, "trace_parent", None), event_type=type(event).__name__):
+        # Updates of one project wait for each other, other projects keep going
+        async with project.update_slots:
+            while True:
+                try:
+                    await process_update(client, project, event)
+                    return
+                except CircuitOpenError as error:
+                    # Discord calls wait in the client. The GitHub lookups of an update come before its first Discord
+                    # call that changes anything, so retrying it from the start repeats nothing. A cancelled update
+                    # ends up in the journal.
+                    if error.upstream != github_breaker.name:
+                        raise
+                    bot_logger.warning("Update of %s parked, %s", event.node_id, error)
+                    await github_breaker.wait_until_available()
+
+
+async def process_update(client: RESTClientImpl, project: Project, event: ProjectItemEvent):
+    bind_log_context(node_id=event.node_id, event_type=type(event).__name__)
+    bot_logger.info("Processing event for item: %s", event.node_id)
+
+    forum_channel_id = project.route.forum_channel_id
+    shared_forum_channel = project.shared_forum_channel
+    with tracer.span("get_post_id_or_post"):
+        post_id_or_post = await get_post_id_or_post(
+            event.node_id, project.route.discord_guild_id, forum_channel_id, client, project.post_store
+        )
+    author_discord_id = await retrieve_discord_id(event.sender)
     user_mentions = [author_discord_id] if author_discord_id else []
     user_text_mention = f"<@{author_discord_id}>" if author_discord_id else "nieznany użytkownik"
 
     if post_id_or_post is None:
-        post = await create_post(event, user_text_mention, shared_forum_channel, client, user_mentions)
+        with tracer.span("create_post"):
+            post = await create_post(event, user_text_mention, project, client, user_mentions)
     elif isinstance(post_id_or_post, int):
-        post = await client.fetch_channel(post_id_or_post)
+        post = thread_cache.get(post_id_or_post)
+        if post is None:
+            post = await client.fetch_channel(post_id_or_post)
+            thread_cache.remember(post)
     else:
         post = post_id_or_post
 
@@ -63,45 +134,41 @@ async def process_update(
             bot_logger.error(f"Post with node_id {event.node_id} is not a GuildPublicThread.")
         return
 
-    message = await event.process(user_text_mention, post, client, shared_forum_channel, forum_channel_id)
+    with tracer.span("event.process"):
+        message = await event.process(user_text_mention, post, client, shared_forum_channel, forum_channel_id)
     if not message:
         return
+    # e.g. the new assignees, pinged by the same message
+    for user_mention in await event.mentioned_users():
+        if user_mention not in user_mentions:
+            user_mentions.append(user_mention)
 
-    messages = []
-    while len(message) > 2000:
-        messages.append(message[:2000])
-        message = message[2000:]
-
-    messages.append(message)
-
-    for msg in messages:
-        await client.create_message(post.id, msg, user_mentions=user_mentions)
+    if project.digest is not None:
+        project.digest.add(post.id, message, user_mentions, event)
+    else:
+        await send_message(client, post.id, message, user_mentions)
 
 
 async def create_post(
     event: ProjectItemEvent,
     user_text_mention: str,
-    shared_forum_channel: SharedForumChannel,
+    project: Project,
     client: RESTClientImpl,
     user_mentions: list[str],
 ) -> GuildPublicThread:
-    bot_logger.info(f"Post not found, creating new post for item: {event.node_id}")
-    item_name = await fetch_item_name(event.node_id)
-    message = (
-        f"Nowy task stworzony {item_name} przez: {user_text_mention}.\n"
-        f" Link do taska: {create_item_link(event.item_id)}"
+    bot_logger.info("Post not found, creating new post for item: %s", event.node_id)
+    item_name = await project_mirror.get_or_fetch(event.node_id, TITLE)
+    item_link = create_item_link(event.item_id, project.route.organization_name, project.route.project_number)
+    message = f"Nowy task stworzony {item_name} przez: {user_text_mention}.\n Link do taska: {item_link}"
+    post = await client.create_forum_post(
+        project.shared_forum_channel.forum_channel,
+        item_name,
+        message,
+        auto_archive_duration=10080,
+        user_mentions=user_mentions,
     )
-    async with shared_forum_channel.lock.reader_lock:
-        post = await client.create_forum_post(
-            shared_forum_channel.forum_channel,
-            item_name,
-            message,
-            auto_archive_duration=10080,
-            user_mentions=user_mentions,
-        )
 
-    with shelve.open(os.getenv("POST_ID_DB_PATH", "post_id.db")) as db:
-        db[event.node_id] = str(post.id)
-        print("meow", db)
+    thread_cache.remember(post)
+    await project.post_store.set(event.node_id, post.id)
 
     return post
@@ -2,15 +2,40 @@ import asyncio
 import os
 from contextlib import asynccontextmanager
 
-import dotenv
-import uvicorn
 from fastapi import FastAPI
 
-from src.bot import run
-from src.utils.misc import handle_task_exception
+from src.utils.circuit_breaker import (
+    DEFAULT_DISCORD_CALL_TIMEOUT,
+    DEFAULT_GITHUB_REQUEST_TIMEOUT,
+    discord_breaker,
+    github_breaker,
+)
+from src.utils.drain import (
+    DEFAULT_DRAIN_DEADLINE,
+    DrainSignalHandler,
+    UpdateTracker,
+    drain_updates,
+    get_journal_path,
+    load_journal,
+    save_journal,
+)
+from src.utils.loop_watchdog import LoopWatchdog
+from src.utils.misc import handle_task_exception, server_logger
+from src.utils.pipeline_health import UpdateQueue
+from src.utils.project_mirror import DEFAULT_MIRROR_TTL, project_mirror
+from src.utils.routing import load_routes
+from src.utils.signature_verification import SignatureVerifier
+from src.utils.storage import post_store, stop_post_stores
+from src.utils.structured_logging import LoggingPipeline
+from src.utils.thread_cache import DEFAULT_THREAD_CACHE_SIZE, thread_cache
+from src.utils.tracing import tracer
+from src.utils.webhook_capture import WebhookCapture
 
 
 def main():
+    import dotenv
+    import uvicorn
+
     dotenv.load_dotenv()
     host, port = os.getenv("IP_ADDRESS", "0.0.0.0"), os.getenv("PORT", "8000")
     uvicorn.run("src.server:app", host=host, port=int(port), reload=True)
@@ -19,16 +44,76 @@ def main():
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # startup
-    app.update_queue = asyncio.Queue()
-    bot_task = asyncio.create_task(run(app.update_queue))
-    bot_task.add_done_callback(lambda task: handle_task_exception(task, "Bot task crashed:"))
+    logging_pipeline = LoggingPipeline(json_format=os.getenv("LOG_FORMAT", "text") == "json")
+    logging_pipeline.start()
+    app.loop_watchdog = LoopWatchdog.from_env()
+    if app.loop_watchdog is not None:
+        app.loop_watchdog.start()
+    post_store.configure(
+        flush_interval=float(os.getenv("POST_ID_DB_FLUSH_INTERVAL", "0")),
+        batch_size=int(os.getenv("POST_ID_DB_FLUSH_BATCH_SIZE", "64")),
+    )
+    post_store.start()
+    app.signature_verifier = SignatureVerifier.from_env()
+    # GitHub caps webhook payloads at 25 MB
+    app.max_body_size = int(os.getenv("WEBHOOK_MAX_BODY_SIZE", str(25 * 1024 * 1024)))
+    app.webhook_capture = WebhookCapture.from_env()
+    app.project_routes = load_routes()
+    journal_path = get_journal_path()
+    drain_deadline = float(os.getenv("DRAIN_DEADLINE_SECONDS", str(DEFAULT_DRAIN_DEADLINE)))
+    shutdown_grace_period = float(os.getenv("SHUTDOWN_GRACE_SECONDS", "0"))
+    github_breaker.timeout = float(os.getenv("GITHUB_REQUEST_TIMEOUT", str(DEFAULT_GITHUB_REQUEST_TIMEOUT)))
+    discord_breaker.timeout = float(os.getenv("DISCORD_CALL_TIMEOUT", str(DEFAULT_DISCORD_CALL_TIMEOUT)))
+    project_mirror.ttl = float(os.getenv("PROJECT_MIRROR_TTL", str(DEFAULT_MIRROR_TTL)))
+    use_gateway = os.getenv("DISCORD_GATEWAY", "false").lower() == "true"
+    thread_cache.max_size = int(os.getenv("THREAD_CACHE_SIZE", str(DEFAULT_THREAD_CACHE_SIZE)))
+    digest_window = float(os.getenv("DIGEST_WINDOW_SECONDS", "0"))
+    tracer.configure_from_env()
+    tracer.start()
+    app.draining = False
+    # Uvicorn only runs the shutdown below once it has closed the server, draining starts with the signal instead
+    drain_signal_handler = DrainSignalHandler(lambda: setattr(app, "draining", True), shutdown_grace_period)
+    drain_signal_handler.install()
+    app.update_tracker = UpdateTracker()
+    app.update_queue = UpdateQueue()
+    # Events left over by the previous shutdown go first
+    for event in await load_journal(journal_path):
+        app.update_queue.put_nowait(event)
+    # Set by the bot once every forum channel is fetched and it starts taking events
+    app.bot_ready = asyncio.Event()
+    # The bot pulls in hikari, import it only when the server actually starts
+    from src.bot import run
+
+    app.bot_task = asyncio.create_task(
+        run(
+            app.update_queue,
+            list(app.project_routes.values()),
+            app.bot_ready,
+            app.update_tracker,
+            use_gateway=use_gateway,
+            digest_window=digest_window,
+        )
+    )
+    app.bot_task.add_done_callback(lambda task: handle_task_exception(task, "Bot task crashed:"))
+    app.mirror_sync_task = asyncio.create_task(project_mirror.sync_all(list(app.project_routes)))
+    app.mirror_sync_task.add_done_callback(lambda task: handle_task_exception(task, "Project mirror sync crashed:"))
     yield
-    # shutdown
-    bot_task.cancel()
-    try:
-        await bot_task
-    except asyncio.CancelledError:
-        pass
+    # shutdown, the bot finishes what it has
+    app.draining = True
+    drain_signal_handler.uninstall()
+    app.mirror_sync_task.cancel()
+    server_logger.info(
+        "Draining %s queued and %s in-flight updates.", app.update_queue.qsize(), len(app.update_tracker)
+    )
+    leftovers = await drain_updates(app.update_queue, app.bot_task, app.update_tracker, drain_deadline)
+    await save_journal(leftovers, journal_path)
+    await stop_post_stores()
+    await tracer.stop()
+    if app.webhook_capture is not None:
+        await asyncio.wrap_future(app.webhook_capture.close())
+    if app.loop_watchdog is not None:
+        await app.loop_watchdog.stop()
+    logging_pipeline.stop()
 
 
 if __name__ == "__main__":
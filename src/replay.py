@@ -0,0 +1,111 @@
+"""
+Re-sends webhooks captured with WEBHOOK_CAPTURE_PATH to a running instance, signed with the given secret.
+
+Run with `uv run replay-webhooks capture.jsonl.gz* --speed 2`.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from collections import Counter
+
+from src.utils.signature_verification import generate_signature
+from src.utils.webhook_capture import read_capture
+
+DEFAULT_URL = "http://127.0.0.1:8000/webhook_endpoint"
+DEFAULT_CONCURRENCY = 64
+
+
+def load_records(paths: list[str]) -> list[dict]:
+    records = [record for path in paths for record in read_capture(path)]
+    # Rotated files can be passed in any order
+    records.sort(key=lambda record: record["received_at"])
+    return records
+
+
+def replay_offsets(records: list[dict], speed: float | None) -> list[float]:
+    """
+    Seconds after the start of the replay at which each record is sent, `speed` None sends everything at once.
+    """
+    if not records or speed is None:
+        return [0.0] * len(records)
+    first = records[0]["received_at"]
+    return [(record["received_at"] - first) / speed for record in records]
+
+
+async def replay(
+    records: list[dict],
+    url: str,
+    secret: str | None,
+    speed: float | None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> tuple[Counter, list[float]]:
+    """
+    Sends the records on their schedule, returns the count of every response status and the latencies.
+    """
+    import aiohttp
+
+    statuses: Counter = Counter()
+    latencies: list[float] = []
+    slots = asyncio.Semaphore(concurrency)
+
+    async def send(session: aiohttp.ClientSession, record: dict):
+        body = record["body"].encode("utf-8")
+        headers = dict(record["headers"])
+        if secret:
+            headers["X-Hub-Signature-256"] = generate_signature(secret, body)
+        async with slots:
+            started_at = time.perf_counter()
+            try:
+                async with session.post(url, data=body, headers=headers) as response:
+                    await response.read()
+                    statuses[response.status] += 1
+            except aiohttp.ClientError as error:
+                statuses[type(error).__name__] += 1
+            latencies.append(time.perf_counter() - started_at)
+
+    async with aiohttp.ClientSession() as session:
+        start = time.monotonic()
+        tasks = []
+        for record, offset in zip(records, replay_offsets(records, speed), strict=True):
+            delay = start + offset - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(send(session, record)))
+        await asyncio.gather(*tasks)
+    return statuses, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replays captured webhooks against a running instance.")
+    parser.add_argument("paths", nargs="+", help="capture files, rotated ones included")
+    parser.add_argument("--url", default=DEFAULT_URL)
+    parser.add_argument(
+        "--secret", default=os.getenv("GITHUB_WEBHOOK_SECRET"), help="defaults to GITHUB_WEBHOOK_SECRET"
+    )
+    pacing = parser.add_mutually_exclusive_group()
+    pacing.add_argument("--speed", type=float, default=1.0, help="2 replays twice as fast as captured")
+    pacing.add_argument("--max-speed", action="store_true", help="send without waiting between webhooks")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    args = parser.parse_args()
+    if args.speed <= 0:
+        parser.error("--speed must be positive")
+
+    records = load_records(args.paths)
+    speed = None if args.max_speed else args.speed
+    started_at = time.perf_counter()
+    statuses, latencies = asyncio.run(replay(records, args.url, args.secret, speed, args.concurrency))
+    elapsed = time.perf_counter() - started_at
+
+    print(f"Replayed {len(records)} webhooks in {elapsed:.1f} s")
+    for status, count in sorted(statuses.items(), key=lambda item: str(item[0])):
+        print(f"  {status}: {count}")
+    if len(latencies) >= 2:
+        percentiles = statistics.quantiles(latencies, n=100)
+        print(f"  latency p50 {percentiles[49] * 1000:.1f} ms, p99 {percentiles[98] * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,16 @@
+import asyncio
+import hmac
 import os
+import threading
 
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import Depends, FastAPI, HTTPException, Request
+from fastapi.responses import PlainTextResponse
 from pydantic import ValidationError
 from starlette.exceptions import HTTPException as StarletteHttpException
-from starlette.responses import JSONResponse
 
 from src.main import lifespan
+from src.utils.body_history import body_history
+from src.utils.circuit_breaker import discord_breaker, github_breaker
 from src.utils.data_types import (
     ProjectItemEditedAssignees,
     ProjectItemEditedBody,
@@ -14,28 +19,38 @@ from src.utils.data_types import (
     ProjectItemEditedTitle,
     ProjectItemEvent,
     SimpleProjectItemEvent,
+    SimpleProjectItemEventType,
+    SingleSelectType,
     WebhookRequest,
 )
-from src.utils.github_api import fetch_assignees, fetch_item_name, fetch_single_select_value
+from src.utils.error import CircuitOpenError, ProfilerBusyError, RateLimitExceededError
+from src.utils.event_handlers import WILDCARD, EventHandler, event_handlers, handler_key
+from src.utils.json_backend import FastJSONResponse
 from src.utils.misc import server_logger
-from src.utils.signature_verification import verify_signature
+from src.utils.pipeline_health import discord_client_stats, github_client_stats, task_state
+from src.utils.project_mirror import ASSIGNEES, TITLE, field_key, project_mirror
+from src.utils.rate_limit import github_rate_limit
+from src.utils.sampling_profiler import MAX_PROFILE_SECONDS, format_collapsed, profiler
+from src.utils.storage import all_post_stores
+from src.utils.thread_cache import thread_cache
+from src.utils.tracing import tracer
 
-app = FastAPI(lifespan=lifespan)
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
 
 
 @app.exception_handler(StarletteHttpException)
-async def http_exception_handler(_request: Request, exception: StarletteHttpException) -> JSONResponse:
+async def http_exception_handler(_request: Request, exception: StarletteHttpException) -> FastJSONResponse:
     server_logger.error(f"HTTP exception occurred: {exception.detail}")
-    return JSONResponse(status_code=exception.status_code, content={"detail": exception.detail})
+    return FastJSONResponse(status_code=exception.status_code, content={"detail": exception.detail})
 
 
 @app.exception_handler(ValidationError)
-async def validation_exception_handler(_request: Request, exception: ValidationError) -> JSONResponse:
+async def validation_exception_handler(_request: Request, exception: ValidationError) -> FastJSONResponse:
     server_logger.error(
         f"ValidationError occurred: {exception.errors(include_url=False, include_context=False, include_input=False)}"
     )
     try:
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=400,
             content={
                 "detail": "Invalid request body.",
@@ -44,96 +59,297 @@ async def validation_exception_handler(_request: Request, exception: ValidationE
         )
     except TypeError:
         # Can happen when there is error in JSON parsing
-        return JSONResponse(status_code=400, content={"detail": "Invalid request body."})
+        return FastJSONResponse(status_code=400, content={"detail": "Invalid request body."})
+
+
+@app.exception_handler(RateLimitExceededError)
+async def rate_limit_exception_handler(_request: Request, exception: RateLimitExceededError) -> FastJSONResponse:
+    server_logger.error(str(exception))
+    return FastJSONResponse(
+        status_code=503,
+        content={"detail": "GitHub API rate limit exhausted."},
+        headers={"Retry-After": str(int(exception.retry_after) + 1)},
+    )
+
+
+@app.exception_handler(CircuitOpenError)
+async def circuit_open_exception_handler(_request: Request, exception: CircuitOpenError) -> FastJSONResponse:
+    server_logger.error(str(exception))
+    return FastJSONResponse(
+        status_code=503,
+        content={"detail": "Upstream service unavailable."},
+        headers={"Retry-After": str(int(exception.retry_after) + 1)},
+    )
 
 
 @app.exception_handler(Exception)
-async def default_exception_handler(_request: Request, exception: Exception) -> JSONResponse:
+async def default_exception_handler(_request: Request, exception: Exception) -> FastJSONResponse:
     server_logger.error(f"Unhandled exception occurred: {str(exception)}")
-    return JSONResponse(status_code=500, content={"detail": "Internal server error."})
+    return FastJSONResponse(status_code=500, content={"detail": "Internal server error."})
 
 
 @app.post("/webhook_endpoint")
-async def webhook_endpoint(request: Request) -> JSONResponse:
-    body_bytes = await request.body()
+async def webhook_endpoint(request: Request) -> FastJSONResponse:
+    if app.draining:
+        raise HTTPException(status_code=503, detail="Server is shutting down.")
+    delivery_id = request.headers.get("X-GitHub-Delivery")
+    with tracer.start_trace("webhook", delivery_id, **{"github.event": request.headers.get("X-GitHub-Event")}):
+        with tracer.span("verify_signature"):
+            body_bytes = await read_verified_body(request)
+        if app.webhook_capture is not None:
+            app.webhook_capture.record(request.headers, body_bytes)
+
+        with tracer.span("parse", size=len(body_bytes)):
+            body = WebhookRequest.model_validate_json(body_bytes)
+        if body.projects_v2_item.project_node_id not in app.project_routes:
+            raise HTTPException(status_code=400, detail="Invalid project_node_id.")
+        project_mirror.apply_webhook(body)
+
+        with tracer.span("process_action", action=body.action, node_id=body.projects_v2_item.node_id):
+            project_item_event = await process_action(body)
+        project_item_event.project_node_id = body.projects_v2_item.project_node_id
+        project_item_event.trace_parent = tracer.current_traceparent()
+        tracer.mark_queued(project_item_event.trace_parent)
+        await app.update_queue.put(project_item_event)
+
+    server_logger.info(
+        "Received webhook event for item: %s",
+        body.projects_v2_item.node_id,
+        extra={
+            "node_id": body.projects_v2_item.node_id,
+            "event_type": body.action,
+            "delivery_id": delivery_id,
+        },
+    )
+    return FastJSONResponse(content={"detail": "Successfully received webhook data"})
+
+
+async def read_verified_body(request: Request) -> bytes:
+    """
+    Streams the request body into the signature check, rejecting it as soon as it grows over the size limit.
+    """
+    content_length = request.headers.get("Content-Length")
+    if content_length is not None:
+        if not content_length.isdigit():
+            raise HTTPException(status_code=400, detail="Invalid Content-Length header.")
+        if int(content_length) == 0:
+            raise HTTPException(status_code=400, detail="Missing request body.")
+        if int(content_length) > app.max_body_size:
+            raise HTTPException(status_code=413, detail="Request body too large.")
+
+    signature = request.headers.get("X-Hub-Signature-256")
+    app.signature_verifier.check_present(signature)
+
+    streaming_signature = app.signature_verifier.begin()
+    body_bytes = bytearray()
+    async for chunk in request.stream():
+        if len(body_bytes) + len(chunk) > app.max_body_size:
+            raise HTTPException(status_code=413, detail="Request body too large.")
+        streaming_signature.update(chunk)
+        body_bytes += chunk
+
     if not body_bytes:
         raise HTTPException(status_code=400, detail="Missing request body.")
+    body_bytes = bytes(body_bytes)
+    streaming_signature.verify(signature, body_bytes)
+    return body_bytes
 
-    signature = request.headers.get("X-Hub-Signature-256")
-    verify_signature(signature, body_bytes)
 
-    body = WebhookRequest.model_validate_json(body_bytes)
-    if body.projects_v2_item.project_node_id != os.getenv("GITHUB_PROJECT_NODE_ID"):
-        raise HTTPException(status_code=400, detail="Invalid project_node_id.")
+@app.get("/healthz")
+async def healthz() -> FastJSONResponse:
+    """
+    Liveness: fails once the bot task has stopped, as nothing drains the update queue then.
+    """
+    status = pipeline_status()
+    healthy = status["bot"]["state"] == "running"
+    return FastJSONResponse(status_code=200 if healthy else 503, content=status)
+
+
+@app.get("/readyz")
+async def readyz() -> FastJSONResponse:
+    """
+    Readiness: additionally waits for the bot to fetch the forum channels of every project and for the gateway to
+    deliver their threads, fails while draining. The project mirror sync is reported but not waited for, lookups cover
+    for it.
+    """
+    status = pipeline_status()
+    ready = (
+        status["bot"]["state"] == "running"
+        and status["bot"]["ready"]
+        and status["warmup"]["gateway"] != "warming"
+        and not status["draining"]
+    )
+    return FastJSONResponse(status_code=200 if ready else 503, content=status)
+
+
+def pipeline_status() -> dict:
+    bot_ready = getattr(app, "bot_ready", None)
+    post_stores = all_post_stores()
+    return {
+        "draining": app.draining,
+        "bot": {
+            "state": task_state(getattr(app, "bot_task", None)),
+            "ready": bot_ready is not None and bot_ready.is_set(),
+        },
+        "warmup": {"project_mirror": project_mirror.sync_state, "gateway": thread_cache.gateway_state},
+        "queue": {"depth": app.update_queue.qsize(), "oldest_event_age": app.update_queue.oldest_age()},
+        "clients": {
+            "github": {**github_client_stats.snapshot(), "rate_limit": github_rate_limit.snapshot()},
+            "discord": discord_client_stats.snapshot(),
+        },
+        "breakers": {"github": github_breaker.snapshot(), "discord": discord_breaker.snapshot()},
+        "caches": {
+            "body_history": {"items": len(body_history), "bytes": body_history.size},
+            "post_ids": {
+                "cached": sum(store.cached_count for store in post_stores),
+                "pending": sum(store.pending_count for store in post_stores),
+            },
+            "project_mirror": project_mirror.snapshot(),
+            "threads": {"cached": len(thread_cache)},
+        },
+    }
+
 
-    project_item_event = await process_action(body)
-    await app.update_queue.put(project_item_event)
+def require_admin(request: Request):
+    admin_token = os.getenv("ADMIN_TOKEN")
+    if not admin_token:
+        # Admin endpoints are disabled unless a token is configured
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {admin_token}"):
+        raise HTTPException(status_code=401, detail="Invalid admin token.")
 
-    server_logger.info(f"Received webhook event for item: {body.projects_v2_item.node_id}")
-    return JSONResponse(content={"detail": "Successfully received webhook data"})
+
+@app.get("/admin/loop", dependencies=[Depends(require_admin)])
+async def loop_stats() -> FastJSONResponse:
+    loop_watchdog = getattr(app, "loop_watchdog", None)
+    if loop_watchdog is None:
+        raise HTTPException(status_code=404, detail="Loop watchdog is disabled.")
+    return FastJSONResponse(content=loop_watchdog.stats())
+
+
+@app.get("/admin/handlers", dependencies=[Depends(require_admin)])
+async def handler_table() -> FastJSONResponse:
+    return FastJSONResponse(content=event_handlers.describe())
+
+
+@app.get("/admin/profile", dependencies=[Depends(require_admin)])
+async def sample_profile(
+    seconds: float = 10.0, interval_ms: float = 5.0, all_threads: bool = False
+) -> PlainTextResponse:
+    """
+    Samples the stacks of the event loop thread, or of every thread, and returns them collapsed for a flamegraph.
+    """
+    if os.getenv("PROFILER_ENABLED", "false").lower() != "true":
+        raise HTTPException(status_code=404, detail="Profiler is disabled.")
+    if not 0 < seconds <= MAX_PROFILE_SECONDS or interval_ms < 1:
+        raise HTTPException(status_code=400, detail="Invalid profile duration or interval.")
+    if profiler.busy:
+        raise HTTPException(status_code=409, detail="A profile is already running.")
+
+    thread_ids = None if all_threads else {threading.get_ident()}
+    try:
+        stacks = await asyncio.to_thread(profiler.profile, seconds, interval_ms / 1000, thread_ids)
+    except ProfilerBusyError:
+        raise HTTPException(status_code=409, detail="A profile is already running.") from None
+    return PlainTextResponse(
+        format_collapsed(stacks), headers={"Content-Disposition": 'attachment; filename="profile.folded"'}
+    )
 
 
 async def process_action(body: WebhookRequest) -> ProjectItemEvent:
     if body.action == "edited":
         return await process_edition(body)
-    else:
-        try:
-            return SimpleProjectItemEvent(
-                body.projects_v2_item.item_id, body.projects_v2_item.node_id, body.sender.node_id, body.action
-            )
-        except ValueError as error:
-            raise HTTPException(status_code=400, detail="Unsupported action.") from error
-
-
-async def process_edition(
-    body: WebhookRequest,
-) -> (
-    ProjectItemEditedBody
-    | ProjectItemEditedTitle
-    | ProjectItemEditedAssignees
-    | ProjectItemEditedSingleSelect
-    | ProjectItemEditedDate
-):
-    editor = body.sender.node_id
-    body_changed = body.changes.body
-    item_node_id = body.projects_v2_item.node_id
-    item_id = body.projects_v2_item.item_id
-
-    if body_changed is not None:
-        project_item_edited = ProjectItemEditedBody(item_id, item_node_id, editor, body_changed.to)
-        return project_item_edited
-
-    field_changed = body.changes.field_value
-
-    if field_changed is None:
+
+    handler = event_handlers.resolve(handler_key(body))
+    if handler is None:
+        raise HTTPException(status_code=400, detail="Unsupported action.")
+    return await handler(body)
+
+
+async def process_edition(body: WebhookRequest) -> ProjectItemEvent:
+    key = handler_key(body)
+    handler = event_handlers.resolve(key)
+    if handler is None:
+        if key[1] == "single_select":
+            raise HTTPException(status_code=400, detail="Unsupported single select field.")
         raise HTTPException(status_code=400, detail="Failed to recognize the edited event.")
+    return await handler(body)
+
+
+def create_simple_event_handler(event_type: SimpleProjectItemEventType) -> EventHandler:
+    async def handle_simple_event(body: WebhookRequest) -> SimpleProjectItemEvent:
+        return SimpleProjectItemEvent(
+            body.projects_v2_item.item_id, body.projects_v2_item.node_id, body.sender.node_id, event_type
+        )
+
+    return handle_simple_event
+
+
+def create_single_select_handler(value_type: SingleSelectType) -> EventHandler:
+    async def handle_single_select(body: WebhookRequest) -> ProjectItemEditedSingleSelect:
+        node_id = body.projects_v2_item.node_id
+        new_value = body.changes.field_value.to.name
+        if new_value is None:
+            new_value = await project_mirror.get_or_fetch(node_id, field_key(value_type.value))
+        return ProjectItemEditedSingleSelect(
+            body.projects_v2_item.item_id, body.projects_v2_item.node_id, body.sender.node_id, new_value, value_type
+        )
+
+    return handle_single_select
+
+
+for simple_event_type in SimpleProjectItemEventType:
+    event_handlers.register(simple_event_type.value)(create_simple_event_handler(simple_event_type))
+
+for single_select_type in SingleSelectType:
+    event_handlers.register("edited", "single_select", single_select_type.value)(
+        create_single_select_handler(single_select_type)
+    )
+
+
+@event_handlers.register("edited", "body")
+async def handle_body(body: WebhookRequest) -> ProjectItemEditedBody:
+    return ProjectItemEditedBody(
+        body.projects_v2_item.item_id,
+        body.projects_v2_item.node_id,
+        body.sender.node_id,
+        body.changes.body.to,
+        body.changes.body.from_,
+    )
+
+
+@event_handlers.register("edited", "assignees", WILDCARD)
+async def handle_assignees(body: WebhookRequest) -> ProjectItemEditedAssignees:
+    node_id = body.projects_v2_item.node_id
+    new_assignees = await project_mirror.get_or_fetch(node_id, ASSIGNEES)
+    return ProjectItemEditedAssignees(
+        body.projects_v2_item.item_id, body.projects_v2_item.node_id, body.sender.node_id, new_assignees
+    )
+
 
-    match field_changed.field_type:
-        case "assignees":
-            new_assignees = await fetch_assignees(body.projects_v2_item.node_id)
-            project_item_edited = ProjectItemEditedAssignees(item_id, item_node_id, editor, new_assignees)
-            return project_item_edited
-        case "title":
-            new_title = await fetch_item_name(body.projects_v2_item.node_id)
-            project_item_edited = ProjectItemEditedTitle(item_id, item_node_id, editor, new_title)
-            return project_item_edited
-        case "single_select":
-            new_value = field_changed.to.name
-            field_name = field_changed.field_name
-            if new_value is None:
-                new_value = await fetch_single_select_value(body.projects_v2_item.node_id, field_name)
-            try:
-                project_item_edited = ProjectItemEditedSingleSelect(
-                    item_id, item_node_id, editor, new_value, field_name
-                )
-            except ValueError as error:
-                raise HTTPException(status_code=400, detail="Unsupported single select field.") from error
-            return project_item_edited
-        case "iteration":
-            new_value = field_changed.to.title
-            project_item_edited = ProjectItemEditedSingleSelect(item_id, item_node_id, editor, new_value, "Iteration")
-            return project_item_edited
-        case "date":
-            new_value = field_changed.to.split("T")[0]
-            project_item_edited = ProjectItemEditedDate(item_id, item_node_id, editor, new_value)
-            return project_item_edited
+@event_handlers.register("edited", "title", WILDCARD)
+async def handle_title(body: WebhookRequest) -> ProjectItemEditedTitle:
+    node_id = body.projects_v2_item.node_id
+    new_title = await project_mirror.get_or_fetch(node_id, TITLE)
+    return ProjectItemEditedTitle(
+        body.projects_v2_item.item_id, body.projects_v2_item.node_id, body.sender.node_id, new_title
+    )
+
+
+@event_handlers.register("edited", "iteration", WILDCARD)
+async def handle_iteration(body: WebhookRequest) -> ProjectItemEditedSingleSelect:
+    return ProjectItemEditedSingleSelect(
+        body.projects_v2_item.item_id,
+        body.projects_v2_item.node_id,
+        body.sender.node_id,
+        body.changes.field_value.to.title,
+        SingleSelectType.ITERATION,
+    )
+
+
+@event_handlers.register("edited", "date", WILDCARD)
+async def handle_date(body: WebhookRequest) -> ProjectItemEditedDate:
+    new_date = body.changes.field_value.to.split("T")[0]
+    return ProjectItemEditedDate(
+        body.projects_v2_item.item_id, body.projects_v2_item.node_id, body.sender.node_id, new_date
+    )
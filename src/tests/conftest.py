@@ -15,7 +15,14 @@ from hikari import (
 )
 from hikari.impl import EntityFactoryImpl, HTTPSettings, ProxySettings, RESTClientImpl
 
+from src.utils.body_history import body_history
+from src.utils.circuit_breaker import discord_breaker, github_breaker
 from src.utils.misc import SharedForumChannel
+from src.utils.project_mirror import project_mirror
+from src.utils.routing import Project, ProjectRoute
+from src.utils.storage import post_store
+from src.utils.thread_cache import thread_cache
+from src.utils.tracing import tracer
 
 
 class MockShelf(dict):
@@ -27,13 +34,15 @@ class MockShelf(dict):
 
 
 class MockResponse(dict):
+    headers = {}
+
     async def __aenter__(self):
         return self
 
     async def __aexit__(self, exc_type, exc, tb):
         pass
 
-    async def json(self):
+    async def json(self, loads=None):
         return self
 
 
@@ -50,6 +59,43 @@ class RestClientContextManagerMock:
         pass
 
 
+@pytest.fixture(autouse=True)
+def reset_circuit_breakers():
+    yield
+    github_breaker.reset()
+    discord_breaker.reset()
+
+
+@pytest.fixture(autouse=True)
+def clear_body_history():
+    body_history.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_post_store():
+    post_store.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_project_mirror():
+    project_mirror.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_thread_cache():
+    yield
+    thread_cache.clear()
+    thread_cache.forum_channel_ids.clear()
+    thread_cache.unseen_forum_channel_ids.clear()
+    thread_cache.live = False
+
+
+@pytest.fixture(autouse=True)
+def reset_tracer():
+    yield
+    tracer.reset()
+
+
 @pytest.fixture
 def post_mock():
     return PartialChannel(app=RESTAware, id=Snowflake(621), name="audacity4", type=0)
@@ -104,6 +150,11 @@ def shared_forum_channel_mock(forum_channel_mock):
     return SharedForumChannel(forum_channel_mock)
 
 
+@pytest.fixture
+def project_mock(shared_forum_channel_mock):
+    return Project(ProjectRoute("project_node_id", 1, 1), shared_forum_channel_mock, post_store)
+
+
 @pytest.fixture
 def full_post_mock():
     mock_timedelta = datetime.timedelta(seconds=0)
@@ -14,6 +14,23 @@ from src.tests.conftest import MockShelf
 from src.tests.test_integration.test_bot import RestClientContextManagerMock
 from src.utils.signature_verification import generate_signature
 
+E2E_ENVIRONMENT = {
+    "LOG_FORMAT": "text",
+    "GITHUB_WEBHOOK_SECRET": "some_secret",
+    "GITHUB_PROJECT_NODE_ID": "fake_project_id",
+    "FORUM_CHANNEL_ID": "1",
+    "DISCORD_GUILD_ID": "2",
+    "DRAIN_DEADLINE_SECONDS": "25",
+    "DISCORD_GATEWAY": "false",
+    "DIGEST_WINDOW_SECONDS": "0",
+    "TRACE_SAMPLE_RATE": "0",
+    "DISCORD_BOT_TOKEN": "some_token",
+    "POST_ID_DB_PATH": "db-path.db",
+    "GITHUB_ID_TO_DISCORD_ID_MAPPING_PATH": "meow.yaml",
+}
+# Set in a developer's shell they would change what the test starts
+UNSET_ENVIRONMENT = ["LOOP_WATCHDOG_THRESHOLD_MS", "WEBHOOK_CAPTURE_PATH", "PROJECT_ROUTES_PATH"]
+
 
 @patch("src.utils.github_api.send_request", new_callable=AsyncMock)
 @patch.object(Logger, "info")
@@ -21,7 +38,6 @@ from src.utils.signature_verification import generate_signature
 @patch("builtins.open", new_callable=mock_open, read_data="")
 @patch.object(RESTClientImpl, "fetch_active_threads", new_callable=AsyncMock)
 @patch("shelve.open")
-@patch("os.getenv")
 @patch.object(RESTClientImpl, "fetch_channel", new_callable=AsyncMock)
 @patch.object(RESTApp, "acquire")
 @patch.object(RESTApp, "start", new_callable=AsyncMock)
@@ -29,7 +45,6 @@ async def test_e2e(
     _mock_restapp_start,
     mock_restapp_acquire,
     mock_fetch_channel,
-    mock_getenv,
     mock_shelve_open,
     mock_fetch_active_threads,
     _mock_open,
@@ -39,19 +54,16 @@ async def test_e2e(
     rest_client_mock,
     forum_channel_mock,
     full_post_mock,
+    monkeypatch,
+    tmp_path,
 ):
+    for name, value in E2E_ENVIRONMENT.items():
+        monkeypatch.setenv(name, value)
+    for name in UNSET_ENVIRONMENT:
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("UPDATE_JOURNAL_PATH", str(tmp_path / "update_journal.bin"))
     mock_restapp_acquire.return_value = RestClientContextManagerMock(rest_client_mock)
     mock_fetch_channel.side_effect = [forum_channel_mock, full_post_mock]
-    mock_getenv.side_effect = [
-        "some_token",
-        1,
-        2,
-        "some_secret",
-        "fake_project_id",
-        "db-path.db",
-        "meow.yaml",
-        "db-path.db",
-    ]
     post_id_shelf = MockShelf({})
     mock_shelve_open.return_value = post_id_shelf
     mock_fetch_active_threads.return_value = [full_post_mock]
@@ -87,14 +99,14 @@ async def test_e2e(
 
     for _ in range(500):  # up to ~5 seconds total
         try:
-            mock_logger.assert_any_call("Post item123 body updated.")
+            mock_logger.assert_any_call("Post %s body updated.", "item123")
             break
         except AssertionError:
             pass
         await asyncio.sleep(0.01)
     else:
         pytest.fail("Expected log 'body updated' not found in output")
-    assert post_id_shelf.get("audacity4") == "621"
+    assert post_id_shelf.get("item123") == "621"
     mock_create_message.assert_called_with(
         621, "Opis taska zaktualizowany przez: nieznany użytkownik. Nowy opis: \nUpdated description", user_mentions=[]
     )
@@ -7,10 +7,11 @@ from hikari.impl import RESTClientImpl
 from src.bot import run
 from src.tests.conftest import MockShelf, RestClientContextManagerMock
 from src.utils.data_types import ProjectItemEvent
+from src.utils.github_api import ItemSnapshot
+from src.utils.routing import ProjectRoute
 
 
-@patch("src.bot.fetch_item_name", new_callable=AsyncMock)
-@patch("src.utils.discord_rest_client.fetch_item_name", new_callable=AsyncMock)
+@patch("src.utils.project_mirror.fetch_item_snapshot", new_callable=AsyncMock)
 @patch("builtins.open", new_callable=mock_open, read_data="")
 @patch("shelve.open")
 @patch.object(RESTClientImpl, "create_forum_post", new_callable=AsyncMock)
@@ -30,12 +31,11 @@ async def test_basic_event_only_creation(
     mock_create_forum_post,
     mock_shelve_open,
     _mock_open,
-    mock_fetch_item_name,
-    mock_fetch_item_name2,
+    mock_fetch_item_snapshot,
     rest_client_mock,
     forum_channel_mock,
 ):
-    mock_os_getenv.side_effect = ["some_token", 1, 2, "some_path", "db-path.db", "my-org", "1"]
+    mock_os_getenv.side_effect = ["some_token", "some_path", "db-path.db", "my-org", "1"]
     mock_restapp_acquire.return_value = RestClientContextManagerMock(rest_client_mock)
     mock_fetch_channel.return_value = forum_channel_mock
     mock_fetch_active_threads.return_value = []
@@ -43,12 +43,11 @@ async def test_basic_event_only_creation(
     mock_create_forum_post.return_value = None
     mock_shelve_open.return_value = MockShelf({})
     mock_create_forum_post.return_value = "created_forum_post"
-    mock_fetch_item_name.return_value = "audacity4"
-    mock_fetch_item_name2.return_value = "audacity4"
+    mock_fetch_item_snapshot.return_value = ItemSnapshot("audacity4", [])
     update_queue = asyncio.Queue()
     await update_queue.put(ProjectItemEvent(item_id=123, node_id="node_id", sender="test_sender"))
 
-    await run(update_queue, stop_after_one_event=True)
+    await run(update_queue, [ProjectRoute("project_node_id", 1, 2)], stop_after_one_event=True)
 
     for _ in range(999):  # up to ~1 seconds total
         try:
@@ -2,18 +2,36 @@ import asyncio
 import json
 import logging
 from typing import Any
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 
+import pytest
 from aiohttp import ClientSession
 from fastapi.testclient import TestClient
 
 from src.server import app
 from src.tests.conftest import MockResponse, MockShelf
-from src.utils.signature_verification import generate_signature
+from src.utils.loop_watchdog import LoopWatchdog
+from src.utils.pipeline_health import UpdateQueue
+from src.utils.routing import ProjectRoute
+from src.utils.signature_verification import SignatureVerifier, generate_signature
+from src.utils.thread_cache import thread_cache
+from src.utils.tracing import tracer
+from src.utils.webhook_capture import WebhookCapture, read_capture
 
 test_client = TestClient(app)
 test_client.app.logger = logging.getLogger("uvicorn.error")
-test_client.app.update_queue = asyncio.Queue()
+
+
+@pytest.fixture(autouse=True)
+def app_state():
+    test_client.app.project_routes = {"123": ProjectRoute("123", 1, 2)}
+    test_client.app.signature_verifier = SignatureVerifier(["some_secret"])
+    test_client.app.max_body_size = 1024
+    test_client.app.bot_task = Mock(done=Mock(return_value=False))
+    test_client.app.bot_ready = asyncio.Event()
+    test_client.app.update_queue = UpdateQueue()
+    test_client.app.draining = False
+    test_client.app.webhook_capture = None
 
 
 def test_missing_body():
@@ -54,7 +72,7 @@ def test_edited_action(mock_os_getenv, mock_shelve_open, mock_post_request):
         "sender": {"node_id": "456"},
     }
     payload: str = json.dumps(payload)
-    mock_os_getenv.side_effect = ["some_secret", "123", "some_token", "db-path.db"]
+    mock_os_getenv.side_effect = ["some_token", "db-path.db"]
     mock_shelve_open.return_value = MockShelf({"123": "Meow"})
     mock_post_request.return_value = MockResponse({"data": {"node": {"content": {"title": "Meow"}}}})
     signature = generate_signature(
@@ -69,3 +87,231 @@ def test_edited_action(mock_os_getenv, mock_shelve_open, mock_post_request):
     assert response.json() == {"detail": "Successfully received webhook data"}
     assert response.status_code == 200
     mock_post_request.assert_called()
+
+
+@patch("os.getenv")
+def test_admin_endpoint_disabled_without_token(mock_os_getenv):
+    mock_os_getenv.return_value = None
+
+    response = test_client.get("/admin/loop", headers={"Authorization": "Bearer meow"})
+    assert response.status_code == 404
+
+
+@patch("os.getenv")
+def test_admin_endpoint_invalid_token(mock_os_getenv):
+    mock_os_getenv.return_value = "admin_token"
+
+    response = test_client.get("/admin/loop", headers={"Authorization": "Bearer meow"})
+    assert response.status_code == 401
+    assert response.json() == {"detail": "Invalid admin token."}
+
+
+@patch("os.getenv")
+def test_admin_loop_stats(mock_os_getenv):
+    mock_os_getenv.return_value = "admin_token"
+    test_client.app.loop_watchdog = LoopWatchdog(threshold=0.1)
+
+    response = test_client.get("/admin/loop", headers={"Authorization": "Bearer admin_token"})
+    test_client.app.loop_watchdog = None
+    assert response.status_code == 200
+    assert response.json()["threshold_ms"] == 100
+    assert response.json()["stall_count"] == 0
+
+
+@patch("os.getenv")
+def test_admin_handler_table(mock_os_getenv):
+    mock_os_getenv.return_value = "admin_token"
+
+    response = test_client.get("/admin/handlers", headers={"Authorization": "Bearer admin_token"})
+
+    assert response.status_code == 200
+    assert {
+        "action": "edited",
+        "field_type": "single_select",
+        "field_name": "Status",
+        "handler": "src.server.create_single_select_handler.<locals>.handle_single_select",
+    } in response.json()
+
+
+@patch("os.getenv")
+def test_admin_profile_disabled(mock_os_getenv):
+    mock_os_getenv.side_effect = {"ADMIN_TOKEN": "admin_token"}.get
+
+    response = test_client.get("/admin/profile", headers={"Authorization": "Bearer admin_token"})
+
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Profiler is disabled."}
+
+
+@patch("os.getenv")
+def test_admin_profile(mock_os_getenv):
+    mock_os_getenv.side_effect = {"ADMIN_TOKEN": "admin_token", "PROFILER_ENABLED": "true"}.get
+
+    response = test_client.get(
+        "/admin/profile", params={"seconds": 0.05, "interval_ms": 1}, headers={"Authorization": "Bearer admin_token"}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["Content-Type"].startswith("text/plain")
+    for line in response.text.splitlines():
+        stack, count = line.rsplit(" ", 1)
+        assert ";" in stack
+        assert int(count) > 0
+
+
+@patch("os.getenv")
+def test_admin_profile_invalid_duration(mock_os_getenv):
+    mock_os_getenv.side_effect = {"ADMIN_TOKEN": "admin_token", "PROFILER_ENABLED": "true"}.get
+
+    response = test_client.get(
+        "/admin/profile", params={"seconds": 600}, headers={"Authorization": "Bearer admin_token"}
+    )
+
+    assert response.status_code == 400
+
+
+def test_body_over_content_length_limit():
+    payload = b"{" + b" " * 2048 + b"}"
+    response = test_client.post(
+        "/webhook_endpoint",
+        content=payload,
+        headers={"X-Hub-Signature-256": generate_signature("some_secret", payload)},
+    )
+    assert response.status_code == 413
+    assert response.json() == {"detail": "Request body too large."}
+
+
+def test_streamed_body_over_limit():
+    def chunks():
+        for _ in range(8):
+            yield b" " * 256
+
+    response = test_client.post("/webhook_endpoint", content=chunks(), headers={"X-Hub-Signature-256": "sha256=00"})
+    assert response.status_code == 413
+    assert response.json() == {"detail": "Request body too large."}
+
+
+def test_missing_signature_rejected_before_body():
+    response = test_client.post("/webhook_endpoint", content=b"{}")
+    assert response.status_code == 401
+    assert response.json() == {"detail": "Missing signature."}
+
+
+def test_invalid_signature():
+    response = test_client.post(
+        "/webhook_endpoint",
+        content=b"{}",
+        headers={"X-Hub-Signature-256": generate_signature("other_secret", b"{}")},
+    )
+    assert response.status_code == 401
+    assert response.json() == {"detail": "Invalid signature."}
+
+
+def test_healthz():
+    response = test_client.get("/healthz")
+
+    assert response.status_code == 200
+    assert response.json()["bot"] == {"state": "running", "ready": False}
+    assert response.json()["queue"] == {"depth": 0, "oldest_event_age": None}
+    assert set(response.json()["clients"]) == {"github", "discord"}
+
+
+def test_healthz_bot_crashed():
+    test_client.app.bot_task = Mock(
+        done=Mock(return_value=True), cancelled=Mock(return_value=False), exception=Mock(return_value=RuntimeError())
+    )
+
+    response = test_client.get("/healthz")
+
+    assert response.status_code == 503
+    assert response.json()["bot"]["state"] == "crashed"
+
+
+def test_readyz_waits_for_bot():
+    assert test_client.get("/readyz").status_code == 503
+
+    test_client.app.bot_ready.set()
+
+    response = test_client.get("/readyz")
+    assert response.status_code == 200
+    assert response.json()["bot"] == {"state": "running", "ready": True}
+    assert set(response.json()["warmup"]) == {"project_mirror", "gateway"}
+
+
+def test_readyz_waits_for_gateway_warmup():
+    test_client.app.bot_ready.set()
+    thread_cache.live = True
+    thread_cache.unseen_forum_channel_ids = {67}
+
+    response = test_client.get("/readyz")
+    assert response.status_code == 503
+    assert response.json()["warmup"]["gateway"] == "warming"
+
+    thread_cache.unseen_forum_channel_ids.clear()
+    assert test_client.get("/readyz").status_code == 200
+
+
+def test_webhook_refused_while_draining():
+    test_client.app.draining = True
+
+    response = test_client.post("/webhook_endpoint", content=b"{}")
+
+    assert response.status_code == 503
+    assert response.json() == {"detail": "Server is shutting down."}
+    assert test_client.get("/readyz").status_code == 503
+
+
+def test_webhook_capture(tmp_path):
+    capture_path = str(tmp_path / "capture.jsonl.gz")
+    test_client.app.webhook_capture = WebhookCapture(capture_path)
+    payload = b'{"action": "edited"}'
+
+    test_client.post(
+        "/webhook_endpoint",
+        content=payload,
+        headers={
+            "X-Hub-Signature-256": generate_signature("some_secret", payload),
+            "X-GitHub-Event": "projects_v2_item",
+        },
+    )
+    test_client.app.webhook_capture.close().result()
+
+    [record] = read_capture(capture_path)
+    assert record["body"] == payload.decode()
+    assert record["headers"]["x-github-event"] == "projects_v2_item"
+    assert "x-hub-signature-256" not in record["headers"]
+
+
+@patch.object(ClientSession, "post")
+@patch("os.getenv")
+def test_webhook_traced(mock_os_getenv, mock_post_request):
+    tracer.sample_rate = 1.0
+    payload = json.dumps({
+        "projects_v2_item": {"id": 123, "project_node_id": "123", "node_id": "123"},
+        "action": "edited",
+        "changes": {"field_value": {"field_type": "title", "field_name": "Title"}},
+        "sender": {"node_id": "456"},
+    }).encode("utf-8")
+    mock_os_getenv.side_effect = ["some_token"]
+    mock_post_request.return_value = MockResponse({"data": {"node": {"content": {"title": "Meow"}}}})
+
+    response = test_client.post(
+        "/webhook_endpoint",
+        content=payload,
+        headers={
+            "X-Hub-Signature-256": generate_signature("some_secret", payload),
+            "X-GitHub-Delivery": "72d3162e-cc78-11e3-81ab-4c9367dc0958",
+        },
+    )
+
+    assert response.status_code == 200
+    spans = {span.name: span for span in tracer.finished}
+    assert list(spans) == ["verify_signature", "parse", "github_request", "process_action", "webhook"]
+    root = spans["webhook"]
+    assert root.trace_id == "72d3162ecc7811e381ab4c9367dc0958"
+    assert root.parent_id is None
+    assert spans["github_request"].parent_id == spans["process_action"].span_id
+    assert spans["github_request"].attributes["operation"] == "item_snapshot"
+    event = test_client.app.update_queue.get_nowait()
+    assert event.trace_parent == root.traceparent
+    assert root.traceparent in tracer.queued_at
@@ -1,6 +1,6 @@
 import asyncio
 import logging
-from unittest.mock import ANY, AsyncMock, patch
+from unittest.mock import ANY, AsyncMock, Mock, patch
 
 import pytest
 from hikari import RESTApp
@@ -8,44 +8,55 @@ from hikari.impl import RESTClientImpl
 
 from src import bot
 from src.tests.conftest import MockShelf, RestClientContextManagerMock
-from src.utils.data_types import ProjectItemEditedBody, SimpleProjectItemEvent
+from src.utils.body_history import body_history
+from src.utils.circuit_breaker import CircuitState, GuardedClient, discord_breaker
+from src.utils.data_types import ProjectItemEditedAssignees, ProjectItemEditedBody, SimpleProjectItemEvent
 from src.utils.error import ForumChannelNotFound
+from src.utils.github_api import ItemSnapshot
+from src.utils.routing import Project, ProjectRoute
+from src.utils.storage import post_store
+from src.utils.thread_cache import thread_cache
+from src.utils.tracing import tracer
 
 
 @patch("shelve.open")
-@patch("src.bot.fetch_item_name", new_callable=AsyncMock)
+@patch("src.utils.project_mirror.fetch_item_snapshot", new_callable=AsyncMock)
 @patch.object(RESTClientImpl, "create_forum_post", new_callable=AsyncMock)
 async def test_create_post(
     mock_create_forum_post,
-    mock_fetch_item_name,
+    mock_fetch_item_snapshot,
     mock_shelve_open,
     rest_client_mock,
-    shared_forum_channel_mock,
+    project_mock,
     user_text_mention,
     post_mock,
 ):
-    mock_fetch_item_name.return_value = "audacity4"
+    mock_fetch_item_snapshot.return_value = ItemSnapshot("audacity4", [])
     mock_shelf = MockShelf()
     mock_shelve_open.return_value = mock_shelf
     mock_create_forum_post.return_value = post_mock
     message = f"Nowy task stworzony audacity4 przez: {user_text_mention}.\n Link do taska: https://github.com/orgs/my-org/projects/1?pane=issue&itemId=1"
     event = SimpleProjectItemEvent(1, "audacity4", "norbiros", "created")
-    await bot.create_post(event, user_text_mention, shared_forum_channel_mock, rest_client_mock, [])
+    await bot.create_post(event, user_text_mention, project_mock, rest_client_mock, [])
     mock_create_forum_post.assert_called_with(
-        shared_forum_channel_mock.forum_channel, event.node_id, message, auto_archive_duration=10080, user_mentions=[]
+        project_mock.shared_forum_channel.forum_channel,
+        event.node_id,
+        message,
+        auto_archive_duration=10080,
+        user_mentions=[],
     )
     assert mock_shelf.get("audacity4") == "621"
 
 
 @patch("src.bot.create_post", new_callable=AsyncMock)
-@patch("src.bot.retrieve_discord_id")
+@patch("src.bot.retrieve_discord_id", new_callable=AsyncMock)
 @patch("src.bot.get_post_id_or_post", new_callable=AsyncMock)
 async def test_process_no_post(
     mock_get_post_id_or_post,
     mock_retrieve_discord_id,
     mock_create_post,
     rest_client_mock,
-    shared_forum_channel_mock,
+    project_mock,
     full_post_mock,
     user_text_mention,
 ):
@@ -53,28 +64,22 @@ async def test_process_no_post(
     mock_retrieve_discord_id.return_value = "123456789012345678"
     mock_create_post.return_value = full_post_mock
     event = SimpleProjectItemEvent(1, "node_id", "norbiros", "created")
-    await bot.process_update(
-        rest_client_mock,
-        1,
-        1,
-        shared_forum_channel_mock,
-        event,
-    )
+    await bot.process_update(rest_client_mock, project_mock, event)
 
     mock_create_post.assert_called_with(
-        event, user_text_mention, shared_forum_channel_mock, rest_client_mock, ["123456789012345678"]
+        event, user_text_mention, project_mock, rest_client_mock, ["123456789012345678"]
     )
 
 
 @patch.object(RESTClientImpl, "fetch_channel", new_callable=AsyncMock)
-@patch("src.bot.retrieve_discord_id")
+@patch("src.bot.retrieve_discord_id", new_callable=AsyncMock)
 @patch("src.bot.get_post_id_or_post", new_callable=AsyncMock)
 async def test_process_post_id_found(
     mock_get_post_id_or_post,
     mock_retrieve_discord_id,
     mock_fetch_channel,
     rest_client_mock,
-    shared_forum_channel_mock,
+    project_mock,
     full_post_mock,
     user_text_mention,
 ):
@@ -82,20 +87,112 @@ async def test_process_post_id_found(
     mock_retrieve_discord_id.return_value = "123456789012345678"
     mock_fetch_channel.return_value = full_post_mock
     event = SimpleProjectItemEvent(1, "audacity4", "norbiros", "created")
-    await bot.process_update(
-        rest_client_mock,
-        1,
-        1,
-        shared_forum_channel_mock,
-        event,
-    )
+    await bot.process_update(rest_client_mock, project_mock, event)
 
     mock_fetch_channel.assert_called_with(67)
 
 
+@patch.object(SimpleProjectItemEvent, "process", new_callable=AsyncMock)
+@patch.object(RESTClientImpl, "fetch_channel", new_callable=AsyncMock)
+@patch("src.bot.retrieve_discord_id", new_callable=AsyncMock)
+@patch("src.bot.get_post_id_or_post", new_callable=AsyncMock)
+async def test_process_post_from_thread_cache(
+    mock_get_post_id_or_post,
+    mock_retrieve_discord_id,
+    mock_fetch_channel,
+    mock_process,
+    rest_client_mock,
+    project_mock,
+    full_post_mock,
+):
+    thread_cache.put(full_post_mock)
+    mock_get_post_id_or_post.return_value = full_post_mock.id
+    mock_retrieve_discord_id.return_value = "123456789012345678"
+    mock_process.return_value = None
+    event = SimpleProjectItemEvent(1, "audacity4", "norbiros", "archived")
+    await bot.process_update(rest_client_mock, project_mock, event)
+
+    mock_fetch_channel.assert_not_called()
+    assert mock_process.call_args.args[1] == full_post_mock
+
+
+@patch.object(SimpleProjectItemEvent, "process", new_callable=AsyncMock)
+@patch.object(RESTClientImpl, "fetch_channel", new_callable=AsyncMock)
+@patch("src.bot.retrieve_discord_id", new_callable=AsyncMock)
+@patch("src.bot.get_post_id_or_post", new_callable=AsyncMock)
+async def test_process_fetched_post_is_cached(
+    mock_get_post_id_or_post,
+    mock_retrieve_discord_id,
+    mock_fetch_channel,
+    mock_process,
+    rest_client_mock,
+    project_mock,
+    full_post_mock,
+):
+    mock_get_post_id_or_post.return_value = full_post_mock.id
+    mock_retrieve_discord_id.return_value = "123456789012345678"
+    mock_fetch_channel.return_value = full_post_mock
+    mock_process.return_value = None
+    event = SimpleProjectItemEvent(1, "audacity4", "norbiros", "archived")
+    await bot.process_update(rest_client_mock, project_mock, event)
+    await bot.process_update(rest_client_mock, project_mock, event)
+
+    mock_fetch_channel.assert_awaited_once_with(full_post_mock.id)
+
+
+@patch.object(RESTClientImpl, "create_message", new_callable=AsyncMock)
+@patch("src.bot.retrieve_discord_id", new_callable=AsyncMock)
+@patch("src.bot.get_post_id_or_post", new_callable=AsyncMock)
+async def test_process_message_goes_to_digest(
+    mock_get_post_id_or_post,
+    mock_retrieve_discord_id,
+    mock_create_message,
+    rest_client_mock,
+    project_mock,
+    full_post_mock,
+):
+    mock_get_post_id_or_post.return_value = full_post_mock
+    mock_retrieve_discord_id.return_value = "123456789012345678"
+    project_mock.digest = Mock()
+    event = ProjectItemEditedBody(1, "audacity4", "norbiros", "new body")
+    await bot.process_update(rest_client_mock, project_mock, event)
+
+    project_mock.digest.add.assert_called_once_with(full_post_mock.id, ANY, ["123456789012345678"], event)
+    mock_create_message.assert_not_called()
+
+
+@patch("src.utils.data_types.load_discord_id_mapping", new_callable=AsyncMock)
+@patch.object(RESTClientImpl, "create_message", new_callable=AsyncMock)
+@patch("src.bot.retrieve_discord_id", new_callable=AsyncMock)
+@patch("src.bot.get_post_id_or_post", new_callable=AsyncMock)
+async def test_process_assignees_go_to_digest(
+    mock_get_post_id_or_post,
+    mock_retrieve_discord_id,
+    mock_create_message,
+    mock_load_discord_id_mapping,
+    rest_client_mock,
+    project_mock,
+    full_post_mock,
+):
+    mock_get_post_id_or_post.return_value = full_post_mock
+    mock_retrieve_discord_id.return_value = "123456789012345678"
+    mock_load_discord_id_mapping.return_value = {"node_id1": "123", "node_id2": "123456789012345678"}
+    project_mock.digest = Mock()
+    event = ProjectItemEditedAssignees(1, "audacity4", "norbiros", ["node_id1", "node_id2"])
+    await bot.process_update(rest_client_mock, project_mock, event)
+
+    project_mock.digest.add.assert_called_once_with(
+        full_post_mock.id,
+        "Osoby przypisane do taska edytowane, aktualni przypisani: <@123>, <@123456789012345678>",
+        ["123456789012345678", "123"],
+        event,
+    )
+    mock_create_message.assert_not_called()
+
+
 @patch("src.bot.create_post", new_callable=AsyncMock)
 @patch.object(RESTClientImpl, "fetch_channel", new_callable=AsyncMock)
-@patch("src.bot.retrieve_discord_id")
+@patch("src.bot.retrieve_discord_id", new_callable=AsyncMock)
 @patch("src.bot.get_post_id_or_post", new_callable=AsyncMock)
 async def test_process_post_fetched(
     mock_get_post_id_or_post,
@@ -103,54 +200,42 @@ async def test_process_post_fetched(
     mock_fetch_channel,
     mock_create_post,
     rest_client_mock,
-    shared_forum_channel_mock,
+    project_mock,
     full_post_mock,
     user_text_mention,
 ):
     mock_get_post_id_or_post.return_value = full_post_mock
     mock_retrieve_discord_id.return_value = "123456789012345678"
     event = SimpleProjectItemEvent(1, "audacity4", "norbiros", "created")
-    await bot.process_update(
-        rest_client_mock,
-        1,
-        1,
-        shared_forum_channel_mock,
-        event,
-    )
+    await bot.process_update(rest_client_mock, project_mock, event)
 
     mock_fetch_channel.assert_not_called()
     mock_create_post.assert_not_called()
 
 
 @patch.object(logging.Logger, "error")
-@patch("src.bot.retrieve_discord_id")
+@patch("src.bot.retrieve_discord_id", new_callable=AsyncMock)
 @patch("src.bot.get_post_id_or_post", new_callable=AsyncMock)
 async def test_process_post_not_guild_public_thread(
     mock_get_post_id_or_post,
     mock_retrieve_discord_id,
     mock_logger_error,
     rest_client_mock,
-    shared_forum_channel_mock,
+    project_mock,
     post_mock,
     user_text_mention,
 ):
     mock_get_post_id_or_post.return_value = post_mock
     mock_retrieve_discord_id.return_value = "123456789012345678"
     event = SimpleProjectItemEvent(1, "audacity4", "norbiros", "created")
-    await bot.process_update(
-        rest_client_mock,
-        1,
-        1,
-        shared_forum_channel_mock,
-        event,
-    )
+    await bot.process_update(rest_client_mock, project_mock, event)
 
     mock_logger_error.assert_called_with("Post with ID 621 is not a GuildPublicThread.")
 
 
 @patch.object(SimpleProjectItemEvent, "process", new_callable=AsyncMock)
 @patch.object(RESTClientImpl, "create_message", new_callable=AsyncMock)
-@patch("src.bot.retrieve_discord_id")
+@patch("src.bot.retrieve_discord_id", new_callable=AsyncMock)
 @patch("src.bot.get_post_id_or_post", new_callable=AsyncMock)
 async def test_process_post_created_message(
     mock_get_post_id_or_post,
@@ -158,7 +243,7 @@ async def test_process_post_created_message(
     mock_create_message,
     mock_event_process,
     rest_client_mock,
-    shared_forum_channel_mock,
+    project_mock,
     full_post_mock,
     user_text_mention,
 ):
@@ -166,18 +251,12 @@ async def test_process_post_created_message(
     mock_retrieve_discord_id.return_value = "123456789012345678"
     event = SimpleProjectItemEvent(1, "audacity4", "norbiros", "archived")
     mock_event_process.return_value = "Test message content"
-    await bot.process_update(
-        rest_client_mock,
-        1,
-        1,
-        shared_forum_channel_mock,
-        event,
-    )
+    await bot.process_update(rest_client_mock, project_mock, event)
 
     mock_create_message.assert_called_with(621, "Test message content", user_mentions=["123456789012345678"])
 
 
-@patch("src.bot.retrieve_discord_id")
+@patch("src.bot.retrieve_discord_id", new_callable=AsyncMock)
 @patch.object(RESTClientImpl, "create_message", new_callable=AsyncMock)
 @patch("src.bot.get_post_id_or_post", new_callable=AsyncMock)
 async def test_process_message_over_2000_chars(
@@ -185,7 +264,7 @@ async def test_process_message_over_2000_chars(
     mock_create_message,
     mock_retrieve_discord_id,
     rest_client_mock,
-    shared_forum_channel_mock,
+    project_mock,
     full_post_mock,
     user_text_mention,
 ):
@@ -194,18 +273,12 @@ async def test_process_message_over_2000_chars(
     long_message = "A" * 4500
     event = ProjectItemEditedBody(1, "audacity4", "Norbiros", long_message)
 
-    await bot.process_update(
-        rest_client_mock,
-        1,
-        1,
-        shared_forum_channel_mock,
-        event,
-    )
+    await bot.process_update(rest_client_mock, project_mock, event)
 
     assert mock_create_message.call_count == 3
 
 
-@patch("src.bot.process_update", new_callable=AsyncMock)
+@patch("src.bot.process_project_update", new_callable=AsyncMock)
 @patch("src.bot.fetch_forum_channel", new_callable=AsyncMock)
 @patch.object(RESTApp, "acquire")
 @patch.object(RESTApp, "start", new_callable=AsyncMock)
@@ -215,18 +288,52 @@ async def test_bot_run(
     _mock_restapp_start,
     mock_restapp_acquire,
     mock_fetch_forum_channel,
-    mock_process_update,
+    mock_process_project_update,
+    rest_client_mock,
+    forum_channel_mock,
+):
+    mock_os_getenv.side_effect = ["some_token"]
+    mock_restapp_acquire.return_value = RestClientContextManagerMock(rest_client_mock)
+    mock_fetch_forum_channel.return_value = forum_channel_mock
+    state = asyncio.Queue()
+    await state.put("event")
+    ready = asyncio.Event()
+
+    await bot.run(state, [ProjectRoute("project_node_id", 1, 2)], ready, stop_after_one_event=True)
+    assert ready.is_set()
+    mock_process_project_update.assert_called_with(ANY, ANY, "event")
+    assert mock_process_project_update.call_args.args[0]._client is rest_client_mock
+    project = mock_process_project_update.call_args.args[1]
+    assert project.route == ProjectRoute("project_node_id", 1, 2)
+    assert project.shared_forum_channel.forum_channel == forum_channel_mock
+
+
+@patch("src.bot.start_gateway", new_callable=AsyncMock)
+@patch("src.bot.process_project_update", new_callable=AsyncMock)
+@patch("src.bot.fetch_forum_channel", new_callable=AsyncMock)
+@patch.object(RESTApp, "acquire")
+@patch.object(RESTApp, "start", new_callable=AsyncMock)
+@patch("os.getenv")
+async def test_bot_run_with_gateway(
+    mock_os_getenv,
+    _mock_restapp_start,
+    mock_restapp_acquire,
+    mock_fetch_forum_channel,
+    _mock_process_project_update,
+    mock_start_gateway,
     rest_client_mock,
     forum_channel_mock,
 ):
-    mock_os_getenv.side_effect = ["some_token", 1, 2]
+    mock_os_getenv.side_effect = ["some_token"]
     mock_restapp_acquire.return_value = RestClientContextManagerMock(rest_client_mock)
     mock_fetch_forum_channel.return_value = forum_channel_mock
     state = asyncio.Queue()
     await state.put("event")
 
-    await bot.run(state, stop_after_one_event=True)
-    mock_process_update.assert_called_with(rest_client_mock, 1, 2, ANY, "event")
+    await bot.run(state, [ProjectRoute("project_node_id", 1, 2)], stop_after_one_event=True, use_gateway=True)
+
+    mock_start_gateway.assert_awaited_once_with("some_token", [1])
+    mock_start_gateway.return_value.close.assert_awaited_once()
 
 
 @patch("src.bot.fetch_forum_channel", new_callable=AsyncMock)
@@ -240,13 +347,15 @@ async def test_bot_run_forum_channel_is_none(
     mock_fetch_forum_channel,
     rest_client_mock,
 ):
-    mock_os_getenv.side_effect = ["some_token", 1, 2]
+    mock_os_getenv.side_effect = ["some_token"]
     mock_restapp_acquire.return_value = RestClientContextManagerMock(rest_client_mock)
     mock_fetch_forum_channel.return_value = None
     state = asyncio.Queue()
+    ready = asyncio.Event()
 
     with pytest.raises(ForumChannelNotFound):
-        await bot.run(state, stop_after_one_event=True)
+        await bot.run(state, [ProjectRoute("project_node_id", 1, 2)], ready, stop_after_one_event=True)
+    assert not ready.is_set()
 
 
 @patch("src.bot.bot_logger.error")
@@ -265,14 +374,14 @@ async def test_bot_run_exception_during_process(
     rest_client_mock,
     forum_channel_mock,
 ):
-    mock_os_getenv.side_effect = ["some_token", 1, 2]
+    mock_os_getenv.side_effect = ["some_token"]
     mock_restapp_acquire.return_value = RestClientContextManagerMock(rest_client_mock)
     mock_fetch_forum_channel.return_value = forum_channel_mock
     mock_process_update.side_effect = Exception("Some error occurred")
     state = asyncio.Queue()
     await state.put("event")
 
-    await bot.run(state, stop_after_one_event=True)
+    await bot.run(state, [ProjectRoute("project_node_id", 1, 2)], stop_after_one_event=True)
     for _ in range(500):  # up to ~0.5 seconds total
         try:
             mock_logger_error.assert_called_with("Error processing update: Some error occurred")
@@ -282,3 +391,170 @@ async def test_bot_run_exception_during_process(
         await asyncio.sleep(0.001)
     else:
         pytest.fail("Expected log 'Error processing update: Some error occurred' not found in output")
+
+
+@patch("src.bot.process_project_update", new_callable=AsyncMock)
+@patch("src.bot.fetch_forum_channel", new_callable=AsyncMock)
+@patch.object(RESTApp, "acquire")
+@patch.object(RESTApp, "start", new_callable=AsyncMock)
+@patch("os.getenv")
+async def test_bot_run_routes_event_to_its_project(
+    mock_os_getenv,
+    _mock_restapp_start,
+    mock_restapp_acquire,
+    mock_fetch_forum_channel,
+    mock_process_project_update,
+    rest_client_mock,
+    forum_channel_mock,
+):
+    mock_os_getenv.side_effect = ["some_token"]
+    mock_restapp_acquire.return_value = RestClientContextManagerMock(rest_client_mock)
+    mock_fetch_forum_channel.return_value = forum_channel_mock
+    event = SimpleProjectItemEvent(1, "audacity4", "norbiros", "created")
+    event.project_node_id = "second"
+    state = asyncio.Queue()
+    await state.put(event)
+
+    routes = [ProjectRoute("first", 1, 2), ProjectRoute("second", 3, 2)]
+    await bot.run(state, routes, stop_after_one_event=True)
+
+    assert mock_process_project_update.call_args.args[1].route == routes[1]
+    mock_fetch_forum_channel.assert_any_call(ANY, 3)
+
+
+@patch("src.bot.process_update", new_callable=AsyncMock)
+async def test_process_project_update_limits_concurrency(mock_process_update, shared_forum_channel_mock):
+    running = []
+    max_running = 0
+
+    async def process_update(*_args):
+        nonlocal max_running
+        running.append(1)
+        max_running = max(max_running, len(running))
+        await asyncio.sleep(0.01)
+        running.pop()
+
+    mock_process_update.side_effect = process_update
+    project = Project(
+        ProjectRoute("project_node_id", 1, 1, max_concurrent_updates=2), shared_forum_channel_mock, post_store
+    )
+
+    await asyncio.gather(*(bot.process_project_update(None, project, "event") for _ in range(6)))
+
+    assert mock_process_update.call_count == 6
+    assert max_running == 2
+
+
+@patch("src.utils.circuit_breaker.PARKED_POLL_INTERVAL", 0.01)
+@patch.object(discord_breaker, "reset_timeout", 0)
+@patch("src.bot.process_update", new_callable=AsyncMock)
+async def test_process_project_update_parks_while_breaker_probes(mock_process_update, shared_forum_channel_mock):
+    async def create_message(*_args):
+        await asyncio.sleep(0.01)
+
+    client = GuardedClient(AsyncMock(create_message=AsyncMock(side_effect=create_message)), park=True)
+
+    async def process_update(update_client, *_args):
+        await update_client.create_message(621, "meow")
+
+    mock_process_update.side_effect = process_update
+    project = Project(
+        ProjectRoute("project_node_id", 1, 1, max_concurrent_updates=10), shared_forum_channel_mock, post_store
+    )
+    for _ in range(discord_breaker.failure_threshold):
+        discord_breaker.record_failure()
+    assert discord_breaker.state == CircuitState.HALF_OPEN
+    event = SimpleProjectItemEvent(1, "node_id", "norbiros", "archived")
+
+    await asyncio.wait_for(
+        asyncio.gather(*(bot.process_project_update(client, project, event) for _ in range(10))), timeout=1
+    )
+
+    assert client._client.create_message.await_count == 10
+    assert discord_breaker.state == CircuitState.CLOSED
+
+
+@patch("src.utils.circuit_breaker.PARKED_POLL_INTERVAL", 0.01)
+@patch("src.bot.retrieve_discord_id", new_callable=AsyncMock)
+@patch("src.bot.get_post_id_or_post", new_callable=AsyncMock)
+async def test_process_project_update_parks_only_the_refused_call(
+    mock_get_post_id_or_post, mock_retrieve_discord_id, project_mock, full_post_mock
+):
+    mock_get_post_id_or_post.return_value = full_post_mock
+    mock_retrieve_discord_id.return_value = None
+    client = GuardedClient(AsyncMock(), park=True)
+    body_history.put("audacity4", "old body")
+    event = ProjectItemEditedBody(1, "audacity4", "norbiros", "new body")
+    process = ProjectItemEditedBody.process
+
+    async def process_then_open_breaker(*args):
+        message = await process(*args)
+        for _ in range(discord_breaker.failure_threshold):
+            discord_breaker.record_failure()
+        return message
+
+    with patch.object(ProjectItemEditedBody, "process", process_then_open_breaker):
+        update_task = asyncio.create_task(bot.process_project_update(client, project_mock, event))
+        await asyncio.sleep(0.05)
+        client._client.create_message.assert_not_called()
+
+        discord_breaker.reset()
+        await asyncio.wait_for(update_task, timeout=1)
+
+    client._client.create_message.assert_awaited_once()
+    assert client._client.create_message.call_args.args[1].endswith("new body")
+
+
+@patch("src.bot.process_update", new_callable=AsyncMock)
+async def test_process_project_update_continues_trace(mock_process_update, project_mock):
+    tracer.sample_rate = 1.0
+    traceparent = f"00-{'ab' * 16}-{'cd' * 8}-01"
+    event = SimpleProjectItemEvent(1, "node_id", "norbiros", "archived")
+    event.trace_parent = traceparent
+
+    async def process_update(*_args):
+        with tracer.span("event.process"):
+            pass
+
+    mock_process_update.side_effect = process_update
+
+    await bot.process_project_update(None, project_mock, event)
+
+    [child, update] = tracer.finished
+    assert update.name == "update"
+    assert update.trace_id == "ab" * 16
+    assert update.parent_id == "cd" * 8
+    assert child.parent_id == update.span_id
+
+
+@patch("src.utils.circuit_breaker.PARKED_POLL_INTERVAL", 0.01)
+@patch("src.bot.process_project_update", new_callable=AsyncMock)
+@patch("src.bot.fetch_forum_channel", new_callable=AsyncMock)
+@patch.object(RESTApp, "acquire")
+@patch.object(RESTApp, "start", new_callable=AsyncMock)
+@patch("os.getenv")
+async def test_bot_run_parks_events_while_breaker_open(
+    mock_os_getenv,
+    _mock_restapp_start,
+    mock_restapp_acquire,
+    mock_fetch_forum_channel,
+    mock_process_project_update,
+    rest_client_mock,
+    forum_channel_mock,
+):
+    mock_os_getenv.side_effect = ["some_token"]
+    mock_restapp_acquire.return_value = RestClientContextManagerMock(rest_client_mock)
+    mock_fetch_forum_channel.return_value = forum_channel_mock
+    state = asyncio.Queue()
+    await state.put("event")
+    for _ in range(discord_breaker.failure_threshold):
+        discord_breaker.record_failure()
+
+    run_task = asyncio.create_task(bot.run(state, [ProjectRoute("project_node_id", 1, 2)], stop_after_one_event=True))
+    await asyncio.sleep(0.05)
+    assert state.qsize() == 1
+    mock_process_project_update.assert_not_called()
+
+    discord_breaker.reset()
+    await asyncio.wait_for(run_task, timeout=1)
+    mock_process_project_update.assert_called_once_with(ANY, ANY, "event")
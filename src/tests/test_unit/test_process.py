@@ -1,3 +1,4 @@
+import copy
 from unittest.mock import AsyncMock, mock_open, patch
 
 from hikari import ForumTag, Snowflake
@@ -10,6 +11,7 @@ from src.utils.data_types import (
     ProjectItemEditedTitle,
     SimpleProjectItemEvent,
 )
+from src.utils.thread_cache import thread_cache
 
 
 @patch.object(RESTClientImpl, "edit_channel")
@@ -100,7 +102,7 @@ async def test_project_item_edited_body(user_text_mention, post_mock, rest_clien
 @patch("builtins.open", new_callable=mock_open, read_data="node_id1: 123\nnode_id2: 321\n")
 async def test_project_item_edited_assignees(user_text_mention, post_mock, rest_client_mock, shared_forum_channel_mock):
     event = ProjectItemEditedAssignees(1, "audacity4", "norbiros", ["node_id1", "node_id2"])
-    await event.process(
+    message = await event.process(
         user_text_mention,
         post_mock,
         rest_client_mock,
@@ -108,11 +110,9 @@ async def test_project_item_edited_assignees(user_text_mention, post_mock, rest_
         shared_forum_channel_mock.forum_channel.id,
     )
 
-    rest_client_mock.create_message.assert_called_with(
-        post_mock.id,
-        "Osoby przypisane do taska edytowane, aktualni przypisani: <@123>, <@321>",
-        user_mentions=[123, 321],
-    )
+    assert message == "Osoby przypisane do taska edytowane, aktualni przypisani: <@123>, <@321>"
+    assert await event.mentioned_users() == ["123", "321"]
+    rest_client_mock.create_message.assert_not_called()
 
 
 @patch.object(RESTClientImpl, "create_message")
@@ -121,7 +121,7 @@ async def test_project_item_edited_assignees_not_in_mapping(
     user_text_mention, post_mock, rest_client_mock, shared_forum_channel_mock
 ):
     event = ProjectItemEditedAssignees(1, "audacity4", "norbiros", ["node_id1", "node_id2"])
-    await event.process(
+    message = await event.process(
         user_text_mention,
         post_mock,
         rest_client_mock,
@@ -129,9 +129,8 @@ async def test_project_item_edited_assignees_not_in_mapping(
         shared_forum_channel_mock.forum_channel.id,
     )
 
-    rest_client_mock.create_message.assert_called_with(
-        post_mock.id, "Osoby przypisane do taska edytowane, aktualni przypisani: ", user_mentions=[]
-    )
+    assert message == "Osoby przypisane do taska edytowane, aktualni przypisani: "
+    assert await event.mentioned_users() == []
 
 
 @patch.object(RESTClientImpl, "create_message")
@@ -140,7 +139,7 @@ async def test_project_item_edited_assignees_no_assignees(
     user_text_mention, post_mock, rest_client_mock, shared_forum_channel_mock
 ):
     event = ProjectItemEditedAssignees(1, "audacity4", "norbiros", [])
-    await event.process(
+    message = await event.process(
         user_text_mention,
         post_mock,
         rest_client_mock,
@@ -148,11 +147,8 @@ async def test_project_item_edited_assignees_no_assignees(
         shared_forum_channel_mock.forum_channel.id,
     )
 
-    rest_client_mock.create_message.assert_called_with(
-        post_mock.id,
-        "Osoby przypisane do taska edytowane, aktualni przypisani: Brak przypisanych osób",
-        user_mentions=[],
-    )
+    assert message == "Osoby przypisane do taska edytowane, aktualni przypisani: Brak przypisanych osób"
+    assert await event.mentioned_users() == []
 
 
 @patch.object(RESTClientImpl, "edit_channel")
@@ -191,6 +187,39 @@ async def test_project_item_edited_single_select_existing_tag(
     mock_edit_channel.assert_called_with(full_post_mock.id, applied_tags=[Snowflake(1)])
 
 
+@patch.object(RESTClientImpl, "edit_channel", new_callable=AsyncMock)
+async def test_project_item_edited_single_select_caches_edited_post(
+    mock_edit_channel,
+    user_text_mention,
+    full_post_mock,
+    rest_client_mock,
+    shared_forum_channel_mock,
+    forum_channel_mock,
+):
+    mock_edit_channel.return_value = full_post_mock
+    event = ProjectItemEditedSingleSelect(1, "audacity4", "norbiros", "smol", "Size")
+    await event.process(
+        user_text_mention,
+        full_post_mock,
+        rest_client_mock,
+        shared_forum_channel_mock,
+        forum_channel_mock.id,
+    )
+
+    assert thread_cache.get(full_post_mock.id) is full_post_mock
+
+
+@patch.object(RESTClientImpl, "delete_channel", new_callable=AsyncMock)
+async def test_simple_project_item_event_delete_uncaches_post(
+    _mock_delete_channel, user_text_mention, full_post_mock, rest_client_mock, shared_forum_channel_mock
+):
+    thread_cache.put(full_post_mock)
+    event = SimpleProjectItemEvent(1, "audacity4", "norbiros", "deleted")
+    await event.process(user_text_mention, full_post_mock, rest_client_mock, shared_forum_channel_mock, 1)
+
+    assert thread_cache.get(full_post_mock.id) is None
+
+
 @patch("src.utils.data_types.get_new_tag")
 @patch("src.utils.data_types.fetch_forum_channel", new_callable=AsyncMock)
 @patch.object(RESTClientImpl, "edit_channel")
@@ -222,3 +251,109 @@ async def test_project_item_edited_single_select_tag_unavailable(
         available_tags=[*shared_forum_channel_mock.forum_channel.available_tags, new_tag],
     )
     mock_edit_channel.assert_called_with(full_post_mock.id, applied_tags=[Snowflake(0)])
+
+
+@patch("src.utils.data_types.fetch_forum_channel", new_callable=AsyncMock)
+@patch.object(RESTClientImpl, "edit_channel", new_callable=AsyncMock)
+async def test_project_item_edited_single_select_tag_created_concurrently(
+    mock_edit_channel,
+    mock_fetch_forum_channel,
+    user_text_mention,
+    full_post_mock,
+    rest_client_mock,
+    shared_forum_channel_mock,
+    forum_channel_mock,
+):
+    [smol_tag] = forum_channel_mock.available_tags
+    medium_tag = ForumTag(id=Snowflake(2), name="Size: medium", moderated=False)
+    high_tag = ForumTag(id=Snowflake(3), name="Priority: high", moderated=False)
+
+    def forum_channel_with(*tags):
+        forum_channel = copy.copy(forum_channel_mock)
+        forum_channel.available_tags = list(tags)
+        return forum_channel
+
+    async def edit_channel(channel_id, **_kwargs):
+        if channel_id == forum_channel_mock.id and mock_edit_channel.await_count == 1:
+            # Another update publishes its tag while the first edit is in flight
+            snapshot = shared_forum_channel_mock.snapshot
+            shared_forum_channel_mock.compare_and_set(snapshot, forum_channel_with(smol_tag, high_tag))
+        return full_post_mock
+
+    mock_edit_channel.side_effect = edit_channel
+    # The first edit was based on the older tags and dropped the concurrently created one
+    mock_fetch_forum_channel.side_effect = [
+        forum_channel_with(smol_tag, medium_tag),
+        forum_channel_with(smol_tag, high_tag, medium_tag),
+    ]
+    event = ProjectItemEditedSingleSelect(1, "audacity4", "norbiros", "medium", "Size")
+
+    await event.process(
+        user_text_mention, full_post_mock, rest_client_mock, shared_forum_channel_mock, forum_channel_mock.id
+    )
+
+    assert mock_edit_channel.await_args_list[1].kwargs["available_tags"][:2] == [smol_tag, high_tag]
+    assert shared_forum_channel_mock.snapshot.version == 2
+    assert shared_forum_channel_mock.snapshot.available_tags == (smol_tag, high_tag, medium_tag)
+    mock_edit_channel.assert_awaited_with(full_post_mock.id, applied_tags=[Snowflake(2)])
+
+
+async def test_project_item_edited_body_diff(user_text_mention, post_mock, rest_client_mock, shared_forum_channel_mock):
+    old_body = "\n".join(f"Line {number} of the task description" for number in range(20))
+    new_body = old_body.replace("Line 7 of", "Line 7 (edited) of")
+    await ProjectItemEditedBody(1, "audacity4", "norbiros", old_body).process(
+        user_text_mention,
+        post_mock,
+        rest_client_mock,
+        shared_forum_channel_mock,
+        shared_forum_channel_mock.forum_channel.id,
+    )
+
+    event = ProjectItemEditedBody(1, "audacity4", "norbiros", new_body)
+    assert await event.process(
+        user_text_mention,
+        post_mock,
+        rest_client_mock,
+        shared_forum_channel_mock,
+        shared_forum_channel_mock.forum_channel.id,
+    ) == (
+        "Opis taska zaktualizowany przez: <@123456789012345678>. Zmiany w opisie: \n```diff\n"
+        "@@ -7,3 +7,3 @@\n Line 6 of the task description\n-Line 7 of the task description\n"
+        "+Line 7 (edited) of the task description\n Line 8 of the task description\n```"
+    )
+
+
+async def test_project_item_edited_body_diff_from_webhook(
+    user_text_mention, post_mock, rest_client_mock, shared_forum_channel_mock
+):
+    old_body = "\n".join(f"Line {number} of the task description" for number in range(20))
+    new_body = old_body.replace("Line 7 of", "Line 7 (edited) of")
+    # Nothing in the history, e.g. right after a restart
+    event = ProjectItemEditedBody(1, "audacity4", "norbiros", new_body, old_body)
+
+    message = await event.process(
+        user_text_mention,
+        post_mock,
+        rest_client_mock,
+        shared_forum_channel_mock,
+        shared_forum_channel_mock.forum_channel.id,
+    )
+
+    assert "Zmiany w opisie: \n```diff\n@@ -7,3 +7,3 @@" in message
+
+
+async def test_project_item_edited_body_unchanged(
+    user_text_mention, post_mock, rest_client_mock, shared_forum_channel_mock
+):
+    for expected in ["Opis taska zaktualizowany przez: <@123456789012345678>. Nowy opis: \nsame", None]:
+        event = ProjectItemEditedBody(1, "audacity4", "norbiros", "same")
+        assert (
+            await event.process(
+                user_text_mention,
+                post_mock,
+                rest_client_mock,
+                shared_forum_channel_mock,
+                shared_forum_channel_mock.forum_channel.id,
+            )
+            == expected
+        )
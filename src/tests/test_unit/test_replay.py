@@ -0,0 +1,21 @@
+from src.replay import load_records, replay_offsets
+from src.utils.webhook_capture import WebhookCapture
+
+
+def test_load_records_sorts_rotated_files(tmp_path):
+    older, newer = str(tmp_path / "capture.jsonl.gz.1"), str(tmp_path / "capture.jsonl.gz")
+    for path, received_at in ((older, 1.0), (newer, 2.0)):
+        capture = WebhookCapture(path)
+        capture.record({}, b"{}", received_at=received_at)
+        capture.close().result()
+
+    assert [record["received_at"] for record in load_records([newer, older])] == [1.0, 2.0]
+
+
+def test_replay_offsets():
+    records = [{"received_at": 100.0}, {"received_at": 101.0}, {"received_at": 104.0}]
+
+    assert replay_offsets(records, 1.0) == [0.0, 1.0, 4.0]
+    assert replay_offsets(records, 2.0) == [0.0, 0.5, 2.0]
+    assert replay_offsets(records, None) == [0.0, 0.0, 0.0]
+    assert replay_offsets([], 1.0) == []
@@ -1,8 +1,11 @@
+import subprocess
+import sys
 from unittest.mock import AsyncMock, patch
 
 import pytest
+from fastapi import HTTPException
 
-from src.server import process_action, process_edition
+from src.server import process_action, process_edition, rate_limit_exception_handler
 from src.utils.data_types import (
     Body,
     Changes,
@@ -18,6 +21,10 @@ from src.utils.data_types import (
     SimpleProjectItemEvent,
     WebhookRequest,
 )
+from src.utils.error import RateLimitExceededError
+from src.utils.event_handlers import event_handlers
+from src.utils.github_api import ItemSnapshot
+from src.utils.project_mirror import TITLE, field_key, project_mirror
 
 
 @pytest.fixture
@@ -36,26 +43,59 @@ async def test_process_edition_body_changes(mock_webhook_request_model):
     assert await process_edition(mock_webhook_request_model) == expected_object
 
 
-@patch("src.server.fetch_assignees")
-async def test_process_edition_assignees_changed(mock_fetch_assignees, mock_webhook_request_model):
+async def test_process_edition_body_keeps_previous_body(mock_webhook_request_model):
+    mock_webhook_request_model.changes = Changes(body=Body.model_validate({"from": "Pet cats", "to": "Pet more cats"}))
+
+    event = await process_edition(mock_webhook_request_model)
+
+    assert event.new_body == "Pet more cats"
+    assert event.old_body == "Pet cats"
+
+
+@patch("src.utils.project_mirror.fetch_item_snapshot", new_callable=AsyncMock)
+async def test_process_edition_assignees_changed(mock_fetch_item_snapshot, mock_webhook_request_model):
     mock_webhook_request_model.changes = Changes(field_value=FieldValue(field_name="Assignees", field_type="assignees"))
     new_assignees = ["Kubaryt", "Salieri", "Aniela"]
-    mock_fetch_assignees.return_value = new_assignees
+    mock_fetch_item_snapshot.return_value = ItemSnapshot("Meow", new_assignees)
     expected_object = ProjectItemEditedAssignees(1, "node_id", "node_id", new_assignees)
 
     assert await process_edition(mock_webhook_request_model) == expected_object
 
 
-@patch("src.server.fetch_item_name")
-async def test_process_edition_title_changed(mock_fetch_item_name, mock_webhook_request_model):
+@patch("src.utils.project_mirror.fetch_item_snapshot", new_callable=AsyncMock)
+async def test_process_edition_title_changed(mock_fetch_item_snapshot, mock_webhook_request_model):
     mock_webhook_request_model.changes = Changes(field_value=FieldValue(field_name="Title", field_type="title"))
     new_item_name = "ActuallyNotFunAtAll"
-    mock_fetch_item_name.return_value = new_item_name
+    mock_fetch_item_snapshot.return_value = ItemSnapshot(new_item_name, [])
     expected_object = ProjectItemEditedTitle(1, "node_id", "node_id", new_item_name)
 
     assert await process_edition(mock_webhook_request_model) == expected_object
 
 
+@patch("src.utils.project_mirror.fetch_item_snapshot", new_callable=AsyncMock)
+async def test_process_edition_title_from_mirror(mock_fetch_item_snapshot, mock_webhook_request_model):
+    project_mirror.set("node_id", TITLE, "ActuallyNotFunAtAll")
+    mock_webhook_request_model.changes = Changes(field_value=FieldValue(field_name="Title", field_type="title"))
+
+    event = await process_edition(mock_webhook_request_model)
+
+    assert event == ProjectItemEditedTitle(1, "node_id", "node_id", "ActuallyNotFunAtAll")
+    mock_fetch_item_snapshot.assert_not_called()
+
+
+@patch("src.utils.project_mirror.fetch_item_snapshot", new_callable=AsyncMock)
+async def test_process_edition_single_select_from_mirror(mock_fetch_item_snapshot, mock_webhook_request_model):
+    project_mirror.set("node_id", field_key("Size"), "Big")
+    mock_webhook_request_model.changes = Changes(
+        field_value=FieldValue(field_name="Size", field_type="single_select", to=FieldValueTo(title="Big"))
+    )
+
+    event = await process_edition(mock_webhook_request_model)
+
+    assert event == ProjectItemEditedSingleSelect(1, "node_id", "node_id", "Big", "Size")
+    mock_fetch_item_snapshot.assert_not_called()
+
+
 async def test_process_edition_single_select_changed(mock_webhook_request_model):
     mock_webhook_request_model.changes = Changes(
         field_value=FieldValue(
@@ -101,3 +141,54 @@ async def test_process_action_simple_event(mock_process_edition, mock_webhook_re
     mock_process_edition.return_value = test_event
 
     assert await process_action(mock_webhook_request_model) == test_event
+
+
+async def test_process_action_unsupported_action(mock_webhook_request_model):
+    mock_webhook_request_model.action = "converted"
+
+    with pytest.raises(HTTPException) as error:
+        await process_action(mock_webhook_request_model)
+
+    assert error.value.detail == "Unsupported action."
+
+
+async def test_process_edition_unsupported_single_select_field(mock_webhook_request_model):
+    mock_webhook_request_model.changes = Changes(
+        field_value=FieldValue(field_name="Team", field_type="single_select", to=FieldValueTo(name="Backend"))
+    )
+
+    with pytest.raises(HTTPException) as error:
+        await process_edition(mock_webhook_request_model)
+
+    assert error.value.detail == "Unsupported single select field."
+
+
+async def test_process_action_plugin_handler(mock_webhook_request_model):
+    mock_webhook_request_model.action = "converted"
+    test_event = SimpleProjectItemEvent(1, "node_id", "node_id", "created")
+    handler = AsyncMock(return_value=test_event)
+    event_handlers.register("converted")(handler)
+
+    try:
+        assert await process_action(mock_webhook_request_model) == test_event
+    finally:
+        event_handlers.unregister("converted")
+    handler.assert_awaited_once_with(mock_webhook_request_model)
+
+
+def test_server_import_does_not_load_hikari():
+    result = subprocess.run(
+        [sys.executable, "-c", "import sys, src.server; print('hikari' in sys.modules)"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert result.stdout.strip() == "False"
+
+
+async def test_rate_limit_exception_handler():
+    response = await rate_limit_exception_handler(None, RateLimitExceededError(59.2))
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "60"
@@ -0,0 +1,64 @@
+from src.utils import body_history
+
+
+def test_body_history_roundtrip():
+    history = body_history.BodyHistory()
+    history.put("node_id", "We need to pet more cats")
+
+    assert history.get("node_id") == "We need to pet more cats"
+    assert history.get("other_node_id") is None
+
+
+def test_body_history_compresses():
+    history = body_history.BodyHistory()
+    history.put("node_id", "meow " * 1000)
+
+    assert history.size < len("meow " * 1000)
+
+
+def test_body_history_evicts_least_recently_used():
+    history = body_history.BodyHistory(max_items=2)
+    history.put("first", "1")
+    history.put("second", "2")
+    history.get("first")
+    history.put("third", "3")
+
+    assert history.get("first") == "1"
+    assert history.get("second") is None
+    assert history.get("third") == "3"
+    assert len(history) == 2
+
+
+def test_body_history_size_cap():
+    history = body_history.BodyHistory(max_bytes=64)
+    history.put("node_id", "".join(chr(0x4E00 + i) for i in range(500)))
+
+    assert history.get("node_id") is None
+    assert history.size == 0
+
+
+def test_create_body_diff():
+    assert body_history.create_body_diff("a\nb\nc", "a\nB\nc") == "@@ -1,3 +1,3 @@\n a\n-b\n+B\n c"
+
+
+def test_get_body_diff_without_previous_body():
+    assert body_history.get_body_diff(None, "x" * 500) is None
+
+
+def test_get_body_diff_short_body():
+    assert body_history.get_body_diff("old", "new") is None
+
+
+def test_get_body_diff_larger_than_body():
+    old_body = "\n".join("a" * 10 for _ in range(30))
+    new_body = "\n".join("b" * 10 for _ in range(30))
+
+    assert body_history.get_body_diff(old_body, new_body) is None
+
+
+def test_get_body_diff_over_message_limit():
+    old_body = "\n".join(f"{number}: {'a' * 60}" for number in range(200))
+    new_body = "\n".join(f"{number}: {'a' * 60}" if number % 5 else f"{number}: {'b' * 60}" for number in range(200))
+
+    assert len(body_history.create_body_diff(old_body, new_body)) > body_history.BODY_DIFF_MAX_LENGTH
+    assert body_history.get_body_diff(old_body, new_body) is None
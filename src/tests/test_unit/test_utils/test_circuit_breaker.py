@@ -0,0 +1,160 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from hikari import ForbiddenError, HTTPError, InternalServerError
+
+from src.utils.circuit_breaker import (
+    CircuitBreaker,
+    CircuitState,
+    GuardedClient,
+    is_discord_failure,
+    is_upstream_failure,
+)
+from src.utils.error import CircuitOpenError, RateLimitExceededError
+from src.utils.pipeline_health import ClientStats
+
+
+class ResponseError(Exception):
+    def __init__(self, status: int):
+        self.status = status
+
+
+async def fail(breaker: CircuitBreaker, exception: Exception):
+    with pytest.raises(type(exception)):
+        async with breaker.guard():
+            raise exception
+
+
+async def test_opens_after_consecutive_failures():
+    breaker = CircuitBreaker("test", timeout=1, failure_threshold=2)
+
+    await fail(breaker, ConnectionError())
+    assert breaker.state == CircuitState.CLOSED
+    await fail(breaker, ResponseError(502))
+
+    assert breaker.state == CircuitState.OPEN
+    assert breaker.times_opened == 1
+    with pytest.raises(CircuitOpenError) as error:
+        async with breaker.guard():
+            pytest.fail("Guarded block ran while the breaker is open")
+    assert error.value.upstream == "test"
+    assert 0 < error.value.retry_after <= breaker.reset_timeout
+
+
+async def test_client_errors_close_the_breaker():
+    breaker = CircuitBreaker("test", timeout=1, failure_threshold=2)
+
+    await fail(breaker, ConnectionError())
+    await fail(breaker, ResponseError(404))
+    await fail(breaker, ConnectionError())
+
+    assert breaker.state == CircuitState.CLOSED
+
+
+async def test_timeout_is_a_failure():
+    breaker = CircuitBreaker("test", timeout=0.01, failure_threshold=1)
+
+    with pytest.raises(TimeoutError):
+        async with breaker.guard():
+            await asyncio.sleep(1)
+
+    assert breaker.state == CircuitState.OPEN
+
+
+@patch("src.utils.circuit_breaker.time.monotonic")
+async def test_half_open_lets_one_probe_through(mock_monotonic):
+    mock_monotonic.return_value = 100.0
+    breaker = CircuitBreaker("test", timeout=1, failure_threshold=1, reset_timeout=30)
+    await fail(breaker, ConnectionError())
+    assert not breaker.allows_requests()
+
+    mock_monotonic.return_value = 130.0
+    assert breaker.state == CircuitState.HALF_OPEN
+    async with breaker.guard():
+        assert not breaker.allows_requests()
+
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.allows_requests()
+
+
+@patch("src.utils.circuit_breaker.time.monotonic")
+async def test_failed_probe_opens_again(mock_monotonic):
+    mock_monotonic.return_value = 100.0
+    breaker = CircuitBreaker("test", timeout=1, failure_threshold=3, reset_timeout=30)
+    for _ in range(3):
+        await fail(breaker, ConnectionError())
+
+    mock_monotonic.return_value = 130.0
+    await fail(breaker, ConnectionError())
+
+    assert breaker.state == CircuitState.OPEN
+    assert breaker.retry_in() == 30
+
+
+@patch("src.utils.circuit_breaker.PARKED_POLL_INTERVAL", 0.01)
+async def test_wait_until_available():
+    breaker = CircuitBreaker("test", timeout=1, failure_threshold=1, reset_timeout=0.05)
+    await fail(breaker, ConnectionError())
+
+    await asyncio.wait_for(breaker.wait_until_available(), timeout=1)
+
+    assert breaker.state == CircuitState.HALF_OPEN
+
+
+def test_is_upstream_failure():
+    assert is_upstream_failure(TimeoutError())
+    assert is_upstream_failure(ResponseError(503))
+    assert not is_upstream_failure(ResponseError(401))
+    assert not is_upstream_failure(ValueError())
+    assert not is_upstream_failure(RateLimitExceededError(10))
+
+
+def test_is_discord_failure():
+    assert is_discord_failure(InternalServerError("url", 500, {}, b"", "Internal Server Error"))
+    assert is_discord_failure(HTTPError("Connection reset"))
+    assert not is_discord_failure(ForbiddenError("url", {}, b"", "Forbidden"))
+
+
+async def test_guarded_client_only_counts_its_own_calls():
+    breaker, stats = CircuitBreaker("test", timeout=1, failure_threshold=2), ClientStats()
+    client = AsyncMock()
+    client.create_message.side_effect = ConnectionError()
+    guarded_client = GuardedClient(client, breaker, stats)
+
+    async def update():
+        await guarded_client.fetch_channel(621)
+        # e.g. a GitHub lookup in the middle of an update
+        raise TimeoutError()
+
+    for _ in range(2):
+        with pytest.raises(TimeoutError):
+            await update()
+    assert breaker.state == CircuitState.CLOSED
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            await guarded_client.create_message(621, "meow")
+    assert breaker.state == CircuitState.OPEN
+    with pytest.raises(CircuitOpenError):
+        await guarded_client.fetch_channel(621)
+    assert client.fetch_channel.await_count == 2
+    assert stats.requests == 4
+    assert stats.failures == 2
+
+
+@patch("src.utils.circuit_breaker.PARKED_POLL_INTERVAL", 0.01)
+async def test_guarded_client_parks_refused_calls():
+    breaker = CircuitBreaker("test", timeout=1, failure_threshold=1)
+    client = AsyncMock()
+    guarded_client = GuardedClient(client, breaker, ClientStats(), park=True)
+    breaker.record_failure()
+
+    call = asyncio.create_task(guarded_client.create_message(621, "meow"))
+    await asyncio.sleep(0.05)
+    assert not call.done()
+    client.create_message.assert_not_called()
+
+    breaker.reset()
+    await asyncio.wait_for(call, timeout=1)
+    client.create_message.assert_awaited_once_with(621, "meow")
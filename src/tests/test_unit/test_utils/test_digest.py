@@ -0,0 +1,103 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+from hikari.impl import RESTClientImpl
+
+from src.utils.data_types import ProjectItemEditedBody, SimpleProjectItemEvent
+from src.utils.digest import MessageDigest, format_digest, split_digest
+from src.utils.discord_rest_client import MAX_MESSAGE_LENGTH
+
+EVENT = SimpleProjectItemEvent(1, "audacity4", "norbiros", "archived")
+
+
+def test_format_digest_single_message():
+    assert format_digest(["Tag 'Size' zaktualizowany."]) == "Tag 'Size' zaktualizowany."
+
+
+def test_format_digest_numbers_changes():
+    assert format_digest(["Pierwsza zmiana.", "Druga zmiana."]) == (
+        "Podsumowanie zmian (2):\n1. Pierwsza zmiana.\n2. Druga zmiana."
+    )
+
+
+def test_split_digest_between_messages():
+    diff = "Zmiany w opisie: \n```diff\n" + "+ linia\n" * 100 + "```"
+    messages = [diff, diff, diff, "Krótka zmiana."]
+
+    groups = split_digest(messages)
+
+    assert [len(group) for group in groups] == [2, 2]
+    assert sum(groups, []) == messages
+    assert all(len(format_digest(group)) <= MAX_MESSAGE_LENGTH for group in groups)
+
+
+def test_split_digest_long_message_alone():
+    assert split_digest(["A" * 4500, "B"]) == [["A" * 4500], ["B"]]
+
+
+@patch.object(RESTClientImpl, "create_message", new_callable=AsyncMock)
+async def test_messages_within_window_are_sent_together(mock_create_message, rest_client_mock):
+    digest = MessageDigest(rest_client_mock, 0.01)
+
+    digest.add(621, "Pierwsza zmiana.", ["1"], EVENT)
+    digest.add(621, "Druga zmiana.", ["2", "1"], EVENT)
+    digest.add(622, "Inny post.", [], EVENT)
+    await asyncio.gather(*digest.tasks)
+
+    mock_create_message.assert_any_await(
+        621, "Podsumowanie zmian (2):\n1. Pierwsza zmiana.\n2. Druga zmiana.", user_mentions=["1", "2"]
+    )
+    mock_create_message.assert_any_await(622, "Inny post.", user_mentions=[])
+    assert mock_create_message.await_count == 2
+    assert len(digest) == 0
+
+
+@patch.object(RESTClientImpl, "create_message", new_callable=AsyncMock)
+async def test_message_after_window_starts_new_digest(mock_create_message, rest_client_mock):
+    digest = MessageDigest(rest_client_mock, 0.01)
+
+    digest.add(621, "Pierwsza zmiana.", [], EVENT)
+    await asyncio.gather(*digest.tasks)
+    digest.add(621, "Druga zmiana.", [], EVENT)
+    await asyncio.gather(*digest.tasks)
+
+    assert [call.args[1] for call in mock_create_message.await_args_list] == ["Pierwsza zmiana.", "Druga zmiana."]
+
+
+@patch.object(RESTClientImpl, "create_message", new_callable=AsyncMock)
+async def test_flush_all_sends_without_waiting(mock_create_message, rest_client_mock):
+    digest = MessageDigest(rest_client_mock, 60)
+    digest.add(621, "Pierwsza zmiana.", [], EVENT)
+
+    await asyncio.wait_for(digest.flush_all(), 1)
+
+    mock_create_message.assert_awaited_once_with(621, "Pierwsza zmiana.", user_mentions=[])
+    assert not digest.tasks
+
+
+@patch.object(RESTClientImpl, "create_message", new_callable=AsyncMock)
+async def test_failed_digest_is_collected_again(mock_create_message, rest_client_mock):
+    mock_create_message.side_effect = [ConnectionError(), None]
+    digest = MessageDigest(rest_client_mock, 0.01)
+
+    digest.add(621, "Pierwsza zmiana.", [], EVENT)
+    while digest.tasks:
+        await asyncio.gather(*digest.tasks)
+
+    assert [call.args[1] for call in mock_create_message.await_args_list] == ["Pierwsza zmiana.", "Pierwsza zmiana."]
+    assert len(digest) == 0
+
+
+@patch.object(RESTClientImpl, "create_message", new_callable=AsyncMock)
+async def test_flush_all_returns_unsent_events(mock_create_message, rest_client_mock):
+    mock_create_message.side_effect = [None, ConnectionError()]
+    digest = MessageDigest(rest_client_mock, 60)
+    body_event = ProjectItemEditedBody(2, "audacity4", "norbiros", "Opis")
+    digest.add(621, "A" * 1500, [], EVENT)
+    digest.add(621, "B" * 1500, [], body_event)
+
+    unsent = await asyncio.wait_for(digest.flush_all(), 1)
+
+    assert unsent == [body_event]
+    assert mock_create_message.await_count == 2
+    assert not digest.tasks
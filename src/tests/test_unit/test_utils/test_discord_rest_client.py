@@ -5,6 +5,8 @@ from hikari.impl import RESTClientImpl
 
 from src.tests.conftest import MockShelf
 from src.utils import discord_rest_client
+from src.utils.github_api import ItemSnapshot
+from src.utils.thread_cache import thread_cache
 
 
 @patch.object(RESTClientImpl, "fetch_channel", new_callable=AsyncMock)
@@ -50,22 +52,22 @@ async def test_get_post_id_exist_in_db(mock_shelve_open, rest_client_mock):
     assert await discord_rest_client.get_post_id_or_post("node_id", 1, 1, rest_client_mock) == 621
 
 
-@patch("src.utils.discord_rest_client.fetch_item_name", new_callable=AsyncMock)
+@patch("src.utils.project_mirror.fetch_item_snapshot", new_callable=AsyncMock)
 @patch.object(RESTClientImpl, "fetch_active_threads", new_callable=AsyncMock)
 @patch("shelve.open")
 async def test_get_post_id_active_thread(
-    mock_shelve_open, mock_fetch_active_threads, mock_fetch_item_name, rest_client_mock, post_mock
+    mock_shelve_open, mock_fetch_active_threads, mock_fetch_item_snapshot, rest_client_mock, post_mock
 ):
     mock_shelf = MockShelf({})
     mock_shelve_open.return_value = mock_shelf
     mock_fetch_active_threads.return_value = [post_mock]
-    mock_fetch_item_name.return_value = "audacity4"
+    mock_fetch_item_snapshot.return_value = ItemSnapshot("audacity4", [])
 
     assert await discord_rest_client.get_post_id_or_post("node_id", 1, 1, rest_client_mock) == post_mock
-    assert mock_shelf.get("audacity4") == "621"
+    assert mock_shelf.get("node_id") == "621"
 
 
-@patch("src.utils.discord_rest_client.fetch_item_name", new_callable=AsyncMock)
+@patch("src.utils.project_mirror.fetch_item_snapshot", new_callable=AsyncMock)
 @patch.object(RESTClientImpl, "fetch_public_archived_threads", new_callable=AsyncMock)
 @patch.object(RESTClientImpl, "fetch_active_threads", new_callable=AsyncMock)
 @patch("shelve.open")
@@ -73,7 +75,7 @@ async def test_get_post_id_archived_thread(
     mock_shelve_open,
     mock_fetch_active_threads,
     mock_fetch_public_archived_threads,
-    mock_fetch_item_name,
+    mock_fetch_item_snapshot,
     rest_client_mock,
     post_mock,
 ):
@@ -81,13 +83,13 @@ async def test_get_post_id_archived_thread(
     mock_shelve_open.return_value = mock_shelf
     mock_fetch_active_threads.return_value = []
     mock_fetch_public_archived_threads.return_value = [post_mock]
-    mock_fetch_item_name.return_value = "audacity4"
+    mock_fetch_item_snapshot.return_value = ItemSnapshot("audacity4", [])
 
     assert await discord_rest_client.get_post_id_or_post("node_id", 1, 1, rest_client_mock) == post_mock
-    assert mock_shelf.get("audacity4") == "621"
+    assert mock_shelf.get("node_id") == "621"
 
 
-@patch("src.utils.discord_rest_client.fetch_item_name", new_callable=AsyncMock)
+@patch("src.utils.project_mirror.fetch_item_snapshot", new_callable=AsyncMock)
 @patch.object(RESTClientImpl, "fetch_public_archived_threads", new_callable=AsyncMock)
 @patch.object(RESTClientImpl, "fetch_active_threads", new_callable=AsyncMock)
 @patch("shelve.open")
@@ -95,7 +97,7 @@ async def test_get_post_id_none(
     mock_shelve_open,
     mock_fetch_active_threads,
     mock_fetch_public_archived_threads,
-    mock_fetch_item_name,
+    mock_fetch_item_snapshot,
     rest_client_mock,
     post_mock,
 ):
@@ -103,7 +105,25 @@ async def test_get_post_id_none(
     mock_shelve_open.return_value = mock_shelf
     mock_fetch_active_threads.return_value = []
     mock_fetch_public_archived_threads.return_value = []
-    mock_fetch_item_name.return_value = "audacity4"
+    mock_fetch_item_snapshot.return_value = ItemSnapshot("audacity4", [])
 
     assert await discord_rest_client.get_post_id_or_post("node_id", 1, 1, rest_client_mock) is None
-    assert mock_shelf.get("audacity4") is None
+    assert mock_shelf.get("node_id") is None
+
+
+@patch("src.utils.project_mirror.fetch_item_snapshot", new_callable=AsyncMock)
+@patch.object(RESTClientImpl, "fetch_active_threads", new_callable=AsyncMock)
+@patch("shelve.open")
+async def test_get_post_id_cached_thread(
+    mock_shelve_open, mock_fetch_active_threads, mock_fetch_item_snapshot, rest_client_mock, full_post_mock
+):
+    mock_shelf = MockShelf({})
+    mock_shelve_open.return_value = mock_shelf
+    mock_fetch_item_snapshot.return_value = ItemSnapshot("audacity4", [])
+    thread_cache.put(full_post_mock)
+
+    post = await discord_rest_client.get_post_id_or_post("node_id", 1, full_post_mock.parent_id, rest_client_mock)
+
+    assert post == full_post_mock
+    assert mock_shelf.get("node_id") == "621"
+    mock_fetch_active_threads.assert_not_called()
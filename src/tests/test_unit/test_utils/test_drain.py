@@ -0,0 +1,158 @@
+import asyncio
+import signal
+from unittest.mock import Mock, patch
+
+from src.utils.data_types import ProjectItemEditedTitle, SimpleProjectItemEvent
+from src.utils.drain import DrainSignalHandler, UpdateTracker, drain_updates, load_journal, save_journal
+
+
+async def consume(queue: asyncio.Queue, tracker: UpdateTracker, update_time: float):
+    while True:
+        event = await queue.get()
+        tracker.track(asyncio.create_task(asyncio.sleep(update_time)), event)
+
+
+async def test_update_tracker_forgets_finished_updates():
+    tracker = UpdateTracker()
+    task = asyncio.create_task(asyncio.sleep(0))
+    tracker.track(task, SimpleProjectItemEvent(1, "node_id", "sender", "created"))
+    assert len(tracker) == 1
+
+    await task
+    await asyncio.sleep(0)
+    assert len(tracker) == 0
+
+
+async def test_drain_finishes_queued_updates():
+    queue, tracker = asyncio.Queue(), UpdateTracker()
+    for item_id in range(3):
+        queue.put_nowait(SimpleProjectItemEvent(item_id, "node_id", "sender", "created"))
+    bot_task = asyncio.create_task(consume(queue, tracker, 0.01))
+
+    leftovers = await drain_updates(queue, bot_task, tracker, deadline=5)
+
+    assert leftovers == []
+    assert bot_task.cancelled()
+
+
+async def test_drain_returns_unfinished_updates_after_deadline():
+    queue, tracker = asyncio.Queue(), UpdateTracker()
+    in_flight = SimpleProjectItemEvent(1, "in_flight", "sender", "created")
+    queued = SimpleProjectItemEvent(2, "queued", "sender", "created")
+    queue.put_nowait(in_flight)
+    bot_task = asyncio.create_task(consume(queue, tracker, 10))
+    await asyncio.sleep(0)
+    queue.put_nowait(queued)
+    # The bot dies before taking the second event
+    bot_task.cancel()
+
+    leftovers = await drain_updates(queue, bot_task, tracker, deadline=0.1)
+
+    assert [event.node_id for event in leftovers] == ["in_flight", "queued"]
+    assert len(tracker) == 0
+
+
+async def test_drain_returns_unsent_messages():
+    queue, tracker = asyncio.Queue(), UpdateTracker()
+    unsent = SimpleProjectItemEvent(1, "unsent", "sender", "archived")
+
+    async def bot():
+        try:
+            await asyncio.sleep(10)
+        finally:
+            # e.g. a digest that could not be sent on shutdown
+            tracker.unsent.append(unsent)
+
+    bot_task = asyncio.create_task(bot())
+    await asyncio.sleep(0)
+
+    assert await drain_updates(queue, bot_task, tracker, deadline=0.1) == [unsent]
+
+
+async def test_journal_roundtrip(tmp_path):
+    path = str(tmp_path / "journal.bin")
+    event = ProjectItemEditedTitle(1, "node_id", "sender", "New title")
+    event.project_node_id = "project_node_id"
+
+    await save_journal([event], path)
+    restored = await load_journal(path)
+
+    assert len(restored) == 1
+    assert (restored[0].node_id, restored[0].new_title, restored[0].project_node_id) == (
+        "node_id",
+        "New title",
+        "project_node_id",
+    )
+    assert not (tmp_path / "journal.bin").exists()
+    assert await load_journal(path) == []
+
+
+async def test_save_journal_skips_empty(tmp_path):
+    await save_journal([], str(tmp_path / "journal.bin"))
+
+    assert not (tmp_path / "journal.bin").exists()
+
+
+async def test_load_corrupt_journal(tmp_path):
+    (tmp_path / "journal.bin").write_bytes(b"\x05not an event")
+
+    assert await load_journal(str(tmp_path / "journal.bin")) == []
+    assert (tmp_path / "journal.bin.corrupt").read_bytes() == b"\x05not an event"
+
+
+async def test_drain_signal_handler_waits_for_grace_period():
+    on_drain, previous_handler = Mock(), Mock()
+    handler = DrainSignalHandler(on_drain, grace_period=0.05)
+    handler.previous_handlers[signal.SIGTERM] = previous_handler
+    handler._loop = asyncio.get_running_loop()
+
+    handler.handle(signal.SIGTERM, None)
+    await asyncio.sleep(0)
+
+    on_drain.assert_called_once()
+    previous_handler.assert_not_called()
+    await asyncio.sleep(0.1)
+    previous_handler.assert_called_once_with(signal.SIGTERM, None)
+
+
+async def test_drain_signal_handler_logs_on_the_loop():
+    handler = DrainSignalHandler(Mock(), grace_period=60)
+    handler.previous_handlers[signal.SIGTERM] = Mock()
+    handler._loop = asyncio.get_running_loop()
+
+    with patch("src.utils.drain.bot_logger") as mock_logger:
+        handler.handle(signal.SIGTERM, None)
+        mock_logger.info.assert_not_called()
+        await asyncio.sleep(0)
+
+    mock_logger.info.assert_called_once_with("Draining for %s s before shutting down.", 60)
+
+
+async def test_drain_signal_handler_passes_second_signal_on():
+    previous_handler = Mock()
+    handler = DrainSignalHandler(Mock(), grace_period=60)
+    handler.previous_handlers[signal.SIGINT] = previous_handler
+    handler._loop = asyncio.get_running_loop()
+
+    handler.handle(signal.SIGINT, None)
+    handler.handle(signal.SIGINT, None)
+
+    previous_handler.assert_called_once_with(signal.SIGINT, None)
+
+
+async def test_drain_signal_handler_install():
+    uvicorn_handler = Mock()
+    original_handler = signal.signal(signal.SIGTERM, uvicorn_handler)
+    handler = DrainSignalHandler(Mock(), grace_period=0)
+    try:
+        handler.install()
+        assert signal.getsignal(signal.SIGTERM) == handler.handle
+
+        signal.raise_signal(signal.SIGTERM)
+
+        handler.on_drain.assert_called_once()
+        uvicorn_handler.assert_called_once()
+        handler.uninstall()
+        assert signal.getsignal(signal.SIGTERM) is uvicorn_handler
+    finally:
+        signal.signal(signal.SIGTERM, original_handler)
@@ -0,0 +1,122 @@
+import pytest
+
+from src.utils.data_types import (
+    ProjectItemEditedAssignees,
+    ProjectItemEditedBody,
+    ProjectItemEditedDate,
+    ProjectItemEditedSingleSelect,
+    ProjectItemEditedTitle,
+    ProjectItemEvent,
+    SimpleProjectItemEvent,
+)
+from src.utils.error import EventDecodeError
+from src.utils.event_codec import (
+    FORMAT_VERSION,
+    decode_event,
+    decode_events,
+    encode_event,
+    encode_events,
+    register_event,
+    slot_names,
+)
+
+EVENTS = [
+    ProjectItemEvent(1, "node_id", "sender"),
+    SimpleProjectItemEvent(1, "audacity4", "norbiros", "archived"),
+    ProjectItemEditedBody(2, "audacity4", "norbiros", "Zażółć gęślą jaźń\n" * 20),
+    ProjectItemEditedAssignees(3, "audacity4", "norbiros", ["MDQ6VXNlcjE=", "MDQ6VXNlcjI="]),
+    ProjectItemEditedAssignees(4, "audacity4", "norbiros", []),
+    ProjectItemEditedTitle(5, "audacity4", "norbiros", "New title"),
+    ProjectItemEditedSingleSelect(6, "audacity4", "norbiros", "In Progress", "Status"),
+    ProjectItemEditedDate(2**40, "audacity4", "norbiros", "2025-10-19"),
+]
+
+
+def event_state(event: ProjectItemEvent) -> tuple:
+    return type(event), tuple(getattr(event, name) for name in slot_names(type(event)))
+
+
+@pytest.mark.parametrize("event", EVENTS, ids=lambda event: type(event).__name__)
+def test_event_roundtrip(event):
+    event.project_node_id = "PVT_kwDOCvlHWc4A1a2B"
+
+    decoded = decode_event(encode_event(event))
+
+    assert event_state(decoded) == event_state(event)
+
+
+@pytest.mark.parametrize("event", EVENTS, ids=lambda event: type(event).__name__)
+def test_events_have_no_instance_dict(event):
+    assert not hasattr(event, "__dict__")
+
+
+def test_encoded_event_is_compact():
+    event = SimpleProjectItemEvent(123456, "PVTI_lADOCvlHWc4A1a2BzgXz9Yk", "MDQ6VXNlcjg4MjY4MDYz", "created")
+
+    # Version, tag, 4 value tags, the enum tag and the two strings of the payload
+    assert len(encode_event(event)) < 80
+
+
+def test_negative_and_float_values():
+    event = ProjectItemEditedDate(-300, "node_id", "sender", "2025-10-19")
+    event.new_date = 1.5
+
+    decoded = decode_event(encode_event(event))
+
+    assert decoded.item_id == -300
+    assert decoded.new_date == 1.5
+
+
+def test_events_stream_roundtrip():
+    decoded = decode_events(encode_events(EVENTS))
+
+    assert [event_state(event) for event in decoded] == [event_state(event) for event in EVENTS]
+
+
+def test_decode_events_empty():
+    assert decode_events(b"") == []
+
+
+def test_encode_unregistered_event():
+    class UnregisteredEvent(ProjectItemEvent):
+        __slots__ = ()
+
+    with pytest.raises(TypeError):
+        encode_event(UnregisteredEvent(1, "node_id", "sender"))
+
+
+def test_encode_unsupported_value():
+    event = ProjectItemEditedTitle(1, "node_id", "sender", "title")
+    event.new_title = {"title": "dict"}
+
+    with pytest.raises(TypeError):
+        encode_event(event)
+
+
+def test_register_duplicate_tag():
+    with pytest.raises(ValueError):
+        register_event(1)(type("Duplicate", (), {}))
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"",
+        bytes([FORMAT_VERSION + 1, 1]),
+        bytes([FORMAT_VERSION, 127]),
+        encode_event(EVENTS[1])[:-3],
+        encode_event(EVENTS[1]) + b"\x00",
+        bytes([FORMAT_VERSION, 1, 0xFF]),
+        encode_event(EVENTS[0]).replace(b"node_id", b"\xffode_id"),
+        encode_event(EVENTS[6]).replace(b"Status", b"Statux"),
+    ],
+    ids=["empty", "version", "unknown_tag", "truncated", "trailing", "unknown_value_tag", "utf8", "enum_value"],
+)
+def test_decode_invalid_event(data):
+    with pytest.raises(EventDecodeError):
+        decode_event(data)
+
+
+def test_decode_truncated_stream():
+    with pytest.raises(EventDecodeError):
+        decode_events(encode_events(EVENTS)[:-1])
@@ -0,0 +1,89 @@
+import pytest
+
+from src.utils.data_types import Body, Changes, FieldValue, FieldValueTo, ProjectV2Item, Sender, WebhookRequest
+from src.utils.event_handlers import WILDCARD, EventHandlerRegistry, handler_key
+
+
+def create_request(action: str, changes: Changes | None = None) -> WebhookRequest:
+    return WebhookRequest(
+        projects_v2_item=ProjectV2Item(id=1, project_node_id="project_node_id", node_id="node_id"),
+        action=action,
+        sender=Sender(node_id="sender"),
+        changes=changes,
+    )
+
+
+async def handle(_body):
+    return None
+
+
+async def handle_other(_body):
+    return None
+
+
+def test_handler_key_simple_action():
+    assert handler_key(create_request("archived")) == ("archived", None, None)
+
+
+def test_handler_key_body():
+    assert handler_key(create_request("edited", Changes(body=Body(to="body")))) == ("edited", "body", None)
+
+
+def test_handler_key_field_value():
+    changes = Changes(field_value=FieldValue(field_type="single_select", field_name="Size", to=FieldValueTo(name="L")))
+
+    assert handler_key(create_request("edited", changes)) == ("edited", "single_select", "Size")
+
+
+def test_resolve_exact_key():
+    registry = EventHandlerRegistry()
+    registry.register("edited", "single_select", "Size")(handle)
+
+    assert registry.resolve(("edited", "single_select", "Size")) is handle
+    assert registry.resolve(("edited", "single_select", "Team")) is None
+
+
+def test_resolve_wildcard_field_name():
+    registry = EventHandlerRegistry()
+    registry.register("edited", "single_select", WILDCARD)(handle)
+    registry.register("edited", "single_select", "Size")(handle_other)
+
+    assert registry.resolve(("edited", "single_select", "Team")) is handle
+    assert registry.resolve(("edited", "single_select", "Size")) is handle_other
+    assert registry.resolve(("edited", "date", "Team")) is None
+
+
+def test_wildcard_does_not_match_missing_field():
+    registry = EventHandlerRegistry()
+    registry.register("archived", WILDCARD, WILDCARD)(handle)
+
+    assert registry.resolve(("archived", None, None)) is None
+
+
+def test_register_duplicate():
+    registry = EventHandlerRegistry()
+    registry.register("archived")(handle)
+
+    with pytest.raises(ValueError):
+        registry.register("archived")(handle_other)
+
+    registry.register("archived", replace=True)(handle_other)
+    assert registry.resolve(("archived", None, None)) is handle_other
+
+
+def test_unregister():
+    registry = EventHandlerRegistry()
+    registry.register("archived")(handle)
+    registry.unregister("archived")
+
+    assert ("archived", None, None) not in registry
+    assert len(registry) == 0
+
+
+def test_describe():
+    registry = EventHandlerRegistry()
+    registry.register("edited", "date", WILDCARD)(handle)
+
+    assert registry.describe() == [
+        {"action": "edited", "field_type": "date", "field_name": WILDCARD, "handler": f"{__name__}.handle"}
+    ]
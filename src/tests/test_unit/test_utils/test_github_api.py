@@ -3,80 +3,120 @@ from unittest.mock import AsyncMock, patch
 import pytest
 from fastapi import HTTPException
 
+from src.tests.conftest import MockResponse
 from src.utils import github_api
+from src.utils.error import RateLimitExceededError
+from src.utils.rate_limit import Priority
 
 
 @patch("src.utils.github_api.send_request", new_callable=AsyncMock)
-async def test_fetch_item_name_success(mock_send_request):
-    mock_send_request.return_value = {"data": {"node": {"content": {"title": "42"}}}}
+async def test_fetch_item_snapshot(mock_send_request):
+    mock_send_request.return_value = {
+        "data": {
+            "node": {
+                "content": {"title": "42", "assignees": {"nodes": [{"id": "MDQ6VXNlcjg4MjY4MDYz"}]}},
+                "fieldValues": {
+                    "nodes": [
+                        {},
+                        {"name": "In Progress", "field": {"name": "Status"}},
+                        {"title": "Sprint 3", "field": {"name": "Iteration"}},
+                    ]
+                },
+            }
+        }
+    }
 
-    assert await github_api.fetch_item_name("<node_id>") == "42"
+    snapshot = await github_api.fetch_item_snapshot("<node_id>")
 
+    assert snapshot == github_api.ItemSnapshot(
+        "42", ["MDQ6VXNlcjg4MjY4MDYz"], {"Status": "In Progress", "Iteration": "Sprint 3"}
+    )
+    assert mock_send_request.call_args.args[1] == {"id": "<node_id>"}
 
-@patch("src.utils.github_api.send_request", new_callable=AsyncMock)
-async def test_fetch_item_name_partial(mock_send_request):
-    mock_send_request.return_value = {"data": {"node": {"content": None}}}
 
-    with pytest.raises(HTTPException) as exception:
-        await github_api.fetch_item_name("<node_id>")
+@patch("src.utils.github_api.send_request", new_callable=AsyncMock)
+async def test_fetch_item_snapshot_partial(mock_send_request):
+    mock_send_request.return_value = {"data": {"node": {"content": None, "fieldValues": None}}}
 
-    assert exception.value.status_code == 500
-    assert exception.value.detail == "Could not fetch item name."
+    assert await github_api.fetch_item_snapshot("<node_id>") == github_api.ItemSnapshot(None, [], {})
 
 
 @patch("src.utils.github_api.send_request", new_callable=AsyncMock)
-async def test_fetch_item_name_none(mock_send_request):
+async def test_fetch_item_snapshot_none(mock_send_request):
     mock_send_request.return_value = {}
 
     with pytest.raises(HTTPException) as exception:
-        await github_api.fetch_item_name("<node_id>")
-    assert exception.value.status_code == 500
-    assert exception.value.detail == "Could not fetch item name."
+        await github_api.fetch_item_snapshot("<node_id>")
+    assert exception.value.detail == "Could not fetch item."
 
 
 @patch("src.utils.github_api.send_request", new_callable=AsyncMock)
-async def test_fetch_assignees_success(mock_send_request):
+async def test_fetch_project_items(mock_send_request):
     mock_send_request.return_value = {
         "data": {
             "node": {
-                "content": {"assignees": {"nodes": [{"id": "MDQ6VXNlcjg4MjY4MDYz"}, {"id": "MDQ6VXNlcjg5ODM3NzI0"}]}}
+                "items": {
+                    "pageInfo": {"hasNextPage": True, "endCursor": "Y3Vyc29y"},
+                    "nodes": [
+                        {
+                            "id": "PVTI_1",
+                            "type": "ISSUE",
+                            "content": {"title": "42", "assignees": {"nodes": []}},
+                            "fieldValues": {"nodes": [{"name": "Todo", "field": {"name": "Status"}}]},
+                        },
+                        None,
+                        {"id": "PVTI_2", "type": "REDACTED", "content": None},
+                    ],
+                }
             }
         }
     }
 
-    assert await github_api.fetch_assignees("<node_id>") == ["MDQ6VXNlcjg4MjY4MDYz", "MDQ6VXNlcjg5ODM3NzI0"]
-
-
-@patch("src.utils.github_api.send_request", new_callable=AsyncMock)
-async def test_fetch_assignees_partial(mock_send_request):
-    mock_send_request.return_value = {"data": {"node": {"content": None}}}
+    page = await github_api.fetch_project_items("<project_id>", "cursor")
 
-    assert await github_api.fetch_assignees("<node_id>") == []
+    assert page.items == [
+        ("PVTI_1", "ISSUE", github_api.ItemSnapshot("42", [], {"Status": "Todo"})),
+        ("PVTI_2", "REDACTED", github_api.ItemSnapshot(None, [], {})),
+    ]
+    assert page.next_cursor == "Y3Vyc29y"
+    assert mock_send_request.call_args.args[1:] == (
+        {"project": "<project_id>", "cursor": "cursor"},
+        Priority.BACKGROUND,
+    )
 
 
 @patch("src.utils.github_api.send_request", new_callable=AsyncMock)
-async def test_fetch_assignees_none(mock_send_request):
-    mock_send_request.return_value = {}
-
-    assert await github_api.fetch_assignees("<node_id>") == []
+async def test_fetch_project_items_last_page(mock_send_request):
+    mock_send_request.return_value = {
+        "data": {"node": {"items": {"pageInfo": {"hasNextPage": False, "endCursor": "Y3Vyc29y"}, "nodes": []}}}
+    }
 
+    page = await github_api.fetch_project_items("<project_id>")
 
-@patch("src.utils.github_api.send_request", new_callable=AsyncMock)
-async def test_fetch_single_select_value_success(mock_send_request):
-    mock_send_request.return_value = {"data": {"node": {"fieldValueByName": {"name": "Dziengiel"}}}}
-
-    assert await github_api.fetch_single_select_value("<node_id>", "Salieri") == "Dziengiel"
+    assert page.items == []
+    assert page.next_cursor is None
 
 
 @patch("src.utils.github_api.send_request", new_callable=AsyncMock)
-async def test_fetch_single_select_value_partial(mock_send_request):
-    mock_send_request.return_value = {"data": {"node": {"fieldValueByName": None}}}
+async def test_fetch_project_items_not_a_project(mock_send_request):
+    mock_send_request.return_value = {"data": {"node": {}}}
 
-    assert await github_api.fetch_single_select_value("<node_id>", "Salieri") is None
+    with pytest.raises(HTTPException) as exception:
+        await github_api.fetch_project_items("<project_id>")
+    assert exception.value.detail == "Could not fetch project items."
 
 
-@patch("src.utils.github_api.send_request", new_callable=AsyncMock)
-async def test_fetch_single_select_value_none(mock_send_request):
-    mock_send_request.return_value = {}
+@patch("src.utils.github_api.github_rate_limit")
+@patch("aiohttp.ClientSession.post")
+async def test_send_request_rate_limited(mock_post, mock_rate_limit):
+    mock_rate_limit.acquire = AsyncMock()
+    mock_rate_limit.update_from_body.return_value = True
+    mock_rate_limit.seconds_until_reset.return_value = 120
+    mock_post.return_value = MockResponse({"errors": [{"type": "RATE_LIMITED"}]})
+
+    with pytest.raises(RateLimitExceededError) as error:
+        await github_api.send_request("{ viewer { login } }", {}, Priority.BACKGROUND)
 
-    assert await github_api.fetch_single_select_value("<node_id>", "Salieri") is None
+    assert error.value.retry_after == 120
+    mock_rate_limit.acquire.assert_awaited_once_with(Priority.BACKGROUND)
+    mock_rate_limit.update_from_headers.assert_called_once_with({})
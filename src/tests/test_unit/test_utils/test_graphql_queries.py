@@ -0,0 +1,66 @@
+import pytest
+
+from src.utils.error import InvalidQueryError
+from src.utils.graphql_queries import PROJECT_ITEMS, QueryRegistry, minify, queries, validate
+
+
+def test_minify():
+    document = """
+    # Item title
+    query ($id: ID!, $first: Int = 10) {
+      node(id: $id) {
+        ... on ProjectV2Item {
+          content { title }
+          fieldValueByName(name: "Status, with comma") { ... on ProjectV2ItemFieldSingleSelectValue { name } }
+        }
+      }
+    }
+    """
+
+    assert minify(document) == (
+        "query($id:ID!$first:Int=10){node(id:$id){...on ProjectV2Item{content{title}"
+        'fieldValueByName(name:"Status, with comma"){...on ProjectV2ItemFieldSingleSelectValue{name}}}}}'
+    )
+
+
+def test_minify_invalid_character():
+    with pytest.raises(InvalidQueryError):
+        minify("query { node(id: %) }")
+
+
+@pytest.mark.parametrize(
+    "document",
+    [
+        "node { id }",
+        "query ($id: ID!) { node(id: $id) { id }",
+        "query ($id: ID!) { node(id: $id) { id ] }",
+        "query { node(id: $id) { id } }",
+        "query ($id: ID!, $name: String!) { node(id: $id) { id } }",
+    ],
+    ids=["no_operation", "unclosed", "mismatched", "undeclared_variable", "unused_variable"],
+)
+def test_validate_invalid(document):
+    with pytest.raises(InvalidQueryError):
+        validate("test", minify(document))
+
+
+def test_registered_queries_are_minified():
+    for query in queries:
+        assert "\n" not in query.document
+        assert "  " not in query.document
+
+    assert PROJECT_ITEMS.variables == {"project", "cursor"}
+
+
+def test_registered_queries_select_rate_limit():
+    for query in queries:
+        assert query.document.endswith("rateLimit{cost remaining resetAt limit}}")
+
+
+def test_register_duplicate():
+    registry = QueryRegistry()
+    registry.register("item", "query ($id: ID!) { node(id: $id) { id } }")
+
+    assert "item" in registry
+    with pytest.raises(ValueError):
+        registry.register("item", "{ viewer { login } }")
@@ -0,0 +1,31 @@
+import pytest
+
+from src.utils import json_backend
+
+PAYLOAD = {"data": {"node": {"content": {"title": "Zażółć gęślą jaźń", "assignees": [1, 2.5, None, True]}}}}
+
+
+def test_stdlib_backend_is_always_available():
+    assert "json" in json_backend.available_backends()
+
+
+@pytest.mark.parametrize("backend", json_backend.available_backends().values(), ids=lambda backend: backend.name)
+def test_backend_roundtrip(backend):
+    encoded = backend.dumps(PAYLOAD)
+
+    assert isinstance(encoded, bytes)
+    assert backend.loads(encoded) == PAYLOAD
+    assert backend.loads(encoded.decode("utf-8")) == PAYLOAD
+
+
+def test_preferred_backend_selected():
+    expected = next(name for name in json_backend.PREFERRED_BACKENDS if json_backend.is_available(name))
+
+    assert json_backend.backend.name == expected
+
+
+def test_fast_json_response():
+    response = json_backend.FastJSONResponse(content={"detail": "Successfully received webhook data"})
+
+    assert json_backend.loads(response.body) == {"detail": "Successfully received webhook data"}
+    assert response.headers["content-type"] == "application/json"
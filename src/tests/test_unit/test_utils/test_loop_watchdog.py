@@ -0,0 +1,51 @@
+import asyncio
+import time
+from unittest.mock import patch
+
+from src.utils.loop_watchdog import LoopWatchdog
+
+
+def test_record_lag():
+    watchdog = LoopWatchdog(threshold=0.1)
+    watchdog.record_lag(0.02)
+    watchdog.record_lag(0.12)
+
+    stats = watchdog.stats()
+    assert stats["samples"] == 2
+    assert stats["lag_ms"]["last"] == 120
+    assert stats["lag_ms"]["max"] == 120
+    assert 20 < stats["lag_ms"]["average"] < 120
+
+
+@patch("os.getenv")
+def test_from_env_disabled(mock_getenv):
+    mock_getenv.return_value = None
+
+    assert LoopWatchdog.from_env() is None
+
+
+@patch("os.getenv")
+def test_from_env_threshold(mock_getenv):
+    mock_getenv.return_value = "250"
+
+    assert LoopWatchdog.from_env().threshold == 0.25
+
+
+def block_event_loop():
+    time.sleep(0.3)
+
+
+async def test_watchdog_reports_blocking_callback():
+    watchdog = LoopWatchdog(threshold=0.05, interval=0.01)
+    watchdog.start()
+    await asyncio.sleep(0.05)
+
+    block_event_loop()
+    await asyncio.sleep(0.1)
+    await watchdog.stop()
+
+    assert watchdog.stall_count == 1
+    report = watchdog.reports[0]
+    assert report.duration >= 0.2
+    assert any("block_event_loop" in line for line in report.stack)
+    assert watchdog.max_lag >= 0.2
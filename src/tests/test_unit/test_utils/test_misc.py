@@ -1,22 +1,10 @@
-import asyncio
+import copy
 import logging
 from io import StringIO
-from unittest.mock import mock_open, patch
 
-from src.utils import misc
-
-
-@patch("builtins.open", new_callable=mock_open, read_data='MDQ6VXNlcjY2NTE0ODg1: "393756120952602625"')
-@patch("yaml.load")
-def test_retrieve_discord_id_present_id(mock_yaml_load, _mock_open_file):
-    mock_yaml_load.return_value = {"MDQ6VXNlcjY2NTE0ODg1": "393756120952602625"}
-
-    assert misc.retrieve_discord_id("MDQ6VXNlcjY2NTE0ODg1") == "393756120952602625"
+from hikari import ForumTag, Snowflake
 
-
-@patch("builtins.open", new_callable=mock_open, read_data="")
-def test_retrieve_discord_id_absent_id(_mock_open_file):
-    assert misc.retrieve_discord_id("<node_id>") is None
+from src.utils import misc
 
 
 def test_bot_logger_prefix():
@@ -36,54 +24,35 @@ def test_bot_logger_prefix():
     assert output == "INFO [BOT] hello"
 
 
-async def test_shared_forum_channel_concurrent_readers(shared_forum_channel_mock):
-    started = asyncio.Event()
-    completed = []
-
-    async def reader(reader_id):
-        async with shared_forum_channel_mock.lock.reader_lock:
-            await started.wait()
-            completed.append(reader_id)
-
-    tasks = [asyncio.create_task(reader(i)) for i in range(5)]
-    started.set()
-    await asyncio.gather(*tasks)
-
-    assert sorted(completed) == [0, 1, 2, 3, 4]
-
-
-async def test_shared_forum_channel_writer_blocks_readers(shared_forum_channel_mock):
-    enter_order = []
-
-    async def writer():
-        async with shared_forum_channel_mock.lock.writer_lock:
-            enter_order.append("writer")
-            await asyncio.sleep(0.1)
-
-    async def reader():
-        async with shared_forum_channel_mock.lock.reader_lock:
-            enter_order.append("reader")
+def test_shared_forum_channel_snapshot(shared_forum_channel_mock, forum_channel_mock):
+    snapshot = shared_forum_channel_mock.snapshot
 
-    writer_task = asyncio.create_task(writer())
+    assert snapshot.version == 0
+    assert snapshot.forum_channel is forum_channel_mock
+    assert snapshot.available_tags == tuple(forum_channel_mock.available_tags)
+    assert shared_forum_channel_mock.forum_channel is forum_channel_mock
 
-    reader_task = asyncio.create_task(reader())
-    await asyncio.gather(writer_task, reader_task)
 
-    assert enter_order == ["writer", "reader"]
+def test_shared_forum_channel_compare_and_set(shared_forum_channel_mock, forum_channel_mock):
+    snapshot = shared_forum_channel_mock.snapshot
+    new_tag = ForumTag(id=Snowflake(2), name="Size: medium", moderated=False)
+    updated_channel = copy.copy(forum_channel_mock)
+    updated_channel.available_tags = [*forum_channel_mock.available_tags, new_tag]
 
+    assert shared_forum_channel_mock.compare_and_set(snapshot, updated_channel)
 
-async def test_shared_forum_channel_writers_are_exclusive(shared_forum_channel_mock):
-    execution = []
+    assert shared_forum_channel_mock.snapshot.version == 1
+    assert shared_forum_channel_mock.snapshot.available_tags[-1] == new_tag
+    # Readers holding the old snapshot keep a consistent view
+    assert snapshot.version == 0
+    assert new_tag not in snapshot.available_tags
 
-    async def writer(writer_id):
-        async with shared_forum_channel_mock.lock.writer_lock:
-            execution.append(writer_id)
-            await asyncio.sleep(0.05)
 
-    t1 = asyncio.create_task(writer(1))
-    t2 = asyncio.create_task(writer(2))
+def test_shared_forum_channel_compare_and_set_stale_snapshot(shared_forum_channel_mock, forum_channel_mock):
+    stale_snapshot = shared_forum_channel_mock.snapshot
+    assert shared_forum_channel_mock.compare_and_set(stale_snapshot, forum_channel_mock)
+    current_snapshot = shared_forum_channel_mock.snapshot
 
-    await asyncio.gather(t1, t2)
+    assert not shared_forum_channel_mock.compare_and_set(stale_snapshot, forum_channel_mock)
 
-    assert execution == [1, 2] or execution == [2, 1]
-    assert execution[0] != execution[1]
+    assert shared_forum_channel_mock.snapshot is current_snapshot
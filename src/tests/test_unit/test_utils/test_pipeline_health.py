@@ -0,0 +1,58 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from src.utils.pipeline_health import ClientStats, UpdateQueue, task_state
+
+
+@patch("src.utils.pipeline_health.time.monotonic")
+async def test_update_queue_oldest_age(mock_monotonic):
+    queue = UpdateQueue()
+    assert queue.oldest_age() is None
+
+    mock_monotonic.return_value = 10.0
+    await queue.put("first")
+    mock_monotonic.return_value = 12.0
+    await queue.put("second")
+    mock_monotonic.return_value = 15.0
+    assert queue.oldest_age() == 5.0
+
+    assert await queue.get() == "first"
+    assert queue.oldest_age() == 3.0
+    assert queue.get_nowait() == "second"
+    assert queue.oldest_age() is None
+
+
+def test_client_stats_track():
+    stats = ClientStats()
+
+    with stats.track():
+        assert stats.in_flight == 1
+    with pytest.raises(RuntimeError), stats.track():
+        raise RuntimeError()
+
+    assert stats.in_flight == 0
+    assert stats.requests == 2
+    assert stats.failures == 1
+    assert stats.last_failure_at is not None
+
+
+async def test_task_state():
+    async def crash():
+        raise RuntimeError()
+
+    running = asyncio.create_task(asyncio.sleep(10))
+    finished = asyncio.create_task(asyncio.sleep(0))
+    crashed = asyncio.create_task(crash())
+    await asyncio.wait([finished, crashed])
+    await asyncio.sleep(0)
+
+    assert task_state(None) == "not_started"
+    assert task_state(running) == "running"
+    assert task_state(finished) == "finished"
+    assert task_state(crashed) == "crashed"
+
+    running.cancel()
+    await asyncio.gather(running, return_exceptions=True)
+    assert task_state(running) == "cancelled"
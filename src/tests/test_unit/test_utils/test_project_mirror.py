@@ -0,0 +1,175 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import HTTPException
+
+from src.utils.data_types import Changes, FieldValue, FieldValueTo, ProjectV2Item, Sender, WebhookRequest
+from src.utils.github_api import ItemSnapshot, ProjectItemsPage
+from src.utils.project_mirror import ASSIGNEES, CONTENT_TYPE, MISSING, TITLE, ProjectMirror, field_key
+
+
+def webhook(action: str = "edited", field_value: FieldValue | None = None, **item_extra) -> WebhookRequest:
+    return WebhookRequest(
+        projects_v2_item=ProjectV2Item(id=1, node_id="PVTI_1", project_node_id="PVT_1", **item_extra),
+        action=action,
+        sender=Sender(node_id="sender"),
+        changes=Changes(field_value=field_value) if field_value is not None else None,
+    )
+
+
+@patch("src.utils.project_mirror.fetch_item_snapshot", new_callable=AsyncMock)
+async def test_get_or_fetch_mirrors_the_whole_item(mock_fetch_item_snapshot):
+    mock_fetch_item_snapshot.return_value = ItemSnapshot("Meow", ["user"], {"Status": "Todo"})
+    mirror = ProjectMirror()
+
+    assert await mirror.get_or_fetch("PVTI_1", TITLE) == "Meow"
+    assert await mirror.get_or_fetch("PVTI_1", ASSIGNEES) == ["user"]
+    assert await mirror.get_or_fetch("PVTI_1", field_key("Status")) == "Todo"
+
+    mock_fetch_item_snapshot.assert_awaited_once_with("PVTI_1")
+    assert mirror.snapshot() == {"items": 1, "hits": 2, "misses": 1, "sync": "pending"}
+
+
+@patch("src.utils.project_mirror.fetch_item_snapshot", new_callable=AsyncMock)
+async def test_get_or_fetch_caches_unset_fields(mock_fetch_item_snapshot):
+    mock_fetch_item_snapshot.return_value = ItemSnapshot("Meow", [], {})
+    mirror = ProjectMirror()
+
+    assert await mirror.get_or_fetch("PVTI_1", field_key("Size")) is None
+    assert await mirror.get_or_fetch("PVTI_1", field_key("Size")) is None
+
+    mock_fetch_item_snapshot.assert_awaited_once()
+
+
+@patch("src.utils.project_mirror.fetch_item_snapshot", new_callable=AsyncMock)
+async def test_get_or_fetch_missing_title(mock_fetch_item_snapshot):
+    mock_fetch_item_snapshot.return_value = ItemSnapshot(None, [], {})
+    mirror = ProjectMirror()
+
+    with pytest.raises(HTTPException) as exception:
+        await mirror.get_or_fetch("PVTI_1", TITLE)
+
+    assert exception.value.status_code == 500
+    assert exception.value.detail == "Could not fetch item name."
+    assert mirror.get("PVTI_1", TITLE, MISSING) is MISSING
+
+
+@patch("src.utils.project_mirror.fetch_item_snapshot", new_callable=AsyncMock)
+@patch("src.utils.project_mirror.time.monotonic")
+async def test_expired_values_are_fetched_again(mock_monotonic, mock_fetch_item_snapshot):
+    mirror = ProjectMirror(ttl=10)
+    mock_fetch_item_snapshot.side_effect = [ItemSnapshot("Old", [], {}), ItemSnapshot("New", [], {})]
+    mock_monotonic.return_value = 100.0
+    await mirror.get_or_fetch("PVTI_1", TITLE)
+
+    mock_monotonic.return_value = 111.0
+
+    assert mirror.get("PVTI_1", TITLE) is None
+    assert await mirror.get_or_fetch("PVTI_1", TITLE) == "New"
+
+
+@patch("src.utils.project_mirror.fetch_item_snapshot", new_callable=AsyncMock)
+async def test_disabled_mirror_always_fetches(mock_fetch_item_snapshot):
+    mock_fetch_item_snapshot.return_value = ItemSnapshot("Meow", [], {})
+    mirror = ProjectMirror(ttl=0)
+
+    assert await mirror.get_or_fetch("PVTI_1", TITLE) == "Meow"
+    assert await mirror.get_or_fetch("PVTI_1", TITLE) == "Meow"
+
+    assert mock_fetch_item_snapshot.await_count == 2
+    assert mirror.items == {}
+
+
+def test_apply_snapshot_keeps_newer_values():
+    mirror = ProjectMirror()
+    mirror.set("PVTI_1", field_key("Status"), "Done")
+    mirror.set("PVTI_1", field_key("Priority"), "High")
+    learned_at = mirror.items["PVTI_1"][field_key("Status")][1]
+
+    mirror.apply_snapshot("PVTI_1", ItemSnapshot("Meow", ["user"], {"Status": "Todo"}), "ISSUE", learned_at - 1)
+
+    assert mirror.get("PVTI_1", TITLE) == "Meow"
+    assert mirror.get("PVTI_1", ASSIGNEES) == ["user"]
+    assert mirror.get("PVTI_1", CONTENT_TYPE) == "ISSUE"
+    assert mirror.get("PVTI_1", field_key("Status")) == "Done"
+    assert mirror.get("PVTI_1", field_key("Priority")) == "High"
+
+
+def test_apply_snapshot_drops_stale_fields():
+    mirror = ProjectMirror()
+    mirror.set("PVTI_1", field_key("Priority"), "High")
+
+    mirror.apply_snapshot("PVTI_1", ItemSnapshot("Meow", [], {}))
+
+    assert mirror.get("PVTI_1", field_key("Priority")) is None
+
+
+def test_apply_webhook_field_values():
+    mirror = ProjectMirror()
+
+    mirror.apply_webhook(
+        webhook(field_value=FieldValue(field_name="Size", field_type="single_select", to=FieldValueTo(name="Big")))
+    )
+    mirror.apply_webhook(
+        webhook(field_value=FieldValue(field_name="Sprint", field_type="iteration", to=FieldValueTo(title="3")))
+    )
+    mirror.apply_webhook(webhook(field_value=FieldValue(field_name="Due", field_type="date", to="2024-01-02T00:00")))
+
+    assert mirror.get("PVTI_1", field_key("Size")) == "Big"
+    assert mirror.get("PVTI_1", field_key("Sprint")) == "3"
+    assert mirror.get("PVTI_1", field_key("Due")) == "2024-01-02"
+
+
+def test_apply_webhook_invalidates_changes_without_value():
+    mirror = ProjectMirror()
+    mirror.apply_snapshot("PVTI_1", ItemSnapshot("Meow", ["user"], {"Size": "Big"}))
+
+    mirror.apply_webhook(webhook(field_value=FieldValue(field_name="Title", field_type="title")))
+    mirror.apply_webhook(webhook(field_value=FieldValue(field_name="Assignees", field_type="assignees")))
+    mirror.apply_webhook(
+        webhook(field_value=FieldValue(field_name="Size", field_type="single_select", to=FieldValueTo(title="?")))
+    )
+
+    assert mirror.get("PVTI_1", TITLE) is None
+    assert mirror.get("PVTI_1", ASSIGNEES) is None
+    assert mirror.get("PVTI_1", field_key("Size")) is None
+
+
+def test_apply_webhook_content_type_and_deletion():
+    mirror = ProjectMirror()
+
+    mirror.apply_webhook(webhook("converted", content_type="Issue"))
+    assert mirror.get("PVTI_1", CONTENT_TYPE) == "Issue"
+
+    mirror.apply_webhook(webhook("deleted"))
+    assert mirror.items == {}
+
+
+@patch("src.utils.project_mirror.fetch_project_items", new_callable=AsyncMock)
+async def test_sync_follows_pages(mock_fetch_project_items):
+    mock_fetch_project_items.side_effect = [
+        ProjectItemsPage([("PVTI_1", "ISSUE", ItemSnapshot("One", [], {}))], "cursor"),
+        ProjectItemsPage([("PVTI_2", "DRAFT_ISSUE", ItemSnapshot("Two", [], {}))], None),
+    ]
+    mirror = ProjectMirror()
+
+    assert await mirror.sync("PVT_1") == 2
+
+    assert [call.args for call in mock_fetch_project_items.call_args_list] == [("PVT_1", None), ("PVT_1", "cursor")]
+    assert mirror.get("PVTI_2", TITLE) == "Two"
+
+
+@patch("src.utils.project_mirror.fetch_project_items", new_callable=AsyncMock)
+async def test_sync_all_continues_after_failure(mock_fetch_project_items):
+    mock_fetch_project_items.side_effect = [
+        ConnectionError(),
+        ProjectItemsPage([("PVTI_2", "ISSUE", ItemSnapshot("Two", [], {}))], None),
+    ]
+    mirror = ProjectMirror()
+
+    assert mirror.sync_state == "pending"
+
+    await mirror.sync_all(["PVT_1", "PVT_2"])
+
+    assert mirror.get("PVTI_2", TITLE) == "Two"
+    assert mirror.sync_state == "failed"
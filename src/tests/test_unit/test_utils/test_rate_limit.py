@@ -0,0 +1,102 @@
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src.utils.error import RateLimitExceededError
+from src.utils.rate_limit import MAX_LIVE_WAIT, Priority, RateLimitBudget
+
+
+def create_budget(remaining: int, reset_in: float = 600, limit: int = 5000) -> RateLimitBudget:
+    budget = RateLimitBudget()
+    budget.update_from_headers({
+        "X-RateLimit-Limit": str(limit),
+        "X-RateLimit-Remaining": str(remaining),
+        "X-RateLimit-Reset": str(time.time() + reset_in),
+    })
+    return budget
+
+
+def test_update_from_headers():
+    budget = create_budget(remaining=1234, reset_in=600)
+
+    assert budget.remaining == 1234
+    assert budget.reserve == 1000
+    assert 590 < budget.seconds_until_reset() <= 600
+
+
+def test_update_from_headers_without_rate_limit():
+    budget = RateLimitBudget()
+    budget.update_from_headers({})
+
+    assert budget.remaining == budget.limit
+    assert budget.reset_at is None
+
+
+def test_update_from_body():
+    budget = RateLimitBudget()
+
+    assert not budget.update_from_body({
+        "data": {"rateLimit": {"cost": 1, "limit": 5000, "remaining": 4000, "resetAt": "2030-01-01T00:00:00Z"}}
+    })
+    assert budget.remaining == 4000
+    assert budget.last_cost == 1
+    assert budget.reset_at == 1893456000
+
+    assert budget.update_from_body({"errors": [{"type": "RATE_LIMITED", "message": "API rate limit exceeded"}]})
+    assert budget.remaining == 0
+
+
+def test_plenty_of_budget_has_no_delay():
+    budget = create_budget(remaining=4000)
+
+    assert budget.delay_for(Priority.LIVE) == 0
+    assert budget.delay_for(Priority.BACKGROUND) == 0
+    assert budget.background_interval() == 0
+
+
+def test_background_paced_below_half():
+    budget = create_budget(remaining=2000, reset_in=600)
+
+    # 1000 points above the reserve spread over the 600 s left
+    assert budget.background_interval() == pytest.approx(0.6, rel=0.01)
+    assert budget.delay_for(Priority.LIVE) == 0
+
+
+def test_reserve_kept_for_live_requests():
+    budget = create_budget(remaining=900, reset_in=600)
+
+    assert budget.delay_for(Priority.LIVE) == 0
+    assert budget.delay_for(Priority.BACKGROUND) == pytest.approx(600, abs=1)
+
+
+def test_exhausted_budget_delays_live_requests():
+    budget = create_budget(remaining=0, reset_in=600)
+
+    assert budget.delay_for(Priority.LIVE) == pytest.approx(600, abs=1)
+
+
+def test_budget_restored_after_reset():
+    budget = create_budget(remaining=0, reset_in=-1)
+
+    assert budget.delay_for(Priority.LIVE) == 0
+    assert budget.remaining == budget.limit
+
+
+async def test_acquire_live_fails_fast_when_reset_is_far():
+    budget = create_budget(remaining=0, reset_in=600)
+
+    with pytest.raises(RateLimitExceededError) as error:
+        await budget.acquire(Priority.LIVE)
+    assert error.value.retry_after > MAX_LIVE_WAIT
+
+
+@patch("src.utils.rate_limit.asyncio.sleep", new_callable=AsyncMock)
+async def test_acquire_background_waits_for_interval(mock_sleep):
+    budget = create_budget(remaining=2000, reset_in=600)
+
+    await budget.acquire(Priority.BACKGROUND)
+    mock_sleep.assert_not_called()
+    await budget.acquire(Priority.BACKGROUND)
+
+    assert mock_sleep.call_args.args[0] == pytest.approx(0.6, rel=0.05)
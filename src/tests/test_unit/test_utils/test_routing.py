@@ -0,0 +1,77 @@
+from unittest.mock import mock_open, patch
+
+import pytest
+
+from src.utils import routing
+from src.utils.error import InvalidRoutesError
+
+ROUTES_YAML = """
+- project_node_id: PVT_first
+  forum_channel_id: 1
+  discord_guild_id: 10
+- project_node_id: PVT_second
+  forum_channel_id: 2
+  discord_guild_id: 10
+  post_id_db_path: second.db
+  project_number: "7"
+  max_concurrent_updates: 1
+"""
+
+
+@patch("os.getenv")
+def test_load_routes_from_environment(mock_os_getenv):
+    mock_os_getenv.side_effect = [None, "PVT_project", "1", "2"]
+
+    assert routing.load_routes() == {"PVT_project": routing.ProjectRoute("PVT_project", 1, 2)}
+
+
+@patch("builtins.open", new_callable=mock_open, read_data=ROUTES_YAML)
+@patch("os.getenv")
+def test_load_routes_from_file(mock_os_getenv, _mock_open):
+    mock_os_getenv.return_value = "routes.yaml"
+
+    routes = routing.load_routes()
+
+    assert list(routes) == ["PVT_first", "PVT_second"]
+    assert routes["PVT_first"] == routing.ProjectRoute("PVT_first", 1, 10)
+    assert routes["PVT_second"].post_id_db_path == "second.db"
+    assert routes["PVT_second"].project_number == "7"
+    assert routes["PVT_second"].max_concurrent_updates == 1
+
+
+@patch("builtins.open", new_callable=mock_open, read_data=ROUTES_YAML + ROUTES_YAML)
+@patch("os.getenv")
+def test_load_routes_duplicate_project(mock_os_getenv, _mock_open):
+    mock_os_getenv.return_value = "routes.yaml"
+
+    with pytest.raises(InvalidRoutesError):
+        routing.load_routes()
+
+
+@pytest.mark.parametrize(
+    "routes_yaml", ["", "[]", "project_node_id: PVT_first"], ids=["empty", "no_routes", "not_a_list"]
+)
+@patch("os.getenv")
+def test_load_routes_without_routes(mock_os_getenv, routes_yaml):
+    mock_os_getenv.return_value = "routes.yaml"
+
+    with patch("builtins.open", mock_open(read_data=routes_yaml)), pytest.raises(InvalidRoutesError):
+        routing.load_routes()
+
+
+@pytest.mark.parametrize(
+    "entry",
+    [
+        {"project_node_id": "PVT_first", "forum_channel_id": "1", "discord_guild_id": 10},
+        {"project_node_id": "PVT_first", "forum_channel_id": 1, "discord_guild_id": 10, "project_number": 7},
+        {"project_node_id": "PVT_first", "forum_channel_id": 1, "discord_guild_id": True},
+        {"project_node_id": "PVT_first", "forum_channel_id": 1, "discord_guild_id": 10, "channel": 2},
+        {"project_node_id": "PVT_first", "forum_channel_id": 1},
+        {"project_node_id": "PVT_first", "forum_channel_id": 1, "discord_guild_id": 10, "max_concurrent_updates": 0},
+        "PVT_first",
+    ],
+    ids=["string_id", "int_number", "bool_id", "unknown_field", "missing_field", "no_updates", "not_a_mapping"],
+)
+def test_parse_route_invalid(entry):
+    with pytest.raises(InvalidRoutesError):
+        routing.parse_route(entry)
@@ -0,0 +1,49 @@
+import threading
+import time
+from collections import Counter
+
+import pytest
+
+from src.utils.error import ProfilerBusyError
+from src.utils.sampling_profiler import SamplingProfiler, format_collapsed
+
+
+def spin(stop: threading.Event):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_profile_samples_running_code():
+    stop = threading.Event()
+    thread = threading.Thread(target=spin, args=(stop,), name="spinner")
+    thread.start()
+    try:
+        stacks = SamplingProfiler().profile(0.05, 0.001, {thread.ident})
+    finally:
+        stop.set()
+        thread.join()
+
+    assert stacks
+    for stack in stacks:
+        assert stack.startswith("spinner;")
+        assert ";spin (src/tests/test_unit/test_utils/test_sampling_profiler.py)" in stack
+
+
+def test_profile_runs_one_at_a_time():
+    profiler = SamplingProfiler()
+    thread = threading.Thread(target=profiler.profile, args=(0.2,))
+    thread.start()
+    time.sleep(0.05)
+    try:
+        assert profiler.busy
+        with pytest.raises(ProfilerBusyError):
+            profiler.profile(0.01)
+    finally:
+        thread.join()
+    assert not profiler.busy
+
+
+def test_format_collapsed():
+    stacks = Counter({"MainThread;main (app.py);run (app.py)": 3, "MainThread;main (app.py)": 7})
+
+    assert format_collapsed(stacks) == "MainThread;main (app.py) 7\nMainThread;main (app.py);run (app.py) 3\n"
@@ -1,3 +1,5 @@
+import hashlib
+import hmac
 from logging import Logger
 from unittest.mock import patch
 
@@ -75,3 +77,91 @@ def test_verify_signature_not_set(mock_getenv, mock_logger_warning):
 
     signature_verification.verify_signature(signature, body_bytes)
     mock_logger_warning.assert_called_with("GITHUB_WEBHOOK_SECRET is not set; skipping signature verification.")
+
+
+def test_signature_verifier_rotation():
+    verifier = signature_verification.SignatureVerifier(["new-secret", "H-letter"])
+    signature = "sha256=9b40ac77c0653bed6e678ebd8db8b8d96a7c8ea8983b1a77577797d0a43b97c6"
+
+    verifier.verify(signature, b"I freaking love H letter")
+    verifier.verify(signature, b"I freaking love H letter")
+
+    with pytest.raises(HTTPException) as error:
+        verifier.verify(signature, b"malicious")
+    assert error.value.detail == "Invalid signature."
+
+
+def test_signature_verifier_tries_last_matching_secret_first():
+    verifier = signature_verification.SignatureVerifier(["new-secret", "H-letter"])
+    signature = "sha256=9b40ac77c0653bed6e678ebd8db8b8d96a7c8ea8983b1a77577797d0a43b97c6"
+    verifier.verify(signature, b"I freaking love H letter")
+
+    first_keyed_hmac = verifier._keyed_hmacs[0]
+    assert first_keyed_hmac.copy().digest() == hmac.new(b"H-letter", digestmod=hashlib.sha256).digest()
+
+
+@pytest.mark.parametrize("signature", ["sha1=9b40ac77", "sha256=not-hex", "9b40ac77c0653bed6e678ebd8db8b8d9"])
+def test_signature_verifier_malformed_signature(signature):
+    verifier = signature_verification.SignatureVerifier(["H-letter"])
+
+    with pytest.raises(HTTPException) as error:
+        verifier.verify(signature, b"I freaking love H letter")
+    assert error.value.status_code == 401
+    assert error.value.detail == "Invalid signature."
+
+
+def test_signature_verifier_missing_signature():
+    verifier = signature_verification.SignatureVerifier(["H-letter"])
+
+    with pytest.raises(HTTPException) as error:
+        verifier.verify(None, b"I freaking love H letter")
+    assert error.value.detail == "Missing signature."
+
+
+def test_signature_verifier_disabled():
+    verifier = signature_verification.SignatureVerifier([""])
+
+    assert not verifier.enabled
+    verifier.verify(None, b"I freaking love H letter")
+
+
+@patch("os.getenv")
+def test_signature_verifier_from_env_multiple_secrets(mock_getenv):
+    mock_getenv.return_value = "new-secret, H-letter"
+    signature = "sha256=9b40ac77c0653bed6e678ebd8db8b8d96a7c8ea8983b1a77577797d0a43b97c6"
+
+    signature_verification.SignatureVerifier.from_env().verify(signature, b"I freaking love H letter")
+
+
+def test_streaming_signature():
+    verifier = signature_verification.SignatureVerifier(["new-secret", "H-letter"])
+    signature = "sha256=9b40ac77c0653bed6e678ebd8db8b8d96a7c8ea8983b1a77577797d0a43b97c6"
+
+    streaming_signature = verifier.begin()
+    for chunk in [b"I freaking ", b"love ", b"H letter"]:
+        streaming_signature.update(chunk)
+    streaming_signature.verify(signature, b"I freaking love H letter")
+
+    streaming_signature = verifier.begin()
+    streaming_signature.update(b"I freaking love")
+    with pytest.raises(HTTPException) as error:
+        streaming_signature.verify(signature, b"I freaking love")
+    assert error.value.detail == "Invalid signature."
+
+
+def test_streaming_signature_hashes_with_last_matching_secret_only():
+    verifier = signature_verification.SignatureVerifier(["new-secret", "H-letter"])
+    signature = "sha256=9b40ac77c0653bed6e678ebd8db8b8d96a7c8ea8983b1a77577797d0a43b97c6"
+    body_bytes = b"I freaking love H letter"
+
+    # The first request falls back to the buffered body and promotes the matching secret
+    streaming_signature = verifier.begin()
+    streaming_signature.update(body_bytes)
+    streaming_signature.verify(signature, body_bytes)
+
+    streaming_signature = verifier.begin()
+    assert streaming_signature.keyed_hmac is verifier._keyed_hmacs[0]
+    streaming_signature.update(body_bytes)
+    with patch.object(verifier, "matches") as mock_matches:
+        streaming_signature.verify(signature, body_bytes)
+    mock_matches.assert_not_called()
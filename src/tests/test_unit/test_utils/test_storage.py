@@ -0,0 +1,106 @@
+import asyncio
+import threading
+from unittest.mock import mock_open, patch
+
+import pytest
+
+from src.tests.conftest import MockShelf
+from src.utils import storage
+
+
+@patch("shelve.open")
+async def test_post_store_get(mock_shelve_open):
+    mock_shelve_open.return_value = MockShelf({"node_id": "621"})
+
+    assert await storage.post_store.get("node_id") == 621
+    assert await storage.post_store.get("other_node_id") is None
+
+
+@patch("shelve.open")
+async def test_post_store_set(mock_shelve_open):
+    mock_shelf = MockShelf()
+    mock_shelve_open.return_value = mock_shelf
+
+    await storage.post_store.set("node_id", 621)
+
+    assert mock_shelf == {"node_id": "621"}
+
+
+async def test_run_in_storage_thread_off_event_loop():
+    loop_thread = threading.current_thread()
+
+    storage_thread = await storage.run_in_storage_thread(threading.current_thread)
+
+    assert storage_thread is not loop_thread
+    assert storage_thread.name.startswith("storage")
+
+
+@patch("builtins.open", new_callable=mock_open, read_data='MDQ6VXNlcjY2NTE0ODg1: "393756120952602625"')
+@patch("yaml.load")
+async def test_retrieve_discord_id_present_id(mock_yaml_load, _mock_open_file):
+    mock_yaml_load.return_value = {"MDQ6VXNlcjY2NTE0ODg1": "393756120952602625"}
+
+    assert await storage.retrieve_discord_id("MDQ6VXNlcjY2NTE0ODg1") == "393756120952602625"
+
+
+@patch("builtins.open", new_callable=mock_open, read_data="")
+async def test_retrieve_discord_id_absent_id(_mock_open_file):
+    assert await storage.retrieve_discord_id("<node_id>") is None
+
+
+@patch("shelve.open")
+async def test_post_store_serves_reads_from_memory(mock_shelve_open):
+    mock_shelve_open.return_value = MockShelf({"node_id": "621"})
+    await storage.post_store.get("node_id")
+    mock_shelve_open.reset_mock()
+
+    assert await storage.post_store.get("node_id") == 621
+    mock_shelve_open.assert_not_called()
+
+
+@patch("shelve.open")
+async def test_post_store_write_behind(mock_shelve_open):
+    mock_shelf = MockShelf()
+    mock_shelve_open.return_value = mock_shelf
+    post_store = storage.PostStore(flush_interval=60, batch_size=3)
+
+    await post_store.set("first", 1)
+    await post_store.set("second", 2)
+
+    assert await post_store.get("first") == 1
+    assert mock_shelf == {}
+    assert post_store.pending_count == 2
+
+    await post_store.set("third", 3)
+
+    assert mock_shelf == {"first": "1", "second": "2", "third": "3"}
+    assert post_store.pending_count == 0
+    assert mock_shelve_open.call_count == 1
+
+
+@patch("shelve.open")
+async def test_post_store_flushes_on_timer_and_stop(mock_shelve_open):
+    mock_shelf = MockShelf()
+    mock_shelve_open.return_value = mock_shelf
+    post_store = storage.PostStore(flush_interval=0.01)
+    post_store.start()
+
+    await post_store.set("first", 1)
+    await asyncio.sleep(0.05)
+    assert mock_shelf == {"first": "1"}
+
+    await post_store.set("second", 2)
+    await post_store.stop()
+    assert mock_shelf == {"first": "1", "second": "2"}
+
+
+@patch("shelve.open")
+async def test_post_store_keeps_pending_writes_on_failure(mock_shelve_open):
+    mock_shelve_open.side_effect = OSError("disk full")
+    post_store = storage.PostStore(flush_interval=60)
+    await post_store.set("node_id", 621)
+
+    with pytest.raises(OSError):
+        await post_store.flush()
+
+    assert post_store.pending_count == 1
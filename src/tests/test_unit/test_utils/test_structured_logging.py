@@ -0,0 +1,60 @@
+import asyncio
+import json
+import logging
+from io import StringIO
+
+from src.utils import structured_logging
+
+
+def create_record(message: str, *args, **extra) -> logging.LogRecord:
+    record = logging.LogRecord("uvicorn.error", logging.INFO, __file__, 1, message, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_json_formatter():
+    record = create_record("[BOT] Post %s body updated.", "item123", node_id="item123", component="bot")
+
+    entry = json.loads(structured_logging.JsonFormatter().format(record))
+
+    assert entry["message"] == "Post item123 body updated."
+    assert entry["level"] == "INFO"
+    assert entry["node_id"] == "item123"
+    assert entry["component"] == "bot"
+    assert "delivery_id" not in entry
+
+
+def test_queue_handler_resolves_arguments_and_context():
+    handler = structured_logging.StructuredQueueHandler(None, "uvicorn.error")
+
+    async def log_in_task():
+        structured_logging.bind_log_context(node_id="item123", event_type="ProjectItemEditedBody")
+        return handler.prepare(create_record("Processing %s", "item123"))
+
+    record = asyncio.run(log_in_task())
+
+    assert record.msg == "Processing item123"
+    assert record.args is None
+    assert record.node_id == "item123"
+    assert record.event_type == "ProjectItemEditedBody"
+    assert record.log_route == "uvicorn.error"
+
+
+def test_logging_pipeline_routes_records_and_restores_handlers():
+    error_stream, access_stream = StringIO(), StringIO()
+    error_logger, access_logger = logging.getLogger("test.error"), logging.getLogger("test.access")
+    error_handler, access_handler = logging.StreamHandler(error_stream), logging.StreamHandler(access_stream)
+    error_logger.handlers, access_logger.handlers = [error_handler], [access_handler]
+    error_logger.setLevel(logging.INFO)
+
+    pipeline = structured_logging.LoggingPipeline(json_format=True, logger_names=("test.error", "test.access"))
+    pipeline.start()
+    error_logger.info("Received webhook event for item: %s", "item123", extra={"delivery_id": "42"})
+    pipeline.stop()
+
+    entry = json.loads(error_stream.getvalue())
+    assert entry["message"] == "Received webhook event for item: item123"
+    assert entry["delivery_id"] == "42"
+    assert access_stream.getvalue() == ""
+    assert error_logger.handlers == [error_handler]
+    assert not isinstance(error_handler.formatter, structured_logging.JsonFormatter)
@@ -0,0 +1,132 @@
+import copy
+from unittest.mock import AsyncMock, Mock, patch
+
+from hikari import (
+    GuildAvailableEvent,
+    GuildThreadCreateEvent,
+    GuildThreadDeleteEvent,
+    GuildThreadUpdateEvent,
+    Intents,
+    ShardReadyEvent,
+    Snowflake,
+)
+
+from src.utils.thread_cache import ThreadCache, start_gateway
+
+
+def test_put_ignores_other_channels(full_post_mock):
+    cache = ThreadCache()
+    cache.forum_channel_ids = {67}
+
+    cache.put(full_post_mock)
+
+    assert cache.get(full_post_mock.id) is None
+
+
+def test_least_recently_used_thread_is_evicted(full_post_mock):
+    cache = ThreadCache(max_size=2)
+    threads = [copy.copy(full_post_mock) for _ in range(3)]
+    for thread_id, thread in enumerate(threads):
+        thread.id = Snowflake(thread_id)
+
+    cache.put(threads[0])
+    cache.put(threads[1])
+    cache.get(threads[0].id)
+    cache.put(threads[2])
+
+    assert cache.get(threads[1].id) is None
+    assert cache.get(threads[0].id) is threads[0]
+    assert cache.get(threads[2].id) is threads[2]
+
+
+@patch("src.utils.thread_cache.time.monotonic")
+def test_entries_expire_without_gateway(mock_monotonic, full_post_mock):
+    cache = ThreadCache(ttl=10)
+    mock_monotonic.return_value = 100.0
+    cache.put(full_post_mock)
+    mock_monotonic.return_value = 111.0
+
+    cache.live = True
+    assert cache.get(full_post_mock.id) is full_post_mock
+    cache.live = False
+    assert cache.find_by_name("audacity4", full_post_mock.parent_id) is None
+    assert cache.get(full_post_mock.id) is None
+    assert len(cache) == 0
+
+
+def test_remember_ignores_other_channels(full_post_mock, forum_channel_mock):
+    cache = ThreadCache()
+
+    cache.remember(forum_channel_mock)
+    cache.remember(full_post_mock)
+
+    assert cache.get(forum_channel_mock.id) is None
+    assert cache.get(full_post_mock.id) is full_post_mock
+
+
+def test_find_by_name(full_post_mock):
+    cache = ThreadCache()
+    cache.put(full_post_mock)
+
+    assert cache.find_by_name("audacity4", full_post_mock.parent_id) is full_post_mock
+    assert cache.find_by_name("audacity4", Snowflake(67)) is None
+    assert cache.find_by_name("audacity5", full_post_mock.parent_id) is None
+
+
+async def test_gateway_events_update_the_cache(full_post_mock):
+    cache = ThreadCache()
+
+    await cache.on_guild_available(Mock(threads={full_post_mock.id: full_post_mock}, channels={}))
+    assert cache.get(full_post_mock.id) is full_post_mock
+
+    updated_post = Mock(id=full_post_mock.id, parent_id=full_post_mock.parent_id, applied_tag_ids=[])
+    await cache.on_thread_change(Mock(thread=updated_post))
+    assert cache.get(full_post_mock.id) is updated_post
+
+    await cache.on_thread_delete(Mock(thread_id=full_post_mock.id))
+    assert len(cache) == 0
+
+
+async def test_new_session_drops_the_cache(full_post_mock):
+    cache = ThreadCache()
+    cache.put(full_post_mock)
+
+    await cache.on_shard_ready(Mock())
+
+    assert len(cache) == 0
+
+
+async def test_gateway_warms_up_per_session(full_post_mock):
+    cache = ThreadCache()
+    assert cache.gateway_state == "disabled"
+    cache.forum_channel_ids = {67, 68}
+    cache.live = True
+
+    await cache.on_shard_ready(Mock())
+    assert cache.gateway_state == "warming"
+    await cache.on_guild_available(Mock(threads={}, channels={67: Mock(), 1: Mock()}))
+    assert cache.gateway_state == "warming"
+    await cache.on_guild_available(Mock(threads={}, channels={68: Mock()}))
+    assert cache.gateway_state == "ready"
+
+    await cache.on_shard_ready(Mock())
+    assert cache.gateway_state == "warming"
+
+
+@patch("hikari.GatewayBot")
+async def test_start_gateway(mock_gateway_bot):
+    gateway = mock_gateway_bot.return_value
+    gateway.start = AsyncMock()
+    cache = ThreadCache()
+
+    assert await start_gateway("some_token", [67], cache) is gateway
+
+    assert mock_gateway_bot.call_args.kwargs["intents"] == Intents.GUILDS
+    subscribed = {call.args[0]: call.args[1] for call in gateway.subscribe.call_args_list}
+    assert subscribed[ShardReadyEvent] == cache.on_shard_ready
+    assert subscribed[GuildAvailableEvent] == cache.on_guild_available
+    assert subscribed[GuildThreadCreateEvent] == subscribed[GuildThreadUpdateEvent] == cache.on_thread_change
+    assert subscribed[GuildThreadDeleteEvent] == cache.on_thread_delete
+    assert cache.forum_channel_ids == {67}
+    assert cache.live
+    assert cache.gateway_state == "warming"
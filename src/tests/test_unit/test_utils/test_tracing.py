@@ -0,0 +1,183 @@
+import json
+from unittest.mock import ANY, AsyncMock, patch
+
+import pytest
+
+from src.utils.tracing import (
+    MAX_QUEUED_TRACES,
+    FileSpanExporter,
+    TracedClient,
+    Tracer,
+    trace_id_for_delivery,
+    tracer,
+)
+
+DELIVERY_ID = "72d3162e-cc78-11e3-81ab-4c9367dc0958"
+
+
+def test_trace_id_for_delivery():
+    assert trace_id_for_delivery(DELIVERY_ID) == "72d3162ecc7811e381ab4c9367dc0958"
+    assert len(trace_id_for_delivery("not-a-uuid")) == 32
+    assert trace_id_for_delivery(None) != trace_id_for_delivery(None)
+
+
+def test_disabled_tracer_records_nothing():
+    tracer = Tracer()
+
+    with tracer.start_trace("webhook", DELIVERY_ID) as root:
+        with tracer.span("parse") as span:
+            pass
+
+    assert root is None
+    assert span is None
+    assert tracer.current_traceparent() is None
+    assert tracer.finished == []
+
+
+def test_sampling_is_deterministic():
+    tracer = Tracer()
+    tracer.sample_rate = 0.5
+
+    assert tracer.is_sampled("0" * 16 + "0" * 16)
+    assert not tracer.is_sampled("0" * 16 + "f" * 16)
+    tracer.sample_rate = 1.0
+    assert tracer.is_sampled("0" * 16 + "f" * 16)
+
+
+def test_spans_nest():
+    tracer = Tracer()
+    tracer.sample_rate = 1.0
+
+    with tracer.start_trace("webhook", DELIVERY_ID, event="projects_v2_item") as root:
+        with tracer.span("parse", size=10) as child:
+            assert tracer.current_traceparent() == child.traceparent
+        assert tracer.current_traceparent() == root.traceparent
+    assert tracer.current_traceparent() is None
+
+    assert tracer.finished == [child, root]
+    assert child.trace_id == root.trace_id == "72d3162ecc7811e381ab4c9367dc0958"
+    assert child.parent_id == root.span_id
+    assert root.attributes == {"github.delivery": DELIVERY_ID, "event": "projects_v2_item"}
+    assert root.end_ns >= child.end_ns >= child.start_ns >= root.start_ns
+
+
+def test_span_records_error():
+    tracer = Tracer()
+    tracer.sample_rate = 1.0
+
+    with pytest.raises(ValueError), tracer.start_trace("webhook", DELIVERY_ID):
+        raise ValueError("broken")
+
+    assert tracer.finished[0].error == "ValueError: broken"
+    assert tracer.finished[0].to_otlp()["status"] == {"code": 2, "message": "ValueError: broken"}
+
+
+def test_resume_continues_trace():
+    tracer = Tracer()
+    tracer.sample_rate = 1.0
+    with tracer.start_trace("webhook", DELIVERY_ID) as root:
+        pass
+
+    with tracer.resume("update", root.traceparent) as update:
+        pass
+    with tracer.resume("update", None) as missing:
+        pass
+
+    assert update.trace_id == root.trace_id
+    assert update.parent_id == root.span_id
+    assert missing is None
+
+
+def test_queue_wait():
+    tracer = Tracer()
+    tracer.sample_rate = 1.0
+    with tracer.start_trace("webhook", DELIVERY_ID) as root:
+        tracer.mark_queued(tracer.current_traceparent())
+
+    tracer.record_queue_wait(root.traceparent)
+    tracer.record_queue_wait(root.traceparent)
+
+    [_, queue_wait] = tracer.finished
+    assert queue_wait.name == "queue_wait"
+    assert queue_wait.parent_id == root.span_id
+    assert queue_wait.end_ns >= queue_wait.start_ns
+    assert tracer.queued_at == {}
+
+
+def test_queued_traces_are_bounded():
+    tracer = Tracer()
+    for number in range(MAX_QUEUED_TRACES + 1):
+        tracer.mark_queued(f"00-{number:032x}-{1:016x}-01")
+
+    assert len(tracer.queued_at) == MAX_QUEUED_TRACES
+    assert f"00-{0:032x}-{1:016x}-01" not in tracer.queued_at
+
+
+@patch("os.getenv")
+def test_configure_from_env(mock_getenv, tmp_path):
+    tracer = Tracer()
+    mock_getenv.side_effect = ["0.25", str(tmp_path / "spans.jsonl"), None]
+
+    tracer.configure_from_env()
+
+    assert tracer.sample_rate == 0.25
+    assert isinstance(tracer.exporter, FileSpanExporter)
+
+
+@patch("os.getenv")
+def test_configure_from_env_without_exporter(mock_getenv):
+    tracer = Tracer()
+    mock_getenv.side_effect = ["1", None, None]
+
+    tracer.configure_from_env()
+
+    assert not tracer.enabled
+
+
+async def test_file_export(tmp_path):
+    tracer = Tracer()
+    tracer.sample_rate = 1.0
+    tracer.exporter = FileSpanExporter(str(tmp_path / "spans.jsonl"))
+    with tracer.start_trace("webhook", DELIVERY_ID), tracer.span("parse"):
+        pass
+
+    await tracer.flush()
+
+    [line] = (tmp_path / "spans.jsonl").read_text().splitlines()
+    [resource_spans] = json.loads(line)["resourceSpans"]
+    assert resource_spans["resource"]["attributes"][0]["value"] == {"stringValue": "github-project-discord-bot"}
+    spans = resource_spans["scopeSpans"][0]["spans"]
+    assert [span["name"] for span in spans] == ["parse", "webhook"]
+    assert spans[0]["parentSpanId"] == spans[1]["spanId"]
+    assert "parentSpanId" not in spans[1]
+    assert tracer.finished == []
+    assert tracer.exported == 2
+
+
+async def test_failed_export_is_logged():
+    tracer = Tracer()
+    tracer.sample_rate = 1.0
+    tracer.exporter = AsyncMock()
+    tracer.exporter.export.side_effect = ConnectionError("down")
+    with tracer.start_trace("webhook", DELIVERY_ID):
+        pass
+
+    with patch("src.utils.tracing.server_logger") as mock_logger:
+        await tracer.flush()
+
+    mock_logger.error.assert_called_once_with("Failed to export %s spans: %s", 1, ANY)
+    assert str(mock_logger.error.call_args.args[2]) == "down"
+    assert tracer.exported == 0
+
+
+async def test_traced_client():
+    client = AsyncMock()
+    client.create_message.return_value = "message"
+    tracer.sample_rate = 1.0
+
+    with tracer.start_trace("webhook", DELIVERY_ID) as root:
+        assert await TracedClient(client, "discord").create_message(621, "meow") == "message"
+
+    client.create_message.assert_awaited_once_with(621, "meow")
+    assert tracer.finished[0].name == "discord.create_message"
+    assert tracer.finished[0].parent_id == root.span_id
@@ -0,0 +1,95 @@
+import gzip
+import os
+
+from src.utils.webhook_capture import WebhookCapture, read_capture, sanitize_headers, uncompressed_size
+
+
+def test_sanitize_headers():
+    headers = {
+        "X-GitHub-Delivery": "72d3162e",
+        "X-Hub-Signature-256": "sha256=00",
+        "Authorization": "Bearer token",
+        "Content-Type": "application/json",
+    }
+
+    assert sanitize_headers(headers) == {"x-github-delivery": "72d3162e", "content-type": "application/json"}
+
+
+def test_records_are_read_back(tmp_path):
+    path = str(tmp_path / "capture.jsonl.gz")
+    capture = WebhookCapture(path)
+
+    capture.record({"X-GitHub-Event": "projects_v2_item"}, b'{"action": "created"}', received_at=1.5)
+    capture.record({}, '{"action": "żółw"}'.encode(), received_at=2.0)
+    capture.close().result()
+
+    assert list(read_capture(path)) == [
+        {"received_at": 1.5, "headers": {"x-github-event": "projects_v2_item"}, "body": '{"action": "created"}'},
+        {"received_at": 2.0, "headers": {}, "body": '{"action": "żółw"}'},
+    ]
+    assert capture.records == 2
+
+
+def test_full_files_are_rotated(tmp_path):
+    path = str(tmp_path / "capture.jsonl.gz")
+    capture = WebhookCapture(path, max_bytes=1, backup_count=2)
+
+    for received_at in range(4):
+        capture.record({}, b"{}", received_at=received_at)
+    capture.close().result()
+
+    assert not os.path.exists(path)
+    assert [record["received_at"] for record in read_capture(f"{path}.1")] == [3]
+    assert [record["received_at"] for record in read_capture(f"{path}.2")] == [2]
+    assert not os.path.exists(f"{path}.3")
+
+
+def test_truncated_file_yields_complete_records(tmp_path):
+    path = str(tmp_path / "capture.jsonl.gz")
+    capture = WebhookCapture(path)
+    for received_at in range(100):
+        capture.record({}, b"{}", received_at=received_at)
+    capture.close().result()
+    with open(path, "rb") as file:
+        data = file.read()
+    with open(path, "wb") as file:
+        file.write(data[:-10])
+
+    records = list(read_capture(path))
+
+    assert [record["received_at"] for record in records] == list(range(len(records)))
+
+
+def test_appending_to_existing_capture(tmp_path):
+    path = str(tmp_path / "capture.jsonl.gz")
+    with gzip.open(path, "wb") as file:
+        file.write(b'{"received_at": 0, "headers": {}, "body": "{}"}\n')
+    capture = WebhookCapture(path)
+
+    capture.record({}, b"{}", received_at=1)
+    capture.close().result()
+
+    assert [record["received_at"] for record in read_capture(path)] == [0, 1]
+
+
+def test_existing_capture_counts_towards_rotation(tmp_path):
+    path = str(tmp_path / "capture.jsonl.gz")
+    with gzip.open(path, "wb") as file:
+        file.write(b'{"received_at": 0, "headers": {}, "body": "{}"}\n' * 4)
+    capture = WebhookCapture(path, max_bytes=200, backup_count=1)
+
+    capture.record({}, b"{}", received_at=1)
+    capture.close().result()
+
+    assert not os.path.exists(path)
+    assert [record["received_at"] for record in read_capture(f"{path}.1")] == [0, 0, 0, 0, 1]
+
+
+def test_uncompressed_size(tmp_path):
+    path = str(tmp_path / "capture.jsonl.gz")
+    assert uncompressed_size(path) == 0
+
+    with gzip.open(path, "wb") as file:
+        file.write(b"x" * 1000)
+
+    assert uncompressed_size(path) == 1000
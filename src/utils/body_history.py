@@ -0,0 +1,79 @@
+import difflib
+import zlib
+from collections import OrderedDict
+
+BODY_HISTORY_MAX_ITEMS = 1024
+BODY_HISTORY_MAX_BYTES = 4 * 1024 * 1024
+# Bodies shorter than this are always reposted in full, a diff of a couple of lines is harder to read than the text
+BODY_DIFF_MIN_LENGTH = 200
+# A fenced diff has to fit in one Discord message with its header, split over two the code block is left open
+BODY_DIFF_MAX_LENGTH = 1900
+
+
+class BodyHistory:
+    """
+    Last seen body of every project item, kept zlib-compressed in LRU order and capped both in item count and size.
+    """
+
+    def __init__(self, max_items: int = BODY_HISTORY_MAX_ITEMS, max_bytes: int = BODY_HISTORY_MAX_BYTES):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self._bodies: OrderedDict[str, bytes] = OrderedDict()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return len(self._bodies)
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def get(self, node_id: str) -> str | None:
+        compressed = self._bodies.get(node_id)
+        if compressed is None:
+            return None
+        self._bodies.move_to_end(node_id)
+        return zlib.decompress(compressed).decode("utf-8")
+
+    def put(self, node_id: str, body: str):
+        self.discard(node_id)
+        compressed = zlib.compress(body.encode("utf-8"))
+        if len(compressed) > self.max_bytes:
+            return
+
+        self._bodies[node_id] = compressed
+        self._size += len(compressed)
+        while len(self._bodies) > self.max_items or self._size > self.max_bytes:
+            _, evicted = self._bodies.popitem(last=False)
+            self._size -= len(evicted)
+
+    def discard(self, node_id: str):
+        compressed = self._bodies.pop(node_id, None)
+        if compressed is not None:
+            self._size -= len(compressed)
+
+    def clear(self):
+        self._bodies.clear()
+        self._size = 0
+
+
+def create_body_diff(old_body: str, new_body: str) -> str:
+    diff_lines = difflib.unified_diff(old_body.splitlines(), new_body.splitlines(), n=1, lineterm="")
+    # Skip the "---" and "+++" file headers, there are no files here
+    return "\n".join(list(diff_lines)[2:])
+
+
+def get_body_diff(old_body: str | None, new_body: str) -> str | None:
+    """
+    Returns the diff between bodies, or None when the full body should be posted instead.
+    """
+    if old_body is None or len(new_body) < BODY_DIFF_MIN_LENGTH:
+        return None
+
+    diff = create_body_diff(old_body, new_body)
+    if len(diff) >= len(new_body) or len(diff) > BODY_DIFF_MAX_LENGTH:
+        return None
+    return diff
+
+
+body_history = BodyHistory()
@@ -0,0 +1,200 @@
+import asyncio
+import functools
+import inspect
+import time
+from collections.abc import Callable
+from contextlib import asynccontextmanager
+from enum import Enum
+from typing import Any
+
+from src.utils.error import CircuitOpenError, RateLimitExceededError
+from src.utils.misc import server_logger
+from src.utils.pipeline_health import ClientStats, discord_client_stats
+
+DEFAULT_FAILURE_THRESHOLD = 5
+# Seconds an open breaker waits before letting a probe through
+DEFAULT_RESET_TIMEOUT = 30.0
+DEFAULT_GITHUB_REQUEST_TIMEOUT = 10.0
+DEFAULT_DISCORD_REQUEST_TIMEOUT = 10.0
+# A single Discord call, its retries and possibly hikari's own rate limit waits
+DEFAULT_DISCORD_CALL_TIMEOUT = 60.0
+PARKED_POLL_INTERVAL = 0.5
+
+
+class CircuitState(Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+def is_upstream_failure(exception: Exception) -> bool:
+    """
+    Timeouts, connection errors and 5xx responses mean the upstream is degraded, client errors do not.
+    """
+    if isinstance(exception, RateLimitExceededError | CircuitOpenError):
+        return False
+    status = getattr(exception, "status", None)
+    if isinstance(status, int):
+        return status >= 500
+    return isinstance(exception, TimeoutError | ConnectionError) or type(exception).__module__.startswith("aiohttp")
+
+
+def is_discord_failure(exception: Exception) -> bool:
+    from hikari import HTTPError, HTTPResponseError, RateLimitTooLongError
+
+    if isinstance(exception, RateLimitTooLongError):
+        return False
+    if isinstance(exception, HTTPError) and not isinstance(exception, HTTPResponseError):
+        # Raised by hikari when a request fails before getting a response
+        return True
+    return is_upstream_failure(exception)
+
+
+class CircuitBreaker:
+    """
+    Stops calling an upstream after `failure_threshold` consecutive failures. Once `reset_timeout` passes a single
+    probe call is let through (half-open): success closes the breaker, failure opens it again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        timeout: float,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        reset_timeout: float = DEFAULT_RESET_TIMEOUT,
+        is_failure: Callable[[Exception], bool] = is_upstream_failure,
+    ):
+        self.name = name
+        self.timeout = timeout
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.is_failure = is_failure
+        self.consecutive_failures = 0
+        self.times_opened = 0
+        self._state = CircuitState.CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> CircuitState:
+        if self._state == CircuitState.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = CircuitState.HALF_OPEN
+        return self._state
+
+    def retry_in(self) -> float:
+        if self.state != CircuitState.OPEN:
+            return 0.0
+        return self.reset_timeout - (time.monotonic() - self._opened_at)
+
+    def allows_requests(self) -> bool:
+        state = self.state
+        return state == CircuitState.CLOSED or (state == CircuitState.HALF_OPEN and not self._probe_in_flight)
+
+    def record_success(self):
+        if self._state != CircuitState.CLOSED:
+            server_logger.info("Circuit breaker %s closed.", self.name)
+        self._state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self._state == CircuitState.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self._state != CircuitState.OPEN:
+                self.times_opened += 1
+                server_logger.warning(
+                    "Circuit breaker %s opened after %s failures.", self.name, self.consecutive_failures
+                )
+            self._state = CircuitState.OPEN
+            self._opened_at = time.monotonic()
+
+    @asynccontextmanager
+    async def guard(self):
+        """
+        Runs the block within the call deadline and records its outcome. Raises `CircuitOpenError` without running it
+        while the breaker is open.
+        """
+        if not self.allows_requests():
+            raise CircuitOpenError(self.name, self.retry_in())
+        probe = self.state == CircuitState.HALF_OPEN
+        if probe:
+            self._probe_in_flight = True
+        try:
+            async with asyncio.timeout(self.timeout):
+                yield
+        except Exception as exception:
+            if self.is_failure(exception):
+                self.record_failure()
+            elif not isinstance(exception, RateLimitExceededError | CircuitOpenError):
+                # The upstream answered, even if with an error of ours
+                self.record_success()
+            raise
+        else:
+            self.record_success()
+        finally:
+            if probe:
+                self._probe_in_flight = False
+
+    async def wait_until_available(self):
+        while not self.allows_requests():
+            await asyncio.sleep(PARKED_POLL_INTERVAL)
+
+    def reset(self):
+        self._state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self.times_opened = 0
+        self._probe_in_flight = False
+
+    def snapshot(self) -> dict:
+        return {
+            "state": self.state.value,
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+            "retry_in": self.retry_in(),
+        }
+
+
+github_breaker = CircuitBreaker("github", DEFAULT_GITHUB_REQUEST_TIMEOUT)
+discord_breaker = CircuitBreaker("discord", DEFAULT_DISCORD_CALL_TIMEOUT, is_failure=is_discord_failure)
+
+
+class GuardedClient:
+    """
+    Proxy running every coroutine method of the wrapped client within the breaker, so only calls to that upstream count
+    towards it and get its deadline. A GitHub lookup made during an update does not.
+
+    With `park` set, a call refused by the open breaker waits until the breaker lets it through instead of raising
+    `CircuitOpenError`. Only that call is repeated, never the steps before it, which may not be safe to run twice.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        breaker: CircuitBreaker = discord_breaker,
+        stats: ClientStats = discord_client_stats,
+        park: bool = False,
+    ):
+        self._client = client
+        self._breaker = breaker
+        self._stats = stats
+        self._park = park
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self._client, name)
+        if not inspect.iscoroutinefunction(attribute):
+            return attribute
+
+        @functools.wraps(attribute)
+        async def guarded(*args, **kwargs):
+            while True:
+                try:
+                    # Calls refused by an open breaker are not sent, nor counted
+                    async with self._breaker.guard():
+                        with self._stats.track():
+                            return await attribute(*args, **kwargs)
+                except CircuitOpenError as error:
+                    if not self._park:
+                        raise
+                    server_logger.warning("Call %s parked, %s", name, error)
+                    await self._breaker.wait_until_available()
+
+        return guarded
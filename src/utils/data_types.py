@@ -1,17 +1,28 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import Literal
+from typing import TYPE_CHECKING, ClassVar, Literal
 
-from hikari import ForumTag, GuildPublicThread
-from hikari.impl import RESTClientImpl
 from pydantic import BaseModel, ConfigDict, Field, model_validator
 from pydantic_core import PydanticCustomError
 
+from src.utils.body_history import body_history, get_body_diff
 from src.utils.discord_rest_client import fetch_forum_channel, get_new_tag
-from src.utils.error import ForumChannelNotFound
-from src.utils.misc import SharedForumChannel, bot_logger, retrieve_discord_id
+from src.utils.error import ForumChannelNotFound, ForumTagCreationError
+from src.utils.event_codec import register_enum, register_event
+from src.utils.misc import SharedForumChannel, bot_logger
+from src.utils.storage import load_discord_id_mapping
+from src.utils.thread_cache import thread_cache
 
+# hikari is only needed once events are processed, importing it here would slow down the server start
+if TYPE_CHECKING:
+    from hikari import GuildPublicThread
+    from hikari.impl import RESTClientImpl
 
+# Tag creations racing with other updates of the same forum channel are retried on top of the newer tags
+MAX_TAG_CREATE_ATTEMPTS = 3
+
+
+@register_enum(1)
 class SimpleProjectItemEventType(Enum):
     CREATED = "created"
     ARCHIVED = "archived"
@@ -19,6 +30,7 @@ class SimpleProjectItemEventType(Enum):
     DELETED = "deleted"
 
 
+@register_enum(2)
 class SingleSelectType(Enum):
     STATUS = "Status"
     PRIORITY = "Priority"
@@ -27,13 +39,19 @@ class SingleSelectType(Enum):
     SECTION = "Section"
 
 
-@dataclass
+# Events are slotted and registered with a stable tag in `event_codec`, so queued and journaled events stay small
+@register_event(1)
+@dataclass(slots=True)
 class ProjectItemEvent:
     # Used for appending link to Discord post
     item_id: int
     # Used for request to GitHub API
     node_id: str
     sender: str
+    # Routes the event to the forum channel of its project, set once the webhook is accepted
+    project_node_id: str | None = field(default=None, compare=False, kw_only=True)
+    # W3C traceparent of the webhook that produced the event, continues its trace in the bot
+    trace_parent: str | None = field(default=None, compare=False, kw_only=True)
 
     async def process(
         self,
@@ -47,9 +65,18 @@ class ProjectItemEvent:
         Interface method to process the event and optionally return message to be posted in Discord.
         """
 
+    async def mentioned_users(self) -> list[str]:
+        """
+        Discord ids of the users the message of `process` mentions, pinged along with its author.
+        """
+        return []
 
+
+@register_event(2)
 class SimpleProjectItemEvent(ProjectItemEvent):
-    def __init__(self, item_id: int, node_id: str, sender: str, action_type: str):
+    __slots__ = ("event_type",)
+
+    def __init__(self, item_id: int, node_id: str, sender: str, action_type: str | SimpleProjectItemEventType):
         super().__init__(item_id, node_id, sender)
         self.event_type = SimpleProjectItemEventType(action_type)
 
@@ -61,29 +88,45 @@ class SimpleProjectItemEvent(ProjectItemEvent):
         _shared_forum_channel: SharedForumChannel,
         _forum_channel_id: int,
     ) -> str | None:
-        match self.event_type:
-            case SimpleProjectItemEventType.ARCHIVED:
-                message = f"Task zarchiwizowany przez: {user_text_mention}."
-                await client.edit_channel(post.id, archived=True)
-                bot_logger.info(f"Post {self.node_id} archived.")
-                return message
-            case SimpleProjectItemEventType.RESTORED:
-                message = f"Task przywrócony przez: {user_text_mention}."
-                await client.edit_channel(post.id, archived=False)
-                bot_logger.info(f"Post {self.node_id} restored.")
-                return message
-            case SimpleProjectItemEventType.DELETED:
-                await client.delete_channel(post.id)
-                bot_logger.info(f"Post {self.node_id} deleted.")
-                return None
-            case _:
-                return None
+        action = self.actions.get(self.event_type)
+        if action is None:
+            return None
+        return await action(self, user_text_mention, post, client)
+
+    async def archive(self, user_text_mention: str, post: GuildPublicThread, client: RESTClientImpl) -> str:
+        message = f"Task zarchiwizowany przez: {user_text_mention}."
+        thread_cache.remember(await client.edit_channel(post.id, archived=True))
+        bot_logger.info("Post %s archived.", self.node_id)
+        return message
 
+    async def restore(self, user_text_mention: str, post: GuildPublicThread, client: RESTClientImpl) -> str:
+        message = f"Task przywrócony przez: {user_text_mention}."
+        thread_cache.remember(await client.edit_channel(post.id, archived=False))
+        bot_logger.info("Post %s restored.", self.node_id)
+        return message
+
+    async def delete(self, _user_text_mention: str, post: GuildPublicThread, client: RESTClientImpl) -> None:
+        await client.delete_channel(post.id)
+        thread_cache.remove(post.id)
+        bot_logger.info("Post %s deleted.", self.node_id)
+
+    # Created events need no action of their own, the bot creates the post of every item that has none yet
+    actions: ClassVar[dict] = {
+        SimpleProjectItemEventType.ARCHIVED: archive,
+        SimpleProjectItemEventType.RESTORED: restore,
+        SimpleProjectItemEventType.DELETED: delete,
+    }
 
+
+@register_event(3)
 class ProjectItemEditedBody(ProjectItemEvent):
-    def __init__(self, item_id: int, node_id: str, editor: str, new_body: str):
+    __slots__ = ("new_body", "old_body")
+
+    def __init__(self, item_id: int, node_id: str, editor: str, new_body: str, old_body: str | None = None):
         super().__init__(item_id, node_id, editor)
         self.new_body = new_body
+        # Body before the edit as sent in the webhook, used when the history does not know the item (e.g. after restart)
+        self.old_body = old_body
 
     async def process(
         self,
@@ -92,14 +135,29 @@ class ProjectItemEditedBody(ProjectItemEvent):
         client: RESTClientImpl,
         _shared_forum_channel: SharedForumChannel,
         forum_channel_id: int,
-    ) -> str:
-        message = f"Opis taska zaktualizowany przez: {user_text_mention}. Nowy opis: \n{self.new_body}"
-        bot_logger.info(f"Post {self.node_id} body updated.")
+    ) -> str | None:
+        previous_body = body_history.get(self.node_id)
+        if previous_body is None:
+            previous_body = self.old_body
+        body_history.put(self.node_id, self.new_body)
+        if previous_body == self.new_body:
+            bot_logger.info("Post %s body unchanged.", self.node_id)
+            return None
+
+        diff = get_body_diff(previous_body, self.new_body)
+        if diff is None:
+            message = f"Opis taska zaktualizowany przez: {user_text_mention}. Nowy opis: \n{self.new_body}"
+        else:
+            message = f"Opis taska zaktualizowany przez: {user_text_mention}. Zmiany w opisie: \n```diff\n{diff}\n```"
+        bot_logger.info("Post %s body updated.", self.node_id)
 
         return message
 
 
+@register_event(4)
 class ProjectItemEditedAssignees(ProjectItemEvent):
+    __slots__ = ("new_assignees",)
+
     def __init__(self, item_id: int, node_id: str, editor: str, new_assignees: list[str]):
         super().__init__(item_id, node_id, editor)
         self.new_assignees = new_assignees
@@ -111,24 +169,28 @@ class ProjectItemEditedAssignees(ProjectItemEvent):
         client: RESTClientImpl,
         _shared_forum_channel: SharedForumChannel,
         forum_channel_id: int,
-    ) -> None:
-        assignee_mentions: list[str] = []
-        assignee_discord_ids: list[int] = []
+    ) -> str:
         if self.new_assignees:
-            for assignee in self.new_assignees:
-                discord_id = retrieve_discord_id(assignee)
-                if discord_id:
-                    assignee_mentions.append(f"<@{discord_id}>")
-                    assignee_discord_ids.append(int(discord_id))
+            assignee_mentions = [f"<@{discord_id}>" for discord_id in await self.mentioned_users()]
         else:
-            assignee_mentions.append("Brak przypisanych osób")
+            assignee_mentions = ["Brak przypisanych osób"]
+
+        bot_logger.info("Post %s assignees updated.", self.node_id)
+        return f"Osoby przypisane do taska edytowane, aktualni przypisani: {', '.join(assignee_mentions)}"
 
-        message = f"Osoby przypisane do taska edytowane, aktualni przypisani: {', '.join(assignee_mentions)}"
-        await client.create_message(post.id, message, user_mentions=assignee_discord_ids)
-        bot_logger.info(f"Post {self.node_id} assignees updated.")
+    async def mentioned_users(self) -> list[str]:
+        if not self.new_assignees:
+            return []
+        discord_id_mapping = await load_discord_id_mapping()
+        return [
+            str(discord_id_mapping[assignee]) for assignee in self.new_assignees if discord_id_mapping.get(assignee)
+        ]
 
 
+@register_event(5)
 class ProjectItemEditedTitle(ProjectItemEvent):
+    __slots__ = ("new_title",)
+
     def __init__(self, item_id: int, node_id: str, editor: str, new_name: str):
         super().__init__(item_id, node_id, editor)
         self.new_title = new_name
@@ -141,12 +203,15 @@ class ProjectItemEditedTitle(ProjectItemEvent):
         _shared_forum_channel: SharedForumChannel,
         forum_channel_id: int,
     ) -> None:
-        await client.edit_channel(post.id, name=self.new_title)
-        bot_logger.info(f"Post {self.node_id} title updated to {self.new_title}.")
+        thread_cache.remember(await client.edit_channel(post.id, name=self.new_title))
+        bot_logger.info("Post %s title updated to %s.", self.node_id, self.new_title)
 
 
+@register_event(6)
 class ProjectItemEditedSingleSelect(ProjectItemEvent):
-    def __init__(self, item_id: int, node_id: str, editor: str, new_value: str, field_name: str):
+    __slots__ = ("new_value", "value_type")
+
+    def __init__(self, item_id: int, node_id: str, editor: str, new_value: str, field_name: str | SingleSelectType):
         super().__init__(item_id, node_id, editor)
         self.new_value = new_value
         self.value_type = SingleSelectType(field_name)
@@ -159,33 +224,42 @@ class ProjectItemEditedSingleSelect(ProjectItemEvent):
         shared_forum_channel: SharedForumChannel,
         forum_channel_id: int,
     ) -> str:
-        async with shared_forum_channel.lock.reader_lock:
-            available_tags = list(shared_forum_channel.forum_channel.available_tags)
+        from hikari import ForumTag
+
+        snapshot = shared_forum_channel.snapshot
         current_tag_ids = list(post.applied_tag_ids)
 
-        for tag in available_tags:
+        for tag in snapshot.available_tags:
             if tag.id in current_tag_ids and tag.name.startswith(f"{self.value_type.value}: "):
                 current_tag_ids.remove(tag.id)
 
         new_tag_name = f"{self.value_type.value}: {self.new_value}"[:48]
-        new_tag = get_new_tag(new_tag_name, available_tags)
-
-        if new_tag is None:
-            bot_logger.info(f"Tag {new_tag_name} not found, creating new tag.")
-            await client.edit_channel(forum_channel_id, available_tags=[*available_tags, ForumTag(name=new_tag_name)])
+        new_tag = get_new_tag(new_tag_name, snapshot.available_tags)
+
+        attempts = 0
+        while new_tag is None:
+            if attempts == MAX_TAG_CREATE_ATTEMPTS:
+                raise ForumTagCreationError(f"Tag {new_tag_name} is missing after {attempts} attempts to create it.")
+            attempts += 1
+            bot_logger.info("Tag %s not found, creating new tag.", new_tag_name)
+            await client.edit_channel(
+                forum_channel_id, available_tags=[*snapshot.available_tags, ForumTag(name=new_tag_name)]
+            )
             forum_channel = await fetch_forum_channel(client, forum_channel_id)
             if forum_channel is None:
                 raise ForumChannelNotFound(f"Forum channel with ID {forum_channel_id} not found.")
-            async with shared_forum_channel.lock.writer_lock:
-                shared_forum_channel.forum_channel = forum_channel
-            async with shared_forum_channel.lock.reader_lock:
-                available_tags = list(shared_forum_channel.forum_channel.available_tags)
-            new_tag = get_new_tag(new_tag_name, available_tags)
+            if not shared_forum_channel.compare_and_set(snapshot, forum_channel):
+                # Another update published its tags meanwhile, the edit above may have dropped them, so the tag is
+                # looked up again in the newer version and created on top of it if it is missing there
+                bot_logger.info("Forum channel %s changed while creating tag %s.", forum_channel_id, new_tag_name)
+            snapshot = shared_forum_channel.snapshot
+            new_tag = get_new_tag(new_tag_name, snapshot.available_tags)
 
         current_tag_ids.append(new_tag.id)
 
-        await client.edit_channel(post.id, applied_tags=current_tag_ids)
-        bot_logger.info(f"Post {self.node_id} tag updated to {new_tag_name}.")
+        # The next tag change of this post starts from the returned thread instead of fetching it again
+        thread_cache.remember(await client.edit_channel(post.id, applied_tags=current_tag_ids))
+        bot_logger.info("Post %s tag updated to %s.", self.node_id, new_tag_name)
 
         message = (
             f"Tag '{self.value_type.value}' zaktualizowany przez: {user_text_mention}. Nowa wartość: {self.new_value}"
@@ -193,7 +267,10 @@ class ProjectItemEditedSingleSelect(ProjectItemEvent):
         return message
 
 
+@register_event(7)
 class ProjectItemEditedDate(ProjectItemEvent):
+    __slots__ = ("new_date",)
+
     def __init__(self, item_id: int, node_id: str, editor: str, new_date: str):
         super().__init__(item_id, node_id, editor)
         self.new_date = new_date
@@ -207,7 +284,7 @@ class ProjectItemEditedDate(ProjectItemEvent):
         forum_channel_id: int,
     ) -> str:
         message = f"Data zadania zaktualizowana przez: {user_text_mention}. Nowa data: {self.new_date}"
-        bot_logger.info(f"Post {self.node_id} date updated.")
+        bot_logger.info("Post %s date updated.", self.node_id)
 
         return message
 
@@ -228,6 +305,7 @@ class Sender(BaseModel):
 
 class Body(BaseModel):
     to: str
+    from_: str | None = Field(default=None, alias="from")
 
     model_config = ConfigDict(extra="allow")
 
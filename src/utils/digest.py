@@ -0,0 +1,143 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from src.utils.circuit_breaker import is_discord_failure
+from src.utils.discord_rest_client import MAX_MESSAGE_LENGTH, send_message
+from src.utils.misc import bot_logger, handle_task_exception
+
+if TYPE_CHECKING:
+    from hikari.impl import RESTClientImpl
+
+    from src.utils.data_types import ProjectItemEvent
+
+# Seconds the shutdown waits for digests to be sent before returning them for the journal
+DIGEST_SHUTDOWN_TIMEOUT = 3.0
+
+
+@dataclass
+class PendingDigest:
+    post_id: int
+    messages: list[str] = field(default_factory=list)
+    # Dict keys keep the order the users were first mentioned in
+    user_mentions: dict[str, None] = field(default_factory=dict)
+    # The event behind each message, saved to the journal when the digest is not sent before shutdown
+    events: list[ProjectItemEvent] = field(default_factory=list)
+
+
+def format_digest(messages: list[str]) -> str:
+    if len(messages) == 1:
+        return messages[0]
+    changes = "\n".join(f"{number}. {message}" for number, message in enumerate(messages, start=1))
+    return f"Podsumowanie zmian ({len(messages)}):\n{changes}"
+
+
+def split_digest(messages: list[str]) -> list[list[str]]:
+    """
+    Groups the messages so the digest of each group fits in a single Discord message. Groups are cut between messages,
+    never inside one, e.g. in the middle of a diff block. A message over the limit on its own gets a group of its own.
+    """
+    groups = [[]]
+    for message in messages:
+        if groups[-1] and len(format_digest([*groups[-1], message])) > MAX_MESSAGE_LENGTH:
+            groups.append([])
+        groups[-1].append(message)
+    return groups
+
+
+class MessageDigest:
+    """
+    Collects the messages for a thread for `window` seconds after the first one, then sends them as a single numbered
+    message, so a burst of changes to one card costs one Discord request instead of one per change.
+
+    A digest that fails because Discord is degraded is collected again and retried with the next window, a shutdown
+    returns the events of the digests it could not send.
+    """
+
+    def __init__(self, client: RESTClientImpl, window: float):
+        self.client = client
+        self.window = window
+        self.pending: dict[int, PendingDigest] = {}
+        # Tasks still waiting for the window of their thread to end
+        self.flush_tasks: dict[int, asyncio.Task] = {}
+        # Every flush task, including those already sending
+        self.tasks: set[asyncio.Task] = set()
+        # Set on shutdown, collected messages are no longer scheduled for sending
+        self.closed = False
+
+    def add(self, post_id: int, message: str, user_mentions: list[str], event: ProjectItemEvent):
+        pending = self._collect(post_id)
+        pending.messages.append(message)
+        pending.user_mentions.update(dict.fromkeys(user_mentions))
+        pending.events.append(event)
+
+    def _collect(self, post_id: int) -> PendingDigest:
+        pending = self.pending.get(post_id)
+        if pending is None:
+            pending = self.pending[post_id] = PendingDigest(post_id)
+            if not self.closed:
+                flush_task = asyncio.create_task(self._flush_later(post_id))
+                flush_task.add_done_callback(lambda task: handle_task_exception(task, "Error sending digest:"))
+                flush_task.add_done_callback(self.tasks.discard)
+                self.flush_tasks[post_id] = flush_task
+                self.tasks.add(flush_task)
+        return pending
+
+    def _requeue(self, digest: PendingDigest):
+        # Ahead of the messages collected while it was being sent
+        pending = self._collect(digest.post_id)
+        pending.messages[:0] = digest.messages
+        pending.user_mentions = {**digest.user_mentions, **pending.user_mentions}
+        pending.events[:0] = digest.events
+
+    async def _flush_later(self, post_id: int):
+        await asyncio.sleep(self.window)
+        self.flush_tasks.pop(post_id, None)
+        await self.flush(post_id)
+
+    async def flush(self, post_id: int):
+        pending = self.pending.pop(post_id, None)
+        if pending is None:
+            return
+        bot_logger.info("Sending digest of %s messages to post %s.", len(pending.messages), post_id)
+        try:
+            for group in split_digest(pending.messages):
+                await send_message(self.client, post_id, format_digest(group), list(pending.user_mentions))
+                del pending.messages[: len(group)]
+                del pending.events[: len(group)]
+        except asyncio.CancelledError:
+            self._requeue(pending)
+            raise
+        except Exception as exception:
+            if not is_discord_failure(exception):
+                raise
+            bot_logger.error("Failed to send digest to post %s, collecting it again: %s", post_id, exception)
+            self._requeue(pending)
+
+    async def flush_all(self) -> list[ProjectItemEvent]:
+        """
+        Sends every collected digest right away and waits up to `DIGEST_SHUTDOWN_TIMEOUT` seconds for them and for
+        those already being sent. Returns the events of the messages that were not sent.
+        """
+        self.closed = True
+        for flush_task in self.flush_tasks.values():
+            flush_task.cancel()
+        self.flush_tasks.clear()
+        flushes = [asyncio.create_task(self.flush(post_id)) for post_id in list(self.pending)]
+        running = [*self.tasks, *flushes]
+        if running:
+            _done, late = await asyncio.wait(running, timeout=DIGEST_SHUTDOWN_TIMEOUT)
+            for task in late:
+                task.cancel()
+            results = await asyncio.gather(*flushes, *late, return_exceptions=True)
+            for result in results[: len(flushes)]:
+                if isinstance(result, Exception):
+                    bot_logger.error("Failed to send digest: %s", result)
+
+        unsent = [event for pending in self.pending.values() for event in pending.events]
+        if unsent:
+            bot_logger.warning("%s digest messages were not sent before shutdown.", len(unsent))
+        return unsent
+
+    def __len__(self) -> int:
+        return len(self.pending)
@@ -1,41 +1,69 @@
-import os
-import shelve
+from collections.abc import Sequence
+from typing import TYPE_CHECKING
 
-from hikari import ForumTag, GuildForumChannel, GuildThreadChannel
-from hikari.impl import RESTClientImpl
+from src.utils.project_mirror import TITLE, project_mirror
+from src.utils.storage import PostStore, post_store
+from src.utils.thread_cache import thread_cache
 
-from src.utils.github_api import fetch_item_name
+if TYPE_CHECKING:
+    from hikari import ForumTag, GuildForumChannel, GuildThreadChannel
+    from hikari.impl import RESTClientImpl
+
+MAX_MESSAGE_LENGTH = 2000
 
 
 async def fetch_forum_channel(client: RESTClientImpl, forum_channel_id: int) -> GuildForumChannel | None:
+    from hikari import GuildForumChannel
+
     forum_channel = await client.fetch_channel(forum_channel_id)
     if forum_channel is None or not isinstance(forum_channel, GuildForumChannel):
         return None
     return forum_channel
 
 
-def get_new_tag(new_tag_name: str, available_tags: list[ForumTag]) -> ForumTag | None:
+async def send_message(client: RESTClientImpl, channel_id: int, message: str, user_mentions: list[str]):
+    """
+    Sends a message, split into several when it is over Discord's length limit.
+    """
+    messages = []
+    while len(message) > MAX_MESSAGE_LENGTH:
+        messages.append(message[:MAX_MESSAGE_LENGTH])
+        message = message[MAX_MESSAGE_LENGTH:]
+
+    messages.append(message)
+
+    for msg in messages:
+        await client.create_message(channel_id, msg, user_mentions=user_mentions)
+
+
+def get_new_tag(new_tag_name: str, available_tags: Sequence[ForumTag]) -> ForumTag | None:
     new_tag = next((tag for tag in available_tags if tag.name == new_tag_name), None)
     return new_tag
 
 
 async def get_post_id_or_post(
-    node_id: str, discord_guild_id: int, forum_channel_id: int, rest_client: RESTClientImpl
+    node_id: str,
+    discord_guild_id: int,
+    forum_channel_id: int,
+    rest_client: RESTClientImpl,
+    store: PostStore = post_store,
 ) -> int | GuildThreadChannel | None:
-    with shelve.open(os.getenv("POST_ID_DB_PATH", "post_id.db")) as db:
-        try:
-            post_id: str = db[node_id]
-            return int(post_id)
-        except KeyError:
-            pass
-        name = await fetch_item_name(node_id)
-        for thread in await rest_client.fetch_active_threads(discord_guild_id):
-            if thread.name == name:
-                db[name] = str(thread.id)
-                return thread
-        for thread in await rest_client.fetch_public_archived_threads(forum_channel_id):
-            if thread.name == name:
-                db[name] = str(thread.id)
-                return thread
+    post_id = await store.get(node_id)
+    if post_id is not None:
+        return post_id
+
+    name = await project_mirror.get_or_fetch(node_id, TITLE)
+    cached_thread = thread_cache.find_by_name(name, forum_channel_id)
+    if cached_thread is not None:
+        await store.set(node_id, cached_thread.id)
+        return cached_thread
+    for thread in await rest_client.fetch_active_threads(discord_guild_id):
+        if thread.name == name:
+            await store.set(node_id, thread.id)
+            return thread
+    for thread in await rest_client.fetch_public_archived_threads(forum_channel_id):
+        if thread.name == name:
+            await store.set(node_id, thread.id)
+            return thread
 
     return None
@@ -0,0 +1,168 @@
+import asyncio
+import os
+import signal
+import threading
+import time
+from collections.abc import Callable
+
+from src.utils.data_types import ProjectItemEvent
+from src.utils.error import EventDecodeError
+from src.utils.event_codec import decode_events, encode_events
+from src.utils.misc import bot_logger
+from src.utils.storage import run_in_storage_thread
+
+# Stays below the 30 s orchestrators usually give a container between SIGTERM and SIGKILL
+DEFAULT_DRAIN_DEADLINE = 25.0
+DRAIN_POLL_INTERVAL = 0.05
+SHUTDOWN_SIGNALS = (signal.SIGINT, signal.SIGTERM)
+
+
+class UpdateTracker:
+    """
+    Keeps the updates the bot is working on, so a shutdown can wait for them or persist their events.
+    """
+
+    def __init__(self):
+        self.updates: dict[asyncio.Task, ProjectItemEvent] = {}
+        # Events of finished updates whose messages could not be sent, e.g. digests left over by the bot
+        self.unsent: list[ProjectItemEvent] = []
+
+    def track(self, task: asyncio.Task, event: ProjectItemEvent):
+        self.updates[task] = event
+        task.add_done_callback(lambda done_task: self.updates.pop(done_task, None))
+
+    def __len__(self) -> int:
+        return len(self.updates)
+
+
+class DrainSignalHandler:
+    """
+    Calls `on_drain` as soon as SIGINT or SIGTERM arrives and passes the signal on to the previous handler, uvicorn's,
+    `grace_period` seconds later. Uvicorn stops accepting connections as soon as it gets the signal and runs the
+    lifespan shutdown only after the open requests are done, so the app could not refuse webhooks or report that it is
+    draining without this. A second signal is passed on right away.
+    """
+
+    def __init__(self, on_drain: Callable[[], None], grace_period: float):
+        self.on_drain = on_drain
+        self.grace_period = grace_period
+        self.previous_handlers: dict[int, Callable | int | None] = {}
+        self.draining = False
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def install(self):
+        # Signal handlers can only be set from the main thread, e.g. not when the app runs in a test client
+        if threading.current_thread() is not threading.main_thread():
+            return
+        self._loop = asyncio.get_running_loop()
+        for signal_number in SHUTDOWN_SIGNALS:
+            self.previous_handlers[signal_number] = signal.getsignal(signal_number)
+            signal.signal(signal_number, self.handle)
+
+    def uninstall(self):
+        for signal_number, previous_handler in self.previous_handlers.items():
+            if previous_handler is not None and signal.getsignal(signal_number) == self.handle:
+                signal.signal(signal_number, previous_handler)
+        self.previous_handlers.clear()
+
+    def handle(self, signal_number: int, frame):
+        first_signal = not self.draining
+        self.draining = True
+        self.on_drain()
+        if not first_signal or self.grace_period <= 0:
+            self.pass_on(signal_number, frame)
+            return
+        # Signal handlers run between any two bytecodes, e.g. while the logging lock is held, so anything beyond
+        # setting flags runs on the loop, which must only be touched thread-safely
+        self._loop.call_soon_threadsafe(self.start_grace_period, signal_number, frame)
+
+    def start_grace_period(self, signal_number: int, frame):
+        bot_logger.info("Draining for %s s before shutting down.", self.grace_period)
+        self._loop.call_later(self.grace_period, self.pass_on, signal_number, frame)
+
+    def pass_on(self, signal_number: int, frame):
+        previous_handler = self.previous_handlers.get(signal_number)
+        if callable(previous_handler):
+            previous_handler(signal_number, frame)
+            return
+        # The default action, i.e. exiting
+        self.uninstall()
+        signal.raise_signal(signal_number)
+
+
+async def drain_updates(
+    queue: asyncio.Queue[ProjectItemEvent], bot_task: asyncio.Task, tracker: UpdateTracker, deadline: float
+) -> list[ProjectItemEvent]:
+    """
+    Lets the bot work through the queued and in-flight updates for up to `deadline` seconds, then stops it.
+
+    Returns the events that were not processed in time: those still queued, those of cancelled updates and those whose
+    messages the bot could not send. A cancelled update may have been partially applied, so replaying it can repeat a
+    message.
+    """
+    give_up_at = time.monotonic() + deadline
+    while time.monotonic() < give_up_at:
+        # A dead bot won't take anything from the queue anymore
+        queue_settled = queue.empty() or bot_task.done()
+        if queue_settled and not tracker.updates:
+            break
+        await asyncio.sleep(DRAIN_POLL_INTERVAL)
+
+    bot_task.cancel()
+    await asyncio.gather(bot_task, return_exceptions=True)
+
+    unfinished = list(tracker.updates)
+    leftovers = [*tracker.unsent, *(tracker.updates[task] for task in unfinished)]
+    for task in unfinished:
+        task.cancel()
+    await asyncio.gather(*unfinished, return_exceptions=True)
+
+    while not queue.empty():
+        leftovers.append(queue.get_nowait())
+    return leftovers
+
+
+def get_journal_path() -> str:
+    return os.getenv("UPDATE_JOURNAL_PATH", "update_journal.bin")
+
+
+def _write_journal(path: str, data: bytes):
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, "wb") as file:
+        file.write(data)
+    os.replace(temporary_path, path)
+
+
+def _read_journal(path: str) -> bytes | None:
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as file:
+        data = file.read()
+    os.remove(path)
+    return data
+
+
+async def save_journal(events: list[ProjectItemEvent], path: str | None = None):
+    if not events:
+        return
+    path = path or get_journal_path()
+    await run_in_storage_thread(_write_journal, path, encode_events(events))
+    bot_logger.warning("Saved %s unprocessed events to %s.", len(events), path)
+
+
+async def load_journal(path: str | None = None) -> list[ProjectItemEvent]:
+    """
+    Reads and removes the events saved by the previous shutdown.
+    """
+    path = path or get_journal_path()
+    data = await run_in_storage_thread(_read_journal, path)
+    if not data:
+        return []
+    try:
+        events = decode_events(data)
+    except EventDecodeError as error:
+        bot_logger.error("Failed to read update journal %s: %s", path, error)
+        await run_in_storage_thread(_write_journal, f"{path}.corrupt", data)
+        return []
+    bot_logger.info("Restored %s events from %s.", len(events), path)
+    return events
@@ -1,2 +1,35 @@
 class ForumChannelNotFound(SystemExit):
     pass
+
+
+class ForumTagCreationError(Exception):
+    pass
+
+
+class EventDecodeError(ValueError):
+    pass
+
+
+class InvalidQueryError(ValueError):
+    pass
+
+
+class InvalidRoutesError(ValueError):
+    pass
+
+
+class RateLimitExceededError(Exception):
+    def __init__(self, retry_after: float):
+        super().__init__(f"GitHub API rate limit exhausted, resets in {retry_after:.0f} s.")
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, upstream: str, retry_after: float):
+        super().__init__(f"Circuit breaker {upstream} is open, retrying in {retry_after:.0f} s.")
+        self.upstream = upstream
+        self.retry_after = retry_after
+
+
+class ProfilerBusyError(Exception):
+    pass
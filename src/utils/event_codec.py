@@ -0,0 +1,229 @@
+import struct
+from collections.abc import Iterable
+from enum import Enum
+from typing import Any
+
+from src.utils.error import EventDecodeError
+
+# Bumped whenever the layout below changes, so journals written by an older version are rejected instead of misread
+FORMAT_VERSION = 3
+
+# Value tags. Ints and lengths are varints (ints zigzag encoded first), so ids and short strings take a few bytes
+NONE = 0x00
+FALSE = 0x01
+TRUE = 0x02
+INT = 0x03
+FLOAT = 0x04
+STR = 0x05
+LIST = 0x06
+ENUM = 0x07
+
+event_types: dict[int, type] = {}
+event_tags: dict[type, int] = {}
+enum_types: dict[int, type[Enum]] = {}
+enum_tags: dict[type[Enum], int] = {}
+_slot_names: dict[type, tuple[str, ...]] = {}
+
+
+def register_event(tag: int):
+    """
+    Class decorator assigning a stable tag to an event class. Tags are written to the encoded events, never reuse one.
+    """
+
+    def decorator(cls: type) -> type:
+        if tag in event_types:
+            raise ValueError(f"Event tag {tag} is already used by {event_types[tag].__name__}.")
+        event_types[tag] = cls
+        event_tags[cls] = tag
+        return cls
+
+    return decorator
+
+
+def register_enum(tag: int):
+    def decorator(cls: type[Enum]) -> type[Enum]:
+        if tag in enum_types:
+            raise ValueError(f"Enum tag {tag} is already used by {enum_types[tag].__name__}.")
+        enum_types[tag] = cls
+        enum_tags[cls] = tag
+        return cls
+
+    return decorator
+
+
+def slot_names(cls: type) -> tuple[str, ...]:
+    """
+    Slots of the class and its bases, base class slots first. This order is the field order of the encoding.
+    """
+    if cls not in _slot_names:
+        names = []
+        for klass in reversed(cls.__mro__):
+            slots = klass.__dict__.get("__slots__", ())
+            names.extend(name for name in ((slots,) if isinstance(slots, str) else slots) if not name.startswith("__"))
+        _slot_names[cls] = tuple(names)
+    return _slot_names[cls]
+
+
+def encode_event(event: Any) -> bytes:
+    cls = type(event)
+    if cls not in event_tags:
+        raise TypeError(f"{cls.__name__} is not a registered event type.")
+
+    buffer = bytearray((FORMAT_VERSION,))
+    _write_varint(buffer, event_tags[cls])
+    for name in slot_names(cls):
+        _write_value(buffer, getattr(event, name))
+    return bytes(buffer)
+
+
+def decode_event(data: bytes) -> Any:
+    event, offset = _read_event(memoryview(data), 0)
+    if offset != len(data):
+        raise EventDecodeError(f"{len(data) - offset} trailing bytes after the event.")
+    return event
+
+
+def encode_events(events: Iterable[Any]) -> bytes:
+    """
+    Encodes events into one length prefixed stream, e.g. for a journal file.
+    """
+    buffer = bytearray()
+    for event in events:
+        encoded = encode_event(event)
+        _write_varint(buffer, len(encoded))
+        buffer += encoded
+    return bytes(buffer)
+
+
+def decode_events(data: bytes) -> list[Any]:
+    view = memoryview(data)
+    events = []
+    offset = 0
+    while offset < len(view):
+        length, offset = _read_varint(view, offset)
+        if offset + length > len(view):
+            raise EventDecodeError("Event stream is truncated.")
+        event, end = _read_event(view[: offset + length], offset)
+        if end != offset + length:
+            raise EventDecodeError(f"{offset + length - end} trailing bytes after the event.")
+        events.append(event)
+        offset = end
+    return events
+
+
+def _read_event(view: memoryview, offset: int) -> tuple[Any, int]:
+    if offset >= len(view):
+        raise EventDecodeError("Event is empty.")
+    if view[offset] != FORMAT_VERSION:
+        raise EventDecodeError(f"Unsupported event format version {view[offset]}.")
+    tag, offset = _read_varint(view, offset + 1)
+    cls = event_types.get(tag)
+    if cls is None:
+        raise EventDecodeError(f"Unknown event tag {tag}.")
+
+    # Bypasses __init__, the encoded slots are the complete state of the event
+    event = cls.__new__(cls)
+    for name in slot_names(cls):
+        value, offset = _read_value(view, offset)
+        setattr(event, name, value)
+    return event, offset
+
+
+def _write_varint(buffer: bytearray, value: int):
+    while value > 0x7F:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def _read_varint(view: memoryview, offset: int) -> tuple[int, int]:
+    value = 0
+    shift = 0
+    while True:
+        if offset >= len(view):
+            raise EventDecodeError("Event is truncated.")
+        byte = view[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, offset
+        shift += 7
+
+
+def _write_value(buffer: bytearray, value: Any):
+    # bool and Enum checks come first, bool is an int and enums may be str or int subclasses
+    if value is None:
+        buffer.append(NONE)
+    elif value is True:
+        buffer.append(TRUE)
+    elif value is False:
+        buffer.append(FALSE)
+    elif isinstance(value, Enum):
+        if type(value) not in enum_tags:
+            raise TypeError(f"{type(value).__name__} is not a registered enum type.")
+        buffer.append(ENUM)
+        _write_varint(buffer, enum_tags[type(value)])
+        _write_value(buffer, value.value)
+    elif isinstance(value, int):
+        buffer.append(INT)
+        _write_varint(buffer, value << 1 if value >= 0 else (~value << 1) | 1)
+    elif isinstance(value, float):
+        buffer.append(FLOAT)
+        buffer += struct.pack("<d", value)
+    elif isinstance(value, str):
+        encoded = value.encode("utf-8")
+        buffer.append(STR)
+        _write_varint(buffer, len(encoded))
+        buffer += encoded
+    elif isinstance(value, list | tuple):
+        buffer.append(LIST)
+        _write_varint(buffer, len(value))
+        for item in value:
+            _write_value(buffer, item)
+    else:
+        raise TypeError(f"Cannot encode value of type {type(value).__name__}.")
+
+
+def _read_value(view: memoryview, offset: int) -> tuple[Any, int]:
+    if offset >= len(view):
+        raise EventDecodeError("Event is truncated.")
+    tag = view[offset]
+    offset += 1
+    if tag == NONE:
+        return None, offset
+    if tag == FALSE:
+        return False, offset
+    if tag == TRUE:
+        return True, offset
+    if tag == INT:
+        value, offset = _read_varint(view, offset)
+        return (value >> 1) if not value & 1 else ~(value >> 1), offset
+    if tag == FLOAT:
+        if offset + 8 > len(view):
+            raise EventDecodeError("Event is truncated.")
+        return struct.unpack_from("<d", view, offset)[0], offset + 8
+    if tag == STR:
+        length, offset = _read_varint(view, offset)
+        if offset + length > len(view):
+            raise EventDecodeError("Event is truncated.")
+        try:
+            return str(view[offset : offset + length], "utf-8"), offset + length
+        except UnicodeDecodeError as error:
+            raise EventDecodeError(f"Invalid string: {error}.") from error
+    if tag == LIST:
+        count, offset = _read_varint(view, offset)
+        items = []
+        for _ in range(count):
+            item, offset = _read_value(view, offset)
+            items.append(item)
+        return items, offset
+    if tag == ENUM:
+        enum_tag, offset = _read_varint(view, offset)
+        if enum_tag not in enum_types:
+            raise EventDecodeError(f"Unknown enum tag {enum_tag}.")
+        value, offset = _read_value(view, offset)
+        try:
+            return enum_types[enum_tag](value), offset
+        except ValueError as error:
+            raise EventDecodeError(f"Invalid enum value: {error}.") from error
+    raise EventDecodeError(f"Unknown value tag {tag:#x}.")
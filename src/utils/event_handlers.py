@@ -0,0 +1,76 @@
+from collections.abc import Awaitable, Callable
+
+from src.utils.data_types import ProjectItemEvent, WebhookRequest
+
+# Field name matching every field of a type that has no handler of its own
+WILDCARD = "*"
+
+HandlerKey = tuple[str, str | None, str | None]
+EventHandler = Callable[[WebhookRequest], Awaitable[ProjectItemEvent]]
+
+
+def handler_key(body: WebhookRequest) -> HandlerKey:
+    """
+    Key of the webhook in the handler table: `(action, field_type, field_name)`. Field type and name are None for
+    actions other than "edited", body edits use the "body" field type.
+    """
+    if body.action != "edited":
+        return body.action, None, None
+    if body.changes.body is not None:
+        return body.action, "body", None
+    field_value = body.changes.field_value
+    return body.action, field_value.field_type, field_value.field_name
+
+
+class EventHandlerRegistry:
+    """
+    Table of the handlers turning accepted webhooks into events, keyed by `(action, field_type, field_name)`.
+
+    A handler registered with the wildcard as field name handles every field of its type that has no handler of its
+    own. Resolving a key takes at most two dict lookups.
+    """
+
+    def __init__(self):
+        self._handlers: dict[HandlerKey, EventHandler] = {}
+
+    def register(
+        self, action: str, field_type: str | None = None, field_name: str | None = None, *, replace: bool = False
+    ) -> Callable[[EventHandler], EventHandler]:
+        key = (action, field_type, field_name)
+
+        def decorator(handler: EventHandler) -> EventHandler:
+            if key in self._handlers and not replace:
+                raise ValueError(f"Handler for {key} is already registered.")
+            self._handlers[key] = handler
+            return handler
+
+        return decorator
+
+    def unregister(self, action: str, field_type: str | None = None, field_name: str | None = None):
+        self._handlers.pop((action, field_type, field_name), None)
+
+    def resolve(self, key: HandlerKey) -> EventHandler | None:
+        handler = self._handlers.get(key)
+        if handler is None and key[2] is not None:
+            handler = self._handlers.get((key[0], key[1], WILDCARD))
+        return handler
+
+    def describe(self) -> list[dict]:
+        return [
+            {
+                "action": action,
+                "field_type": field_type,
+                "field_name": field_name,
+                "handler": f"{handler.__module__}.{handler.__qualname__}",
+            }
+            for (action, field_type, field_name), handler in self._handlers.items()
+        ]
+
+    def __contains__(self, key: HandlerKey) -> bool:
+        return self.resolve(key) is not None
+
+    def __len__(self) -> int:
+        return len(self._handlers)
+
+
+event_handlers = EventHandlerRegistry()
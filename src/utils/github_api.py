@@ -1,123 +1,102 @@
 import os
+from dataclasses import dataclass, field
 
-import aiohttp
 from fastapi import HTTPException
 
-
-async def send_request(query: str, variables: dict) -> dict:
-    async with aiohttp.ClientSession() as session:
-        async with session.post(
-            "https://api.github.com/graphql",
-            json={"query": query, "variables": variables},
-            headers={"Authorization": f"Bearer {os.getenv('GITHUB_TOKEN')}"},
-        ) as response:
-            return await response.json()
-
-
-async def fetch_item_name(item_node_id: str) -> str:
-    query = """
-    query ($id: ID!) {
-      node(id: $id) {
-        ... on ProjectV2Item {
-          content {
-            ... on DraftIssue {
-              title
-            }
-            ... on Issue {
-              title
-            }
-            ... on PullRequest {
-              title
-            }
-          }
-        }
-      }
-    }
+from src.utils import json_backend
+from src.utils.circuit_breaker import github_breaker
+from src.utils.error import RateLimitExceededError
+from src.utils.graphql_queries import (
+    ITEM_SNAPSHOT,
+    PROJECT_ITEMS,
+    queries,
+)
+from src.utils.pipeline_health import github_client_stats
+from src.utils.rate_limit import Priority, github_rate_limit
+from src.utils.tracing import tracer
+
+
+async def send_request(query: str, variables: dict, priority: Priority = Priority.LIVE) -> dict:
+    import aiohttp
+
+    with tracer.span("github_request", operation=queries.name_of(query), priority=priority.name):
+        await github_rate_limit.acquire(priority)
+        async with github_breaker.guard():
+            with github_client_stats.track():
+                async with aiohttp.ClientSession() as session:
+                    async with session.post(
+                        "https://api.github.com/graphql",
+                        json={"query": query, "variables": variables},
+                        headers={"Authorization": f"Bearer {os.getenv('GITHUB_TOKEN')}"},
+                    ) as response:
+                        github_rate_limit.update_from_headers(response.headers)
+                        response_body = await response.json(loads=json_backend.loads)
+
+    if github_rate_limit.update_from_body(response_body):
+        raise RateLimitExceededError(github_rate_limit.seconds_until_reset())
+    return response_body
+
+
+@dataclass
+class ItemSnapshot:
+    title: str | None
+    assignees: list[str]
+    # Single select and iteration values by field name
+    field_values: dict[str, str] = field(default_factory=dict)
+
+
+async def fetch_item_snapshot(item_node_id: str, priority: Priority = Priority.LIVE) -> ItemSnapshot:
+    """
+    Fetches title, assignees and field values of an item in a single request.
     """
+    response_body = await send_request(ITEM_SNAPSHOT.document, {"id": item_node_id}, priority)
 
-    variables = {"id": item_node_id}
+    try:
+        item = response_body["data"]["node"]
+        content = item["content"] or {}
+    except TypeError, KeyError:
+        raise HTTPException(status_code=500, detail="Could not fetch item.") from None
 
-    response_body = await send_request(query, variables)
+    return parse_item_snapshot(item, content)
 
-    try:
-        item_name: str | None = response_body["data"]["node"]["content"]["title"]
-    except TypeError, KeyError, AttributeError:
-        raise HTTPException(status_code=500, detail="Could not fetch item name.") from None
-
-    return item_name
-
-
-async def fetch_assignees(item_node_id: str) -> list[str]:
-    query = """
-    query ($id: ID!) {
-      node(id: $id) {
-        ... on ProjectV2Item {
-          content {
-            ... on DraftIssue {
-              assignees(first: 10) {
-                nodes {
-                  id
-                }
-              }
-            }
-            ... on Issue {
-              assignees(first: 10) {
-                nodes {
-                  id
-                }
-              }
-            }
-            ... on PullRequest {
-              assignees(first: 10) {
-                nodes {
-                  id
-                }
-              }
-            }
-          }
-        }
-      }
-    }
-    """
 
-    variables = {"id": item_node_id}
+def parse_item_snapshot(item: dict, content: dict) -> ItemSnapshot:
+    assignees = [assignee.get("id") for assignee in (content.get("assignees") or {}).get("nodes", [])]
+    field_values = {}
+    for value in (item.get("fieldValues") or {}).get("nodes", []):
+        field_name = (value.get("field") or {}).get("name")
+        field_value = value.get("name", value.get("title"))
+        if field_name is not None and field_value is not None:
+            field_values[field_name] = field_value
 
-    response_body = await send_request(query, variables)
+    return ItemSnapshot(content.get("title"), assignees, field_values)
 
-    try:
-        assignees_data = response_body["data"]["node"]["content"]["assignees"]["nodes"]
-    except TypeError, KeyError, AttributeError:
-        return []
-    assignees = [assignee.get("id", None) for assignee in assignees_data]
-
-    return assignees
-
-
-async def fetch_single_select_value(item_node_id: str, field_name: str) -> str | None:
-    if field_name is None:
-        return None
-
-    query = """
-    query ($id: ID!, $field_type: String!) {
-      node(id: $id) {
-        ... on ProjectV2Item {
-          fieldValueByName(name: $field_type) {
-            ... on ProjectV2ItemFieldSingleSelectValue {
-              name
-            }
-          }
-        }
-      }
-    }
-    """
 
-    variables = {"id": item_node_id, "field_type": field_name}
+@dataclass
+class ProjectItemsPage:
+    # (item node id, content type, snapshot)
+    items: list[tuple[str, str | None, ItemSnapshot]]
+    # None on the last page
+    next_cursor: str | None
 
-    response_body = await send_request(query, variables)
 
-    try:
-        name: str | None = response_body["data"]["node"]["fieldValueByName"]["name"]
-    except TypeError, KeyError, AttributeError:
-        return None
+async def fetch_project_items(
+    project_node_id: str, cursor: str | None = None, priority: Priority = Priority.BACKGROUND
+) -> ProjectItemsPage:
+    """
+    Fetches a page of up to 100 items of a project, starting after `cursor`.
+    """
+    response_body = await send_request(PROJECT_ITEMS.document, {"project": project_node_id, "cursor": cursor}, priority)
 
-    return name
+    try:
+        connection = response_body["data"]["node"]["items"]
+    except TypeError, KeyError:
+        raise HTTPException(status_code=500, detail="Could not fetch project items.") from None
+
+    items = []
+    for item in connection.get("nodes") or []:
+        if item is None or item.get("id") is None:
+            continue
+        items.append((item["id"], item.get("type"), parse_item_snapshot(item, item.get("content") or {})))
+    page_info = connection.get("pageInfo") or {}
+    return ProjectItemsPage(items, page_info.get("endCursor") if page_info.get("hasNextPage") else None)
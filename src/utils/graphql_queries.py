@@ -0,0 +1,263 @@
+import re
+from dataclasses import dataclass
+
+from src.utils.error import InvalidQueryError
+
+# One alternative per GraphQL token kind, whitespace, commas and comments are insignificant
+TOKEN_PATTERN = re.compile(
+    r"""
+    (?P<ignored>[\s,]+|\#[^\n]*)
+    |(?P<string>"(?:[^"\\\n]|\\.)*")
+    |(?P<spread>\.\.\.)
+    |(?P<punctuator>[!$&():=@\[\]{}|])
+    |(?P<word>-?[_0-9A-Za-z.+-]+)
+    """,
+    re.VERBOSE,
+)
+VARIABLE_DEFINITION_PATTERN = re.compile(r"\$([_A-Za-z][_0-9A-Za-z]*):")
+VARIABLE_PATTERN = re.compile(r"\$([_A-Za-z][_0-9A-Za-z]*)")
+
+
+@dataclass(frozen=True)
+class Query:
+    name: str
+    # Minified document, the one sent to the API
+    document: str
+    variables: frozenset[str]
+
+
+def tokenize(document: str) -> list[tuple[str, str]]:
+    tokens = []
+    position = 0
+    while position < len(document):
+        match = TOKEN_PATTERN.match(document, position)
+        if match is None:
+            raise InvalidQueryError(f"Unexpected character {document[position]!r} at position {position}.")
+        if match.lastgroup != "ignored":
+            tokens.append((match.lastgroup, match.group()))
+        position = match.end()
+    return tokens
+
+
+def minify(document: str) -> str:
+    """
+    Drops comments and every whitespace that does not separate two words.
+    """
+    minified = []
+    previous_kind = None
+    for kind, value in tokenize(document):
+        if kind == "word" and previous_kind == "word":
+            minified.append(" ")
+        minified.append(value)
+        previous_kind = kind
+    return "".join(minified)
+
+
+def validate(name: str, document: str) -> frozenset[str]:
+    """
+    Checks the structure of a minified query and returns the names of its variables.
+
+    This is not a full GraphQL validation, the schema is only known to the API. It catches unbalanced brackets and
+    variables that are used without being declared or declared without being used.
+    """
+    if not document.startswith(("query", "mutation", "{")):
+        raise InvalidQueryError(f"Query {name} does not start with an operation.")
+
+    closing = {"{": "}", "(": ")", "[": "]"}
+    stack = []
+    for kind, value in tokenize(document):
+        if kind != "punctuator":
+            continue
+        if value in closing:
+            stack.append(closing[value])
+        elif value in closing.values():
+            if not stack or stack.pop() != value:
+                raise InvalidQueryError(f"Query {name} has an unbalanced {value!r}.")
+    if stack:
+        raise InvalidQueryError(f"Query {name} is missing {stack[-1]!r}.")
+
+    selection_start = document.index("{")
+    declared = set(VARIABLE_DEFINITION_PATTERN.findall(document[:selection_start]))
+    used = set(VARIABLE_PATTERN.findall(document[selection_start:]))
+    if used - declared:
+        raise InvalidQueryError(f"Query {name} uses undeclared variables: {', '.join(sorted(used - declared))}.")
+    if declared - used:
+        raise InvalidQueryError(f"Query {name} declares unused variables: {', '.join(sorted(declared - used))}.")
+    return frozenset(declared)
+
+
+class QueryRegistry:
+    """
+    Queries sent to the GitHub GraphQL API, minified and validated once when they are registered.
+    """
+
+    def __init__(self):
+        self._queries: dict[str, Query] = {}
+        self._names: dict[str, str] = {}
+
+    def register(self, name: str, document: str) -> Query:
+        if name in self._queries:
+            raise ValueError(f"Query {name} is already registered.")
+        minified = minify(document)
+        query = Query(name, minified, validate(name, minified))
+        self._queries[name] = query
+        self._names[minified] = name
+        return query
+
+    def get(self, name: str) -> Query:
+        return self._queries[name]
+
+    def name_of(self, document: str) -> str | None:
+        """
+        Name of a registered query by its minified document, e.g. to label a request.
+        """
+        return self._names.get(document)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._queries
+
+    def __iter__(self):
+        return iter(self._queries.values())
+
+
+queries = QueryRegistry()
+
+# Title, assignees and every single select and iteration value of an item in one round trip
+ITEM_SNAPSHOT = queries.register(
+    "item_snapshot",
+    """
+    query ($id: ID!) {
+      node(id: $id) {
+        ... on ProjectV2Item {
+          content {
+            ... on DraftIssue {
+              title
+              assignees(first: 10) {
+                nodes {
+                  id
+                }
+              }
+            }
+            ... on Issue {
+              title
+              assignees(first: 10) {
+                nodes {
+                  id
+                }
+              }
+            }
+            ... on PullRequest {
+              title
+              assignees(first: 10) {
+                nodes {
+                  id
+                }
+              }
+            }
+          }
+          fieldValues(first: 50) {
+            nodes {
+              ... on ProjectV2ItemFieldSingleSelectValue {
+                name
+                field {
+                  ... on ProjectV2FieldCommon {
+                    name
+                  }
+                }
+              }
+              ... on ProjectV2ItemFieldIterationValue {
+                title
+                field {
+                  ... on ProjectV2FieldCommon {
+                    name
+                  }
+                }
+              }
+            }
+          }
+        }
+      }
+      rateLimit {
+        cost
+        remaining
+        resetAt
+        limit
+      }
+    }
+    """,
+)
+
+# One page of project items with the same data as ITEM_SNAPSHOT, used to fill the project mirror
+PROJECT_ITEMS = queries.register(
+    "project_items",
+    """
+    query ($project: ID!, $cursor: String) {
+      node(id: $project) {
+        ... on ProjectV2 {
+          items(first: 100, after: $cursor) {
+            pageInfo {
+              hasNextPage
+              endCursor
+            }
+            nodes {
+              id
+              type
+              content {
+                ... on DraftIssue {
+                  title
+                  assignees(first: 10) {
+                    nodes {
+                      id
+                    }
+                  }
+                }
+                ... on Issue {
+                  title
+                  assignees(first: 10) {
+                    nodes {
+                      id
+                    }
+                  }
+                }
+                ... on PullRequest {
+                  title
+                  assignees(first: 10) {
+                    nodes {
+                      id
+                    }
+                  }
+                }
+              }
+              fieldValues(first: 50) {
+                nodes {
+                  ... on ProjectV2ItemFieldSingleSelectValue {
+                    name
+                    field {
+                      ... on ProjectV2FieldCommon {
+                        name
+                      }
+                    }
+                  }
+                  ... on ProjectV2ItemFieldIterationValue {
+                    title
+                    field {
+                      ... on ProjectV2FieldCommon {
+                        name
+                      }
+                    }
+                  }
+                }
+              }
+            }
+          }
+        }
+      }
+      rateLimit {
+        cost
+        remaining
+        resetAt
+        limit
+      }
+    }
+    """,
+)
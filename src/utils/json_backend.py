@@ -0,0 +1,61 @@
+import importlib.util
+import json
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from starlette.responses import JSONResponse
+
+# Fastest first, the stdlib json module is always available as the fallback
+PREFERRED_BACKENDS = ("orjson", "msgspec", "json")
+
+
+@dataclass(frozen=True)
+class JsonBackend:
+    name: str
+    loads: Callable[[bytes | str], Any]
+    dumps: Callable[[Any], bytes]
+
+
+def _create_orjson_backend() -> JsonBackend:
+    import orjson
+
+    return JsonBackend("orjson", orjson.loads, orjson.dumps)
+
+
+def _create_msgspec_backend() -> JsonBackend:
+    import msgspec
+
+    return JsonBackend("msgspec", msgspec.json.Decoder().decode, msgspec.json.Encoder().encode)
+
+
+def _create_stdlib_backend() -> JsonBackend:
+    def dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    return JsonBackend("json", json.loads, dumps)
+
+
+BACKEND_FACTORIES: dict[str, Callable[[], JsonBackend]] = {
+    "orjson": _create_orjson_backend,
+    "msgspec": _create_msgspec_backend,
+    "json": _create_stdlib_backend,
+}
+
+
+def is_available(name: str) -> bool:
+    return name == "json" or importlib.util.find_spec(name) is not None
+
+
+def available_backends() -> dict[str, JsonBackend]:
+    return {name: BACKEND_FACTORIES[name]() for name in PREFERRED_BACKENDS if is_available(name)}
+
+
+backend = BACKEND_FACTORIES[next(name for name in PREFERRED_BACKENDS if is_available(name))]()
+loads = backend.loads
+dumps = backend.dumps
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,119 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import asdict, dataclass
+
+from src.utils.misc import handle_task_exception, server_logger
+
+HEARTBEAT_INTERVAL = 0.25
+MAX_STALL_REPORTS = 50
+
+
+@dataclass
+class StallReport:
+    started_at: float
+    # Grows while the loop is still blocked, final once it recovers
+    duration: float
+    stack: list[str]
+
+
+class LoopWatchdog:
+    """
+    Measures event loop lag with a heartbeat task and, from a separate thread, captures the stack of any callback
+    that keeps the loop blocked for longer than the threshold.
+    """
+
+    def __init__(self, threshold: float, interval: float = HEARTBEAT_INTERVAL, max_reports: int = MAX_STALL_REPORTS):
+        self.threshold = threshold
+        self.interval = interval
+        self.reports: deque[StallReport] = deque(maxlen=max_reports)
+        self.stall_count = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.average_lag = 0.0
+        self.samples = 0
+        self._last_beat = time.monotonic()
+        self._loop_thread_id: int | None = None
+        self._heartbeat_task: asyncio.Task | None = None
+        self._watcher: threading.Thread | None = None
+        self._stopped = threading.Event()
+
+    @classmethod
+    def from_env(cls) -> LoopWatchdog | None:
+        threshold_ms = os.getenv("LOOP_WATCHDOG_THRESHOLD_MS")
+        if not threshold_ms:
+            return None
+        return cls(int(threshold_ms) / 1000)
+
+    def start(self):
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stopped.clear()
+        self._heartbeat_task = asyncio.create_task(self._heartbeat())
+        self._heartbeat_task.add_done_callback(lambda task: handle_task_exception(task, "Loop watchdog crashed:"))
+        self._watcher = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watcher.start()
+
+    async def stop(self):
+        self._stopped.set()
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+            try:
+                await self._heartbeat_task
+            except asyncio.CancelledError:
+                pass
+        if self._watcher is not None:
+            await asyncio.to_thread(self._watcher.join)
+
+    def record_lag(self, lag: float):
+        self.last_lag = lag
+        self.max_lag = max(self.max_lag, lag)
+        self.samples += 1
+        # Exponential moving average, recent samples matter more than the whole uptime
+        self.average_lag += (lag - self.average_lag) * 0.1 if self.samples > 1 else lag
+
+    def stats(self) -> dict:
+        return {
+            "threshold_ms": self.threshold * 1000,
+            "lag_ms": {
+                "last": self.last_lag * 1000,
+                "max": self.max_lag * 1000,
+                "average": self.average_lag * 1000,
+            },
+            "samples": self.samples,
+            "stall_count": self.stall_count,
+            "recent_stalls": [asdict(report) for report in self.reports],
+        }
+
+    async def _heartbeat(self):
+        while True:
+            before = time.monotonic()
+            await asyncio.sleep(self.interval)
+            self._last_beat = time.monotonic()
+            self.record_lag(max(0.0, self._last_beat - before - self.interval))
+
+    def _watch(self):
+        current_report: StallReport | None = None
+        while not self._stopped.wait(self.threshold / 2):
+            blocked_for = time.monotonic() - self._last_beat - self.interval
+            if blocked_for < self.threshold:
+                if current_report is not None:
+                    server_logger.warning(
+                        "Event loop was blocked for %.0f ms:\n%s",
+                        current_report.duration * 1000,
+                        "".join(current_report.stack),
+                    )
+                    current_report = None
+                continue
+
+            if current_report is None:
+                frame = sys._current_frames().get(self._loop_thread_id)
+                stack = traceback.format_stack(frame) if frame is not None else []
+                current_report = StallReport(started_at=time.time() - blocked_for, duration=blocked_for, stack=stack)
+                self.reports.append(current_report)
+                self.stall_count += 1
+            current_report.duration = blocked_for
@@ -1,34 +1,49 @@
 import asyncio
 import logging
 import os
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
 
-import yaml
-from aiorwlock import RWLock
-from hikari import GuildForumChannel
+if TYPE_CHECKING:
+    from hikari import ForumTag, GuildForumChannel
 
 
-class SharedForumChannel:
+@dataclass(frozen=True, slots=True)
+class ForumChannelSnapshot:
+    version: int
     forum_channel: GuildForumChannel
-    lock: RWLock
+    available_tags: tuple[ForumTag, ...]
 
-    def __init__(self, forum_channel: GuildForumChannel):
-        self.forum_channel = forum_channel
-        self.lock = RWLock()
 
+class SharedForumChannel:
+    """
+    Latest known state of a forum channel, shared by the updates of a project as an immutable snapshot. Readers take
+    the current snapshot without waiting, writers publish a new version with `compare_and_set`, which refuses to
+    replace a snapshot other than the one the writer started from.
+    """
 
-def retrieve_discord_id(node_id: str) -> str | None:
-    with open(os.getenv("GITHUB_ID_TO_DISCORD_ID_MAPPING_PATH", "github_id_to_discord_id_mapping.yaml")) as file:
-        mapping: dict[str, str] = yaml.load("".join(file.readlines()), Loader=yaml.Loader)
+    def __init__(self, forum_channel: GuildForumChannel):
+        self._snapshot = ForumChannelSnapshot(0, forum_channel, tuple(forum_channel.available_tags))
 
-        if mapping is None:
-            return None
+    @property
+    def snapshot(self) -> ForumChannelSnapshot:
+        return self._snapshot
 
-        return mapping.get(node_id, None)
+    @property
+    def forum_channel(self) -> GuildForumChannel:
+        return self._snapshot.forum_channel
+
+    def compare_and_set(self, expected: ForumChannelSnapshot, forum_channel: GuildForumChannel) -> bool:
+        # Nothing is awaited between the check and the swap, so no other update can publish in between
+        if self._snapshot is not expected:
+            return False
+        self._snapshot = ForumChannelSnapshot(expected.version + 1, forum_channel, tuple(forum_channel.available_tags))
+        return True
 
 
-def create_item_link(item_id: int) -> str:
-    organization_name = os.getenv("GITHUB_ORGANIZATION_NAME", "my-org")
-    project_number = os.getenv("GITHUB_PROJECT_NUMBER", "1")
+def create_item_link(item_id: int, organization_name: str | None = None, project_number: str | None = None) -> str:
+    organization_name = organization_name or os.getenv("GITHUB_ORGANIZATION_NAME", "my-org")
+    project_number = project_number or os.getenv("GITHUB_PROJECT_NUMBER", "1")
     return f"https://github.com/orgs/{organization_name}/projects/{project_number}?pane=issue&itemId={item_id}"
 
 
@@ -43,8 +58,14 @@ def handle_task_exception(task: asyncio.Task, error_message: str):
 
 
 class BotPrefixFilter(logging.Filter):
+    """
+    Prefixes bot messages with `[BOT]`, whatever handler writes them, and marks them as coming from the bot for the
+    JSON output.
+    """
+
     def filter(self, record: logging.LogRecord) -> bool:
         record.msg = f"[BOT] {record.msg}"
+        record.component = "bot"
         return True
 
 
@@ -0,0 +1,74 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+
+
+class UpdateQueue(asyncio.Queue):
+    """
+    Queue of events waiting for the bot, remembering when each of them was put so the health endpoints can report how
+    long the oldest one has been waiting.
+    """
+
+    def _init(self, maxsize: int):
+        super()._init(maxsize)
+        self._enqueued_at: deque[float] = deque()
+
+    def _put(self, item):
+        super()._put(item)
+        self._enqueued_at.append(time.monotonic())
+
+    def _get(self):
+        self._enqueued_at.popleft()
+        return super()._get()
+
+    def oldest_age(self) -> float | None:
+        if not self._enqueued_at:
+            return None
+        return time.monotonic() - self._enqueued_at[0]
+
+
+@dataclass
+class ClientStats:
+    """
+    Counters of the requests sent through a client, updated by `track`.
+    """
+
+    in_flight: int = 0
+    requests: int = 0
+    failures: int = 0
+    last_failure_at: float | None = None
+
+    @contextmanager
+    def track(self):
+        self.in_flight += 1
+        self.requests += 1
+        try:
+            yield
+        except Exception:
+            self.failures += 1
+            self.last_failure_at = time.time()
+            raise
+        finally:
+            self.in_flight -= 1
+
+    def snapshot(self) -> dict:
+        return asdict(self)
+
+
+github_client_stats = ClientStats()
+# Tracks Discord calls through `GuardedClient`, including hikari's own retries and rate limit waits
+discord_client_stats = ClientStats()
+
+
+def task_state(task: asyncio.Task | None) -> str:
+    if task is None:
+        return "not_started"
+    if not task.done():
+        return "running"
+    if task.cancelled():
+        return "cancelled"
+    if task.exception() is not None:
+        return "crashed"
+    return "finished"
@@ -0,0 +1,191 @@
+import time
+from typing import TYPE_CHECKING, Any
+
+from fastapi import HTTPException
+
+from src.utils.github_api import ItemSnapshot, fetch_item_snapshot, fetch_project_items
+from src.utils.misc import server_logger
+
+if TYPE_CHECKING:
+    # data_types imports the Discord client, which reads titles from the mirror
+    from src.utils.data_types import WebhookRequest
+
+# Seconds a mirrored value is trusted before the next read fetches it again, 0 disables the mirror
+DEFAULT_MIRROR_TTL = 900.0
+
+TITLE = "title"
+ASSIGNEES = "assignees"
+CONTENT_TYPE = "content_type"
+MISSING = object()
+
+
+def field_key(field_name: str) -> str:
+    return f"field:{field_name}"
+
+
+def snapshot_values(snapshot: ItemSnapshot) -> dict[str, Any]:
+    values: dict[str, Any] = {ASSIGNEES: snapshot.assignees}
+    # Every item has a title, a missing one means the content could not be read and must not be mirrored
+    if snapshot.title is not None:
+        values[TITLE] = snapshot.title
+    for field_name, field_value in snapshot.field_values.items():
+        values[field_key(field_name)] = field_value
+    return values
+
+
+class ProjectMirror:
+    """
+    Local copy of what GitHub knows about project items: title, content type, assignees and field values.
+
+    Values come from a paginated sync of every routed project, from webhook payloads and from lookups that missed the
+    mirror. Each value is trusted for `ttl` seconds after it was learned, a read of an older one fetches it again.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_MIRROR_TTL):
+        self.ttl = ttl
+        # Item node id -> key -> (value, monotonic time it was learned)
+        self.items: dict[str, dict[str, tuple[Any, float]]] = {}
+        self.hits = 0
+        self.misses = 0
+        # "pending" until `sync_all` runs, then "running" and "done", "failed" when a project could not be mirrored
+        self.sync_state = "pending"
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def get(self, node_id: str, key: str, default: Any = None) -> Any:
+        entry = self.items.get(node_id, {}).get(key)
+        if entry is None or time.monotonic() - entry[1] > self.ttl:
+            return default
+        return entry[0]
+
+    def set(self, node_id: str, key: str, value: Any):
+        if self.enabled:
+            self.items.setdefault(node_id, {})[key] = (value, time.monotonic())
+
+    def invalidate(self, node_id: str, key: str):
+        self.items.get(node_id, {}).pop(key, None)
+
+    def forget(self, node_id: str):
+        self.items.pop(node_id, None)
+
+    def clear(self):
+        self.items.clear()
+        self.hits = 0
+        self.misses = 0
+        self.sync_state = "pending"
+
+    async def get_or_fetch(self, node_id: str, key: str) -> Any:
+        """
+        A miss fetches a snapshot of the whole item, so a single request mirrors its title, assignees and field values.
+        """
+        value = self.get(node_id, key, MISSING)
+        if value is not MISSING:
+            self.hits += 1
+            return value
+        self.misses += 1
+        requested_at = time.monotonic()
+        snapshot = await fetch_item_snapshot(node_id)
+        self.apply_snapshot(node_id, snapshot, observed_at=requested_at)
+        value = self.get(node_id, key, MISSING)
+        if value is MISSING:
+            value = snapshot_values(snapshot).get(key)
+            if key == TITLE and value is None:
+                raise HTTPException(status_code=500, detail="Could not fetch item name.")
+            # Unset fields are not in the snapshot, remember them as None
+            self.set(node_id, key, value)
+        return value
+
+    def apply_snapshot(
+        self, node_id: str, snapshot: ItemSnapshot, content_type: str | None = None, observed_at: float | None = None
+    ):
+        """
+        Replaces what is known about an item with a snapshot fetched at `observed_at`. Values learned after that, from
+        webhooks that arrived while the snapshot was in flight, are newer and kept.
+        """
+        if not self.enabled:
+            return
+        observed_at = time.monotonic() if observed_at is None else observed_at
+        values = snapshot_values(snapshot)
+        if content_type is not None:
+            values[CONTENT_TYPE] = content_type
+
+        entries = {key: (value, observed_at) for key, value in values.items()}
+        for key, entry in self.items.get(node_id, {}).items():
+            if entry[1] > observed_at:
+                entries[key] = entry
+        self.items[node_id] = entries
+
+    def apply_webhook(self, body: WebhookRequest):
+        """
+        Updates the item with what the payload says about it, dropping values the payload reports as changed without
+        carrying the new value.
+        """
+        node_id = body.projects_v2_item.node_id
+        if body.action == "deleted":
+            self.forget(node_id)
+            return
+
+        content_type = (body.projects_v2_item.model_extra or {}).get("content_type")
+        if content_type is not None:
+            self.set(node_id, CONTENT_TYPE, content_type)
+
+        field_value = body.changes.field_value if body.changes is not None else None
+        if field_value is None:
+            return
+        to = field_value.to
+        match field_value.field_type:
+            case "title" if isinstance(to, str):
+                self.set(node_id, TITLE, to)
+            case "title":
+                self.invalidate(node_id, TITLE)
+            case "assignees":
+                self.invalidate(node_id, ASSIGNEES)
+            case "single_select" if getattr(to, "name", None) is not None:
+                self.set(node_id, field_key(field_value.field_name), to.name)
+            case "iteration" if getattr(to, "title", None) is not None:
+                self.set(node_id, field_key(field_value.field_name), to.title)
+            case "date" if isinstance(to, str):
+                self.set(node_id, field_key(field_value.field_name), to.split("T")[0])
+            case _:
+                self.invalidate(node_id, field_key(field_value.field_name))
+
+    async def sync(self, project_node_id: str) -> int:
+        """
+        Mirrors every item of a project, a page at a time with background priority. Returns the number of items.
+        """
+        count = 0
+        cursor = None
+        while True:
+            requested_at = time.monotonic()
+            page = await fetch_project_items(project_node_id, cursor)
+            for node_id, content_type, snapshot in page.items:
+                self.apply_snapshot(node_id, snapshot, content_type, requested_at)
+            count += len(page.items)
+            if page.next_cursor is None:
+                break
+            cursor = page.next_cursor
+        server_logger.info("Mirrored %s items of project %s.", count, project_node_id)
+        return count
+
+    async def sync_all(self, project_node_ids: list[str]):
+        if not self.enabled:
+            self.sync_state = "disabled"
+            return
+        self.sync_state = "running"
+        failed = False
+        for project_node_id in project_node_ids:
+            try:
+                await self.sync(project_node_id)
+            except Exception as exception:
+                # The mirror fills up from webhooks and lookups anyway
+                server_logger.error("Failed to sync project mirror of %s: %s", project_node_id, exception)
+                failed = True
+        self.sync_state = "failed" if failed else "done"
+
+    def snapshot(self) -> dict:
+        return {"items": len(self.items), "hits": self.hits, "misses": self.misses, "sync": self.sync_state}
+
+
+project_mirror = ProjectMirror()
@@ -0,0 +1,131 @@
+import asyncio
+import time
+from collections.abc import Mapping
+from datetime import datetime
+from enum import IntEnum
+
+from src.utils.error import RateLimitExceededError
+from src.utils.misc import server_logger
+
+# GraphQL API budget of a GitHub App installation or token, updated from the first response
+DEFAULT_POINT_LIMIT = 5000
+# Share of the hourly budget only live webhooks may spend
+DEFAULT_RESERVE_FRACTION = 0.2
+# Live requests wait for a reset at most this long, longer waits fail the webhook instead
+MAX_LIVE_WAIT = 5.0
+
+
+class Priority(IntEnum):
+    # Lookups made while handling a webhook, someone is waiting for their result
+    LIVE = 0
+    # Reconciliation and backfill, can be delayed as long as needed
+    BACKGROUND = 1
+
+
+class RateLimitBudget:
+    """
+    Tracks the GraphQL point budget reported by GitHub and paces requests according to their priority.
+
+    Live requests may spend the whole budget. Background requests never touch the reserve, and once the budget is
+    below half they are spread evenly over the time left until the reset.
+    """
+
+    def __init__(self, limit: int = DEFAULT_POINT_LIMIT, reserve_fraction: float = DEFAULT_RESERVE_FRACTION):
+        self.limit = limit
+        self.remaining = limit
+        # Unix timestamp, None until GitHub reports it
+        self.reset_at: float | None = None
+        # Points the last query that selected `rateLimit` cost
+        self.last_cost: int | None = None
+        self.reserve_fraction = reserve_fraction
+        self._next_background_at = 0.0
+        self._background_lock = asyncio.Lock()
+
+    @property
+    def reserve(self) -> int:
+        return int(self.limit * self.reserve_fraction)
+
+    def seconds_until_reset(self) -> float:
+        if self.reset_at is None:
+            return 0.0
+        return max(0.0, self.reset_at - time.time())
+
+    def update_from_headers(self, headers: Mapping[str, str]):
+        if headers.get("X-RateLimit-Remaining") is None:
+            return
+        self.limit = int(headers.get("X-RateLimit-Limit", self.limit))
+        self.remaining = int(headers["X-RateLimit-Remaining"])
+        if headers.get("X-RateLimit-Reset") is not None:
+            self.reset_at = float(headers["X-RateLimit-Reset"])
+
+    def update_from_body(self, body: dict) -> bool:
+        """
+        Reads the `rateLimit` object every registered query selects. Returns whether the request was rejected for
+        exceeding the rate limit, in which case the budget is marked as spent.
+        """
+        rate_limit = (body.get("data") or {}).get("rateLimit")
+        if rate_limit:
+            self.limit = rate_limit.get("limit", self.limit)
+            self.remaining = rate_limit.get("remaining", self.remaining)
+            self.last_cost = rate_limit.get("cost", self.last_cost)
+            if rate_limit.get("resetAt"):
+                self.reset_at = datetime.fromisoformat(rate_limit["resetAt"]).timestamp()
+        if any(error.get("type") == "RATE_LIMITED" for error in body.get("errors") or []):
+            self.remaining = 0
+            return True
+        return False
+
+    def delay_for(self, priority: Priority) -> float:
+        """
+        Seconds a request of the given priority should wait before it is sent.
+        """
+        until_reset = self.seconds_until_reset()
+        if self.reset_at is not None and until_reset == 0.0:
+            # The window has rolled over since the last response
+            self.remaining = self.limit
+        if priority == Priority.LIVE:
+            return until_reset if self.remaining <= 0 else 0.0
+
+        if self.remaining - self.reserve <= 0:
+            return until_reset
+        return max(0.0, self._next_background_at - time.monotonic())
+
+    def background_interval(self) -> float:
+        """
+        Gap to keep between background requests, spreading what is left above the reserve over the rest of the window.
+        """
+        spendable = self.remaining - self.reserve
+        if spendable <= 0 or self.remaining > self.limit / 2:
+            return 0.0
+        return self.seconds_until_reset() / spendable
+
+    async def acquire(self, priority: Priority = Priority.LIVE):
+        if priority == Priority.LIVE:
+            delay = self.delay_for(priority)
+            if delay > MAX_LIVE_WAIT:
+                raise RateLimitExceededError(delay)
+            if delay:
+                await asyncio.sleep(delay)
+            return
+
+        # Background requests take turns, so the pacing interval holds across concurrent callers
+        async with self._background_lock:
+            delay = self.delay_for(priority)
+            if delay:
+                server_logger.info(
+                    "Delaying background GitHub request by %.1f s, %s points left.", delay, self.remaining
+                )
+                await asyncio.sleep(delay)
+            self._next_background_at = time.monotonic() + self.background_interval()
+
+    def snapshot(self) -> dict:
+        return {
+            "limit": self.limit,
+            "remaining": self.remaining,
+            "reserve": self.reserve,
+            "reset_in": self.seconds_until_reset(),
+            "last_cost": self.last_cost,
+        }
+
+
+github_rate_limit = RateLimitBudget()
@@ -0,0 +1,101 @@
+import asyncio
+import os
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, get_type_hints
+
+import yaml
+
+from src.utils.error import InvalidRoutesError
+from src.utils.misc import SharedForumChannel
+from src.utils.storage import PostStore
+
+if TYPE_CHECKING:
+    from src.utils.digest import MessageDigest
+
+# Limits how many updates of a single project run at once, so a noisy project can't take up every Discord request
+# slot and starve the others
+DEFAULT_MAX_CONCURRENT_UPDATES = 4
+
+
+@dataclass(frozen=True)
+class ProjectRoute:
+    project_node_id: str
+    forum_channel_id: int
+    discord_guild_id: int
+    # Falls back to POST_ID_DB_PATH
+    post_id_db_path: str | None = None
+    # Fall back to GITHUB_ORGANIZATION_NAME and GITHUB_PROJECT_NUMBER
+    organization_name: str | None = None
+    project_number: str | None = None
+    max_concurrent_updates: int = DEFAULT_MAX_CONCURRENT_UPDATES
+
+
+# Field name -> type, YAML values are not converted so they are checked against it
+ROUTE_FIELD_TYPES = get_type_hints(ProjectRoute)
+
+
+def parse_route(entry: dict) -> ProjectRoute:
+    if not isinstance(entry, dict):
+        raise InvalidRoutesError(f"Route {entry!r} is not a mapping of route fields.")
+    for name, value in entry.items():
+        field_type = ROUTE_FIELD_TYPES.get(name)
+        if field_type is None:
+            raise InvalidRoutesError(f"Route field {name} is unknown.")
+        # bool is an int to isinstance
+        if isinstance(value, bool) or not isinstance(value, field_type):
+            type_name = field_type.__name__ if isinstance(field_type, type) else field_type
+            raise InvalidRoutesError(f"Route field {name} must be {type_name}, got {value!r}.")
+    try:
+        route = ProjectRoute(**entry)
+    except TypeError as error:
+        raise InvalidRoutesError(f"Route {entry!r} is incomplete: {error}") from None
+    if route.max_concurrent_updates < 1:
+        raise InvalidRoutesError(f"Project {route.project_node_id} must allow at least one concurrent update.")
+    return route
+
+
+@dataclass
+class Project:
+    """
+    Runtime state of a single routed project: its forum channel with the tag registry and its post store.
+    """
+
+    route: ProjectRoute
+    shared_forum_channel: SharedForumChannel
+    post_store: PostStore
+    # Set in digest mode, messages are then collected per thread and sent together
+    digest: MessageDigest | None = None
+    update_slots: asyncio.Semaphore = field(init=False)
+
+    def __post_init__(self):
+        self.update_slots = asyncio.Semaphore(self.route.max_concurrent_updates)
+
+
+def load_routes() -> dict[str, ProjectRoute]:
+    """
+    Reads the routing table from the YAML file at PROJECT_ROUTES_PATH (a list of `ProjectRoute` fields), or builds
+    a single route from GITHUB_PROJECT_NODE_ID, FORUM_CHANNEL_ID and DISCORD_GUILD_ID when it is not set.
+    """
+    routes_path = os.getenv("PROJECT_ROUTES_PATH")
+    if not routes_path:
+        route = ProjectRoute(
+            project_node_id=os.getenv("GITHUB_PROJECT_NODE_ID"),
+            forum_channel_id=int(os.getenv("FORUM_CHANNEL_ID")),
+            discord_guild_id=int(os.getenv("DISCORD_GUILD_ID")),
+        )
+        return {route.project_node_id: route}
+
+    with open(routes_path) as file:
+        entries: list[dict] = yaml.safe_load(file) or []
+    if not isinstance(entries, list):
+        raise InvalidRoutesError(f"{routes_path} must contain a list of routes.")
+    if not entries:
+        raise InvalidRoutesError(f"{routes_path} does not route any project.")
+
+    routes = {}
+    for entry in entries:
+        route = parse_route(entry)
+        if route.project_node_id in routes:
+            raise InvalidRoutesError(f"Project {route.project_node_id} is routed more than once.")
+        routes[route.project_node_id] = route
+    return routes
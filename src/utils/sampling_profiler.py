@@ -0,0 +1,83 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from types import FrameType
+
+from src.utils.error import ProfilerBusyError
+
+DEFAULT_SAMPLE_INTERVAL = 0.005
+MAX_PROFILE_SECONDS = 60.0
+
+
+def short_path(filename: str) -> str:
+    for prefix in (f"site-packages{os.sep}", f"{os.getcwd()}{os.sep}"):
+        index = filename.rfind(prefix)
+        if index != -1:
+            return filename[index + len(prefix) :]
+    return os.path.basename(filename)
+
+
+def collapse_stack(frame: FrameType | None) -> list[str]:
+    """
+    Frame labels of a stack from the outermost call to `frame`.
+    """
+    labels = []
+    while frame is not None:
+        labels.append(f"{frame.f_code.co_qualname} ({short_path(frame.f_code.co_filename)})")
+        frame = frame.f_back
+    labels.reverse()
+    return labels
+
+
+def format_collapsed(stacks: Counter) -> str:
+    """
+    One `frame;frame;frame count` line per stack, the input format of flamegraph.pl, speedscope and similar tools.
+    """
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+class SamplingProfiler:
+    """
+    Periodically records the stacks of running threads from a separate thread. Nothing runs between profiles, and only
+    one profile runs at a time.
+
+    The event loop thread runs both the FastAPI handlers and the bot, so a profile of it shows where either spends the
+    time. Coroutines suspended at an `await` are not on any stack, only the code actually running is sampled.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    @property
+    def busy(self) -> bool:
+        return self._lock.locked()
+
+    def profile(
+        self, duration: float, interval: float = DEFAULT_SAMPLE_INTERVAL, thread_ids: set[int] | None = None
+    ) -> Counter:
+        """
+        Samples the given threads, or every thread, for `duration` seconds. Returns how many times each stack was seen,
+        keyed by its semicolon joined frames with the thread name as the root.
+        """
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusyError("A profile is already running.")
+        try:
+            own_thread_id = threading.get_ident()
+            stacks: Counter = Counter()
+            deadline = time.monotonic() + duration
+            while time.monotonic() < deadline:
+                thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == own_thread_id or (thread_ids is not None and thread_id not in thread_ids):
+                        continue
+                    thread_name = thread_names.get(thread_id, str(thread_id))
+                    stacks[";".join([thread_name, *collapse_stack(frame)])] += 1
+                time.sleep(interval)
+            return stacks
+        finally:
+            self._lock.release()
+
+
+profiler = SamplingProfiler()
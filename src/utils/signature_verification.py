@@ -6,27 +6,120 @@ from fastapi import HTTPException
 
 from src.utils.misc import server_logger
 
+SIGNATURE_PREFIX = "sha256="
 
-def verify_signature(signature: str | None, body_bytes: bytes) -> None:
-    secret = os.getenv("GITHUB_WEBHOOK_SECRET", "")
-    if not secret:
-        server_logger.warning("GITHUB_WEBHOOK_SECRET is not set; skipping signature verification.")
-        return
-    if signature:
-        correct_signature = verify_secret(secret, body_bytes, signature)
-        if not correct_signature:
+
+class SignatureVerifier:
+    """
+    Verifies webhook signatures against one or more secrets (several are active while a secret is being rotated).
+
+    The keyed HMAC state of every secret is computed once and copied for each request. The secret that matched last
+    is tried first, so outside of a rotation window a request costs a single HMAC.
+    """
+
+    def __init__(self, secrets: list[str]):
+        self._keyed_hmacs = [hmac.new(secret.encode("utf-8"), digestmod=hashlib.sha256) for secret in secrets if secret]
+
+    @classmethod
+    def from_env(cls) -> SignatureVerifier:
+        # Comma separated, e.g. "new-secret,old-secret" during rotation
+        secrets = os.getenv("GITHUB_WEBHOOK_SECRET", "").split(",")
+        verifier = cls([secret.strip() for secret in secrets])
+        if not verifier.enabled:
+            server_logger.warning("GITHUB_WEBHOOK_SECRET is not set; skipping signature verification.")
+        return verifier
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._keyed_hmacs)
+
+    def check_present(self, signature_header: str | None) -> None:
+        """
+        Rejects unsigned requests before their body is read.
+        """
+        if self.enabled and not signature_header:
+            raise HTTPException(status_code=401, detail="Missing signature.")
+
+    def verify(self, signature_header: str | None, body_bytes: bytes) -> None:
+        if not self.enabled:
+            return
+        self.check_present(signature_header)
+
+        expected_digest = decode_signature(signature_header)
+        if expected_digest is None or not self.matches(expected_digest, body_bytes):
             raise HTTPException(status_code=401, detail="Invalid signature.")
-    else:
-        raise HTTPException(status_code=401, detail="Missing signature.")
+
+    def matches(self, expected_digest: bytes, body_bytes: bytes, skip: hmac.HMAC | None = None) -> bool:
+        for keyed_hmac in self._keyed_hmacs:
+            if keyed_hmac is skip:
+                continue
+            hash_object = keyed_hmac.copy()
+            hash_object.update(body_bytes)
+            if hmac.compare_digest(hash_object.digest(), expected_digest):
+                self.promote(keyed_hmac)
+                return True
+        return False
+
+    def begin(self) -> StreamingSignature:
+        return StreamingSignature(self, self._keyed_hmacs[0] if self._keyed_hmacs else None)
+
+    def promote(self, keyed_hmac: hmac.HMAC):
+        if self._keyed_hmacs[0] is not keyed_hmac:
+            self._keyed_hmacs.remove(keyed_hmac)
+            self._keyed_hmacs.insert(0, keyed_hmac)
+
+
+class StreamingSignature:
+    """
+    Signature of a body that is hashed chunk by chunk as it arrives, see `SignatureVerifier.begin`.
+
+    Only the secret that matched last hashes the chunks. The other secrets are tried on the buffered body once it does
+    not match, so a rotation costs extra HMACs only for requests signed with another secret.
+    """
+
+    def __init__(self, verifier: SignatureVerifier, keyed_hmac: hmac.HMAC | None):
+        self.verifier = verifier
+        self.keyed_hmac = keyed_hmac
+        self.hash_object = keyed_hmac.copy() if keyed_hmac is not None else None
+
+    def update(self, chunk: bytes):
+        if self.hash_object is not None:
+            self.hash_object.update(chunk)
+
+    def verify(self, signature_header: str | None, body_bytes: bytes) -> None:
+        if not self.verifier.enabled:
+            return
+        self.verifier.check_present(signature_header)
+
+        expected_digest = decode_signature(signature_header)
+        if expected_digest is not None and (
+            hmac.compare_digest(self.hash_object.digest(), expected_digest)
+            or self.verifier.matches(expected_digest, body_bytes, skip=self.keyed_hmac)
+        ):
+            return
+        raise HTTPException(status_code=401, detail="Invalid signature.")
+
+
+def decode_signature(signature_header: str) -> bytes | None:
+    if not signature_header.startswith(SIGNATURE_PREFIX):
+        return None
+    try:
+        return bytes.fromhex(signature_header.removeprefix(SIGNATURE_PREFIX))
+    except ValueError:
+        return None
+
+
+def verify_signature(signature: str | None, body_bytes: bytes) -> None:
+    SignatureVerifier.from_env().verify(signature, body_bytes)
 
 
 def generate_signature(secret: str, payload: bytes) -> str:
     hash_object = hmac.new(secret.encode("utf-8"), msg=payload, digestmod=hashlib.sha256)
-    return f"sha256={hash_object.hexdigest()}"
+    return f"{SIGNATURE_PREFIX}{hash_object.hexdigest()}"
 
 
 def verify_secret(secret: str, payload: bytes, signature_header: str) -> bool:
     if not secret:
         return True
-    expected_signature = generate_signature(secret, payload)
-    return hmac.compare_digest(expected_signature, signature_header)
+    expected_digest = decode_signature(signature_header)
+    return expected_digest is not None and SignatureVerifier([secret]).matches(expected_digest, payload)
@@ -0,0 +1,170 @@
+import asyncio
+import os
+import shelve
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import yaml
+
+from src.utils.misc import bot_logger, handle_task_exception
+
+# dbm files must not be opened concurrently, a single dedicated thread serializes every blocking storage operation
+# and keeps them off the event loop
+storage_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="storage")
+
+DEFAULT_FLUSH_BATCH_SIZE = 64
+
+
+async def run_in_storage_thread(function: Callable[..., Any], *args: Any) -> Any:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(storage_executor, function, *args)
+
+
+class PostStore:
+    """
+    Async facade over the shelve database mapping items to Discord post ids.
+
+    Known ids are served from memory. With a flush interval of 0 every write is committed before `set` returns,
+    otherwise writes are buffered and committed in batches, on the interval or once `batch_size` writes are pending.
+    """
+
+    def __init__(
+        self, db_path: str | None = None, flush_interval: float = 0, batch_size: int = DEFAULT_FLUSH_BATCH_SIZE
+    ):
+        # Resolved from POST_ID_DB_PATH on every access when not set
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._cache: dict[str, int] = {}
+        self._pending: dict[str, int] = {}
+        self._flush_task: asyncio.Task | None = None
+
+    @property
+    def write_behind(self) -> bool:
+        return self.flush_interval > 0
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    @property
+    def cached_count(self) -> int:
+        return len(self._cache)
+
+    def configure(self, flush_interval: float, batch_size: int):
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+
+    def start(self):
+        if self.write_behind and self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_periodically())
+            self._flush_task.add_done_callback(lambda task: handle_task_exception(task, "Post store flush crashed:"))
+
+    async def stop(self):
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
+
+    def clear(self):
+        """
+        Forgets cached and pending entries without writing them.
+        """
+        self._cache.clear()
+        self._pending.clear()
+
+    async def get(self, key: str) -> int | None:
+        if key in self._cache:
+            return self._cache[key]
+
+        post_id = await run_in_storage_thread(self._read, key)
+        if post_id is not None:
+            self._cache.setdefault(key, post_id)
+        return post_id
+
+    async def set(self, key: str, post_id: int):
+        self._cache[key] = post_id
+        self._pending[key] = post_id
+        if not self.write_behind or len(self._pending) >= self.batch_size:
+            await self.flush()
+
+    async def flush(self):
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, {}
+        try:
+            await run_in_storage_thread(self._write_batch, batch)
+        except Exception:
+            # Keep the entries for the next flush, unless they were overwritten in the meantime
+            self._pending = batch | self._pending
+            raise
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as error:
+                bot_logger.error("Failed to flush post ids: %s", error)
+
+    def _open(self) -> shelve.Shelf:
+        return shelve.open(self.db_path or os.getenv("POST_ID_DB_PATH", "post_id.db"))
+
+    def _read(self, key: str) -> int | None:
+        with self._open() as db:
+            post_id: str | None = db.get(key)
+        return None if post_id is None else int(post_id)
+
+    def _write_batch(self, batch: dict[str, int]):
+        with self._open() as db:
+            for key, post_id in batch.items():
+                db[key] = str(post_id)
+
+
+post_store = PostStore()
+# Stores of projects routed to their own database, see `get_post_store`
+project_post_stores: dict[str, PostStore] = {}
+
+
+def get_post_store(db_path: str | None) -> PostStore:
+    """
+    Returns the store for the given database, sharing the flush settings of the default store.
+    """
+    if db_path is None:
+        return post_store
+    if db_path not in project_post_stores:
+        store = PostStore(db_path, post_store.flush_interval, post_store.batch_size)
+        store.start()
+        project_post_stores[db_path] = store
+    return project_post_stores[db_path]
+
+
+def all_post_stores() -> list[PostStore]:
+    return [post_store, *project_post_stores.values()]
+
+
+async def stop_post_stores():
+    for store in all_post_stores():
+        await store.stop()
+
+
+def _read_discord_id_mapping() -> dict[str, str]:
+    with open(os.getenv("GITHUB_ID_TO_DISCORD_ID_MAPPING_PATH", "github_id_to_discord_id_mapping.yaml")) as file:
+        mapping: dict[str, str] | None = yaml.load("".join(file.readlines()), Loader=yaml.Loader)
+
+    return mapping or {}
+
+
+async def load_discord_id_mapping() -> dict[str, str]:
+    return await run_in_storage_thread(_read_discord_id_mapping)
+
+
+async def retrieve_discord_id(node_id: str) -> str | None:
+    mapping = await load_discord_id_mapping()
+    return mapping.get(node_id, None)
@@ -0,0 +1,124 @@
+import contextvars
+import copy
+import datetime
+import json
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+# Loggers configured by uvicorn/gunicorn whose handlers are moved behind the queue
+LOGGER_NAMES = ("uvicorn", "uvicorn.error", "uvicorn.access")
+# Fields copied to the JSON output when present on the record, either from `extra=` or from the log context
+STRUCTURED_FIELDS = ("component", "node_id", "event_type", "delivery_id")
+
+_log_context: contextvars.ContextVar[dict[str, str] | None] = contextvars.ContextVar("log_context", default=None)
+
+
+def bind_log_context(**fields: str | None):
+    """
+    Attaches fields to every record logged later from the current context (i.e. the rest of the current task).
+    """
+    current = _log_context.get() or {}
+    _log_context.set({**current, **{key: value for key, value in fields.items() if value is not None}})
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.datetime.fromtimestamp(record.created, datetime.UTC).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        component = getattr(record, "component", None)
+        if component is not None:
+            # The component is a field of its own here
+            entry["message"] = entry["message"].removeprefix(f"[{component.upper()}] ")
+        for field in STRUCTURED_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class StructuredQueueHandler(QueueHandler):
+    def __init__(self, log_queue: queue.SimpleQueue, route: str):
+        super().__init__(log_queue)
+        self.route = route
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only the arguments are resolved on the caller side, so later mutation of them does not leak into the log.
+        # Rendering and the actual write happen on the listener thread.
+        record = copy.copy(record)
+        record.msg, record.args = record.getMessage(), None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        for key, value in (_log_context.get() or {}).items():
+            if getattr(record, key, None) is None:
+                setattr(record, key, value)
+        record.log_route = self.route
+        return record
+
+
+class RoutingQueueListener(QueueListener):
+    """
+    Single background thread serving several loggers, every record goes only to the handlers of the logger it
+    was queued from.
+    """
+
+    def __init__(self, log_queue: queue.SimpleQueue, routes: dict[str, list[logging.Handler]]):
+        super().__init__(log_queue, respect_handler_level=True)
+        self.routes = routes
+
+    def handle(self, record: logging.LogRecord):
+        for handler in self.routes.get(record.log_route, []):
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+
+class LoggingPipeline:
+    """
+    Moves the handlers of the given loggers behind a queue, so logging from async code never blocks on I/O.
+    """
+
+    def __init__(self, json_format: bool = False, logger_names: tuple[str, ...] = LOGGER_NAMES):
+        self.json_format = json_format
+        self.logger_names = logger_names
+        self.listener: RoutingQueueListener | None = None
+        self._original_handlers: dict[str, list[logging.Handler]] = {}
+        self._original_formatters: dict[logging.Handler, logging.Formatter | None] = {}
+
+    def start(self):
+        log_queue = queue.SimpleQueue()
+        routes: dict[str, list[logging.Handler]] = {}
+        for name in self.logger_names:
+            logger = logging.getLogger(name)
+            if not logger.handlers:
+                continue
+            self._original_handlers[name] = list(logger.handlers)
+            routes[name] = list(logger.handlers)
+            if self.json_format:
+                for handler in logger.handlers:
+                    self._original_formatters.setdefault(handler, handler.formatter)
+                    handler.setFormatter(JsonFormatter())
+            logger.handlers = [StructuredQueueHandler(log_queue, name)]
+
+        self.listener = RoutingQueueListener(log_queue, routes)
+        self.listener.start()
+
+    def stop(self):
+        if self.listener is None:
+            return
+        self.listener.stop()
+        self.listener = None
+        for name, handlers in self._original_handlers.items():
+            logging.getLogger(name).handlers = handlers
+        for handler, formatter in self._original_formatters.items():
+            handler.setFormatter(formatter)
+        self._original_handlers.clear()
+        self._original_formatters.clear()
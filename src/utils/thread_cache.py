@@ -0,0 +1,160 @@
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+from src.utils.misc import bot_logger
+
+if TYPE_CHECKING:
+    from hikari import (
+        GatewayBot,
+        GuildAvailableEvent,
+        GuildThreadChannel,
+        GuildThreadCreateEvent,
+        GuildThreadDeleteEvent,
+        GuildThreadUpdateEvent,
+        ShardReadyEvent,
+        ThreadListSyncEvent,
+    )
+
+DEFAULT_THREAD_CACHE_SIZE = 1024
+DEFAULT_THREAD_CACHE_TTL = 300.0
+
+
+class ThreadCache:
+    """
+    Threads of the routed forum channels by id, with their applied tags and archived state, the least recently used
+    ones are dropped beyond `max_size`.
+
+    Filled by the gateway connection when it is enabled and by the channels returned from REST calls, lookups that miss
+    fall back to the REST API. Without the gateway nothing reports edits made in Discord, so entries expire after `ttl`
+    seconds then.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_THREAD_CACHE_SIZE, ttl: float = DEFAULT_THREAD_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        # Thread id -> (thread, monotonic time it was cached)
+        self.threads: OrderedDict[int, tuple[GuildThreadChannel, float]] = OrderedDict()
+        # Threads of other channels are ignored, no filter until the bot knows its routes
+        self.forum_channel_ids: set[int] = set()
+        # Set while the gateway keeps the entries current
+        self.live = False
+        # Routed forum channels whose guild the current gateway session has not delivered yet
+        self.unseen_forum_channel_ids: set[int] = set()
+
+    def _is_fresh(self, cached_at: float) -> bool:
+        return self.live or time.monotonic() - cached_at <= self.ttl
+
+    def get(self, thread_id: int) -> GuildThreadChannel | None:
+        entry = self.threads.get(thread_id)
+        if entry is None:
+            return None
+        if not self._is_fresh(entry[1]):
+            del self.threads[thread_id]
+            return None
+        self.threads.move_to_end(thread_id)
+        return entry[0]
+
+    def put(self, thread: GuildThreadChannel):
+        if self.max_size <= 0 or (self.forum_channel_ids and thread.parent_id not in self.forum_channel_ids):
+            return
+        self.threads[thread.id] = (thread, time.monotonic())
+        self.threads.move_to_end(thread.id)
+        while len(self.threads) > self.max_size:
+            self.threads.popitem(last=False)
+
+    def remember(self, channel: object):
+        """
+        Caches a channel returned by a REST call, which is the state right after the call. Anything that is not a
+        thread is ignored.
+        """
+        from hikari import GuildThreadChannel
+
+        if isinstance(channel, GuildThreadChannel):
+            self.put(channel)
+
+    def remove(self, thread_id: int):
+        self.threads.pop(thread_id, None)
+
+    def find_by_name(self, name: str, forum_channel_id: int) -> GuildThreadChannel | None:
+        for thread, cached_at in self.threads.values():
+            if thread.name == name and thread.parent_id == forum_channel_id and self._is_fresh(cached_at):
+                return thread
+        return None
+
+    def clear(self):
+        self.threads.clear()
+
+    def __len__(self) -> int:
+        return len(self.threads)
+
+    @property
+    def gateway_state(self) -> str:
+        """
+        "warming" until the gateway delivered the threads of every routed forum channel, "ready" after.
+        """
+        if not self.live:
+            return "disabled"
+        return "warming" if self.unseen_forum_channel_ids else "ready"
+
+    async def on_shard_ready(self, _event: ShardReadyEvent):
+        # A new session, events missed while disconnected are not replayed, the guilds are sent again instead
+        self.clear()
+        self.unseen_forum_channel_ids = set(self.forum_channel_ids)
+
+    async def on_guild_available(self, event: GuildAvailableEvent):
+        for thread in event.threads.values():
+            self.put(thread)
+        self.unseen_forum_channel_ids -= event.channels.keys()
+
+    async def on_thread_list_sync(self, event: ThreadListSyncEvent):
+        for thread in event.threads.values():
+            self.put(thread)
+
+    async def on_thread_change(self, event: GuildThreadCreateEvent | GuildThreadUpdateEvent):
+        self.put(event.thread)
+
+    async def on_thread_delete(self, event: GuildThreadDeleteEvent):
+        self.remove(event.thread_id)
+
+
+thread_cache = ThreadCache()
+
+
+async def start_gateway(token: str, forum_channel_ids: list[int], cache: ThreadCache = thread_cache) -> GatewayBot:
+    """
+    Connects to the gateway with only the guilds intent, which carries the thread events, and keeps `cache` up to
+    date from them. hikari's own cache is disabled, the bot reads nothing else from the gateway.
+    """
+    from hikari import (
+        GatewayBot,
+        GuildAvailableEvent,
+        GuildThreadCreateEvent,
+        GuildThreadDeleteEvent,
+        GuildThreadUpdateEvent,
+        Intents,
+        ShardReadyEvent,
+        ThreadListSyncEvent,
+    )
+    from hikari.api.config import CacheComponents
+    from hikari.impl import CacheSettings
+
+    cache.forum_channel_ids = set(forum_channel_ids)
+    cache.unseen_forum_channel_ids = set(forum_channel_ids)
+    cache.live = True
+    gateway = GatewayBot(
+        token,
+        intents=Intents.GUILDS,
+        cache_settings=CacheSettings(components=CacheComponents.NONE),
+        banner=None,
+        logs=None,
+    )
+    gateway.subscribe(ShardReadyEvent, cache.on_shard_ready)
+    gateway.subscribe(GuildAvailableEvent, cache.on_guild_available)
+    gateway.subscribe(ThreadListSyncEvent, cache.on_thread_list_sync)
+    gateway.subscribe(GuildThreadCreateEvent, cache.on_thread_change)
+    gateway.subscribe(GuildThreadUpdateEvent, cache.on_thread_change)
+    gateway.subscribe(GuildThreadDeleteEvent, cache.on_thread_delete)
+    await gateway.start(check_for_updates=False)
+    bot_logger.info("Gateway connected, caching threads of %s forum channels.", len(forum_channel_ids))
+    return gateway
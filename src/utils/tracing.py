@@ -0,0 +1,300 @@
+import asyncio
+import contextvars
+import functools
+import inspect
+import os
+import random
+import re
+import time
+from collections.abc import Generator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any
+
+from src.utils import json_backend
+from src.utils.misc import handle_task_exception, server_logger
+
+SERVICE_NAME = "github-project-discord-bot"
+DEFAULT_EXPORT_INTERVAL = 5.0
+# Queue times of events the bot never took, e.g. dropped with the journal, are forgotten past this many
+MAX_QUEUED_TRACES = 10_000
+TRACEPARENT_PATTERN = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+# OTLP span kinds and status codes
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+
+@dataclass(slots=True)
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    start_ns: int
+    end_ns: int | None = None
+    attributes: dict[str, Any] = field(default_factory=dict)
+    error: str | None = None
+
+    @property
+    def traceparent(self) -> str:
+        # W3C trace context, the form the trace is carried in through the update queue
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_otlp(self) -> dict:
+        otlp_span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": SPAN_KIND_SERVER if self.parent_id is None else SPAN_KIND_INTERNAL,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [otlp_attribute(key, value) for key, value in self.attributes.items() if value is not None],
+            "status": {"code": STATUS_OK} if self.error is None else {"code": STATUS_ERROR, "message": self.error},
+        }
+        if self.parent_id is not None:
+            otlp_span["parentSpanId"] = self.parent_id
+        return otlp_span
+
+
+_current_span: contextvars.ContextVar[Span | None] = contextvars.ContextVar("current_span", default=None)
+
+
+def otlp_attribute(key: str, value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+def otlp_request(spans: list[Span]) -> dict:
+    return {
+        "resourceSpans": [
+            {
+                "resource": {"attributes": [otlp_attribute("service.name", SERVICE_NAME)]},
+                "scopeSpans": [{"scope": {"name": __name__}, "spans": [span.to_otlp() for span in spans]}],
+            }
+        ]
+    }
+
+
+def trace_id_for_delivery(delivery_id: str | None) -> str:
+    """
+    GitHub delivery ids are UUIDs, as 32 hex digits they are valid trace ids, so a delivery can be looked up by its id.
+    """
+    hex_id = (delivery_id or "").replace("-", "").lower()
+    if re.fullmatch(r"[0-9a-f]{32}", hex_id) and hex_id.strip("0"):
+        return hex_id
+    return f"{random.getrandbits(128):032x}"
+
+
+def new_span_id() -> str:
+    return f"{random.getrandbits(64) or 1:016x}"
+
+
+class FileSpanExporter:
+    """
+    Appends each batch as a line of OTLP JSON, the format the collector's otlpjsonfile receiver reads.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def _write(self, line: bytes):
+        with open(self.path, "ab") as file:
+            file.write(line)
+
+    async def export(self, spans: list[Span]):
+        await asyncio.to_thread(self._write, json_backend.dumps(otlp_request(spans)) + b"\n")
+
+
+class OtlpSpanExporter:
+    """
+    Sends batches to an OTLP/HTTP collector endpoint, e.g. http://localhost:4318/v1/traces.
+    """
+
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+
+    async def export(self, spans: list[Span]):
+        import aiohttp
+
+        async with aiohttp.ClientSession() as session:
+            async with session.post(
+                self.endpoint,
+                data=json_backend.dumps(otlp_request(spans)),
+                headers={"Content-Type": "application/json"},
+            ) as response:
+                if response.status >= 400:
+                    raise ConnectionError(f"Collector responded with {response.status}.")
+
+
+class Tracer:
+    """
+    Records spans of sampled deliveries and exports them in batches. With a sample rate of 0 (the default) no span is
+    created and every helper is a no-op.
+
+    A trace starts when a webhook arrives and continues in the bot through the `trace_parent` of the queued event.
+    """
+
+    def __init__(self):
+        self.sample_rate = 0.0
+        self.exporter: FileSpanExporter | OtlpSpanExporter | None = None
+        self.export_interval = DEFAULT_EXPORT_INTERVAL
+        self.finished: list[Span] = []
+        self.exported = 0
+        # traceparent of a queued event -> when it was queued
+        self.queued_at: dict[str, int] = {}
+        self._export_task: asyncio.Task | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0
+
+    def configure_from_env(self):
+        self.sample_rate = float(os.getenv("TRACE_SAMPLE_RATE", "0"))
+        if not self.enabled:
+            return
+        export_path, otlp_endpoint = os.getenv("TRACE_EXPORT_PATH"), os.getenv("TRACE_OTLP_ENDPOINT")
+        if otlp_endpoint:
+            self.exporter = OtlpSpanExporter(otlp_endpoint)
+        elif export_path:
+            self.exporter = FileSpanExporter(export_path)
+        else:
+            server_logger.warning("TRACE_SAMPLE_RATE is set without TRACE_EXPORT_PATH or TRACE_OTLP_ENDPOINT.")
+            self.sample_rate = 0.0
+
+    def is_sampled(self, trace_id: str) -> bool:
+        # Derived from the trace id, so a redelivery of the same webhook gets the same decision
+        return int(trace_id[16:], 16) < self.sample_rate * 2**64
+
+    @contextmanager
+    def _span(self, name: str, trace_id: str, parent_id: str | None, attributes: dict) -> Generator[Span]:
+        span = Span(name, trace_id, new_span_id(), parent_id, time.time_ns(), attributes=attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as exception:
+            span.error = f"{type(exception).__name__}: {exception}"
+            raise
+        finally:
+            span.end_ns = time.time_ns()
+            _current_span.reset(token)
+            self.finished.append(span)
+
+    @contextmanager
+    def start_trace(self, name: str, delivery_id: str | None, **attributes: Any) -> Generator[Span | None]:
+        if not self.enabled:
+            yield None
+            return
+        trace_id = trace_id_for_delivery(delivery_id)
+        if not self.is_sampled(trace_id):
+            yield None
+            return
+        with self._span(name, trace_id, None, {"github.delivery": delivery_id, **attributes}) as span:
+            yield span
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Generator[Span | None]:
+        """
+        Child of the current span, nothing is recorded outside of a sampled trace.
+        """
+        parent = _current_span.get()
+        if parent is None:
+            yield None
+            return
+        with self._span(name, parent.trace_id, parent.span_id, attributes) as span:
+            yield span
+
+    @contextmanager
+    def resume(self, name: str, traceparent: str | None, **attributes: Any) -> Generator[Span | None]:
+        """
+        Continues a trace carried as a traceparent, e.g. by an event taken from the update queue.
+        """
+        match = TRACEPARENT_PATTERN.match(traceparent or "")
+        if not self.enabled or match is None:
+            yield None
+            return
+        with self._span(name, match[1], match[2], attributes) as span:
+            yield span
+
+    def current_traceparent(self) -> str | None:
+        span = _current_span.get()
+        return span.traceparent if span is not None else None
+
+    def mark_queued(self, traceparent: str | None):
+        if traceparent is None:
+            return
+        if len(self.queued_at) >= MAX_QUEUED_TRACES:
+            del self.queued_at[next(iter(self.queued_at))]
+        self.queued_at[traceparent] = time.time_ns()
+
+    def record_queue_wait(self, traceparent: str | None):
+        """
+        Records how long an event waited in the update queue, from `mark_queued` until the bot took it.
+        """
+        queued_at = self.queued_at.pop(traceparent, None) if traceparent is not None else None
+        match = TRACEPARENT_PATTERN.match(traceparent or "")
+        if queued_at is None or match is None:
+            return
+        self.finished.append(Span("queue_wait", match[1], new_span_id(), match[2], queued_at, time.time_ns()))
+
+    def start(self):
+        if self.exporter is not None:
+            self._export_task = asyncio.create_task(self._export_periodically())
+            self._export_task.add_done_callback(lambda task: handle_task_exception(task, "Span export crashed:"))
+
+    async def stop(self):
+        if self._export_task is not None:
+            self._export_task.cancel()
+            await asyncio.gather(self._export_task, return_exceptions=True)
+            self._export_task = None
+        await self.flush()
+
+    async def flush(self):
+        if self.exporter is None or not self.finished:
+            return
+        spans, self.finished = self.finished, []
+        try:
+            await self.exporter.export(spans)
+            self.exported += len(spans)
+        except Exception as exception:
+            server_logger.error("Failed to export %s spans: %s", len(spans), exception)
+
+    async def _export_periodically(self):
+        while True:
+            await asyncio.sleep(self.export_interval)
+            await self.flush()
+
+    def reset(self):
+        self.sample_rate = 0.0
+        self.exporter = None
+        self.finished.clear()
+        self.queued_at.clear()
+
+
+tracer = Tracer()
+
+
+class TracedClient:
+    """
+    Proxy recording a span around every coroutine method of the wrapped client, i.e. around each Discord request.
+    """
+
+    def __init__(self, client: Any, prefix: str):
+        self._client = client
+        self._prefix = prefix
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self._client, name)
+        if not inspect.iscoroutinefunction(attribute):
+            return attribute
+
+        @functools.wraps(attribute)
+        async def traced(*args, **kwargs):
+            with tracer.span(f"{self._prefix}.{name}"):
+                return await attribute(*args, **kwargs)
+
+        return traced
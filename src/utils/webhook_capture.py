@@ -0,0 +1,139 @@
+import gzip
+import os
+import time
+import zlib
+from collections.abc import Iterator, Mapping
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from src.utils import json_backend
+from src.utils.misc import server_logger
+
+# Rotation happens once a file holds this many uncompressed bytes
+DEFAULT_CAPTURE_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_CAPTURE_BACKUPS = 5
+# Only these headers are kept, signatures and anything a proxy may add in front of the server are dropped
+CAPTURED_HEADERS = frozenset({
+    "content-type",
+    "user-agent",
+    "x-github-delivery",
+    "x-github-event",
+    "x-github-hook-id",
+    "x-github-hook-installation-target-id",
+    "x-github-hook-installation-target-type",
+})
+
+# Compression runs off the event loop, a single thread keeps the records in arrival order
+capture_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="capture")
+
+
+def sanitize_headers(headers: Mapping[str, str]) -> dict[str, str]:
+    return {name.lower(): value for name, value in headers.items() if name.lower() in CAPTURED_HEADERS}
+
+
+class WebhookCapture:
+    """
+    Appends every verified webhook to a gzip compressed JSON lines file, one record per request with its arrival time,
+    sanitized headers and raw body. Full files are rotated to `<path>.1`, `<path>.2` and so on.
+    """
+
+    def __init__(
+        self, path: str, max_bytes: int = DEFAULT_CAPTURE_MAX_BYTES, backup_count: int = DEFAULT_CAPTURE_BACKUPS
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.records = 0
+        self._file: gzip.GzipFile | None = None
+        self._written = 0
+
+    @classmethod
+    def from_env(cls) -> WebhookCapture | None:
+        path = os.getenv("WEBHOOK_CAPTURE_PATH")
+        if not path:
+            return None
+        server_logger.warning("Capturing webhooks to %s.", path)
+        return cls(
+            path,
+            int(os.getenv("WEBHOOK_CAPTURE_MAX_BYTES", str(DEFAULT_CAPTURE_MAX_BYTES))),
+            int(os.getenv("WEBHOOK_CAPTURE_BACKUPS", str(DEFAULT_CAPTURE_BACKUPS))),
+        )
+
+    def record(self, headers: Mapping[str, str], body: bytes, received_at: float | None = None) -> Future:
+        """
+        Queues a record for writing and returns without waiting for it.
+        """
+        line = json_backend.dumps({
+            "received_at": time.time() if received_at is None else received_at,
+            "headers": sanitize_headers(headers),
+            "body": body.decode("utf-8", errors="replace"),
+        })
+        return capture_executor.submit(self._write, line + b"\n")
+
+    def _write(self, line: bytes):
+        try:
+            if self._file is None:
+                self._open()
+            self._file.write(line)
+            self._written += len(line)
+            self.records += 1
+            if self._written >= self.max_bytes:
+                self._rotate()
+        except OSError as error:
+            server_logger.error("Failed to capture webhook to %s: %s", self.path, error)
+
+    def _open(self):
+        # A file left by an earlier run counts towards the limit, or restarts would let it grow without bounds
+        self._written = uncompressed_size(self.path)
+        # Appending adds a gzip member, readers see a single stream
+        self._file = gzip.open(self.path, "ab")
+
+    def _rotate(self):
+        self._close()
+        for index in range(self.backup_count - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{index}"):
+                os.replace(f"{self.path}.{index}", f"{self.path}.{index + 1}")
+        if self.backup_count > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+    def _close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._written = 0
+
+    def close(self) -> Future:
+        """
+        Closes the file once the queued records are written.
+        """
+        return capture_executor.submit(self._close)
+
+
+def uncompressed_size(path: str) -> int:
+    """
+    Number of uncompressed bytes in a capture file, up to its damaged end if it has one. 0 if the file is missing.
+    """
+    size = 0
+    try:
+        with gzip.open(path, "rb") as file:
+            while chunk := file.read(1024 * 1024):
+                size += len(chunk)
+    except FileNotFoundError:
+        pass
+    except (EOFError, gzip.BadGzipFile, zlib.error) as error:
+        server_logger.warning("Capture file %s ends early: %s", path, error)
+    return size
+
+
+def read_capture(path: str) -> Iterator[dict]:
+    """
+    Yields the records of a capture file. A file cut short by a crash yields the records before the damaged end.
+    """
+    with gzip.open(path, "rb") as file:
+        try:
+            for line in file:
+                if line.strip():
+                    yield json_backend.loads(line)
+        except (EOFError, gzip.BadGzipFile, zlib.error) as error:
+            server_logger.warning("Capture file %s ends early: %s", path, error)